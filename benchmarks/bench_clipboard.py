@@ -0,0 +1,81 @@
+"""
+Reads/sec of the persistent clipboards in clipboard.py against pyperclip.
+
+    python -m benchmarks.bench_clipboard [--duration SECONDS]
+
+Needs a real clipboard (Windows, or a display on Linux); unavailable
+implementations are skipped. On clipboards with a sequence number it also
+measures how quickly polling sequence(), as Bot.get_item_info does, notices a
+write from another thread.
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+from benchmarks.common import load_corpus, measure_rate
+from clipboard import PyperclipClipboard, TkClipboard, Win32Clipboard
+
+
+def change_latency(clipboard, text: str, samples: int = 50) -> list[float]:
+    latencies = []
+    for _ in range(samples):
+        since = clipboard.sequence()
+        written = []
+
+        def write():
+            time.sleep(0.005)
+            written.append(time.perf_counter())
+            clipboard.write(text)
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        deadline = time.perf_counter() + 1.0
+        while clipboard.sequence() == since and time.perf_counter() < deadline:
+            pass
+        noticed = time.perf_counter()
+        changed = clipboard.sequence() != since
+        writer.join()
+        if changed:
+            latencies.append(noticed - written[0])
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=float, default=1.0)
+    args = parser.parse_args()
+
+    text = load_corpus()["t17_map_rare"]
+    for implementation in (Win32Clipboard, TkClipboard, PyperclipClipboard):
+        try:
+            clipboard = implementation()
+            clipboard.write(text)
+            assert clipboard.read().replace("\r\n", "\n") == text
+        except Exception as e:
+            print(f"{implementation.name:<10} skipped: {e}")
+            continue
+        reads = measure_rate(clipboard.read, args.duration)
+
+        def roundtrip():
+            clipboard.write("")
+            clipboard.write(text)
+            clipboard.read()
+
+        roundtrips = measure_rate(roundtrip, args.duration)
+        print(
+            f"{clipboard.name:<10} {reads:>10,.0f} reads/s "
+            f"{roundtrips:>10,.0f} clear+write+read/s"
+        )
+        if clipboard.sequence() is not None:
+            sequences = measure_rate(clipboard.sequence, args.duration)
+            latencies = change_latency(clipboard, text)
+            print(
+                f"{'':<10} {sequences:>10,.0f} sequence checks/s, change noticed "
+                f"after {statistics.median(latencies) * 1e3:.2f}ms (median)"
+            )
+
+
+if __name__ == "__main__":
+    main()
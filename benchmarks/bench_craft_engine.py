@@ -0,0 +1,65 @@
+"""
+Step transitions/sec of the iterative craft engine on a looping blueprint.
+
+    python -m benchmarks.bench_craft_engine [--transitions N]
+"""
+
+import argparse
+import random
+import sys
+
+from benchmarks.common import load_corpus
+from craft_engine import ABORT, CompiledStep, CraftEngine, CraftProgram
+from item_parser import parse_item
+from mod_matcher import ModMatcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--transitions", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    items = [parse_item(text).explicit_lines() for text in corpus.values()]
+    rng = random.Random(0)
+    state = {"mods": items[0]}
+
+    def apply_currency(currency: str) -> None:
+        state["mods"] = rng.choice(items)
+
+    def read_mods() -> list[str]:
+        return state["mods"]
+
+    # alteration spam: loop on failure, restart after the regal check fails.
+    life = ModMatcher(["maximum life"], lowercase=True).matches_any
+    res = ModMatcher(["resistance"], lowercase=True).matches_any
+    program = CraftProgram(
+        (
+            CompiledStep("alteration", life, 1, 0, 1, "life"),
+            CompiledStep("regal", None, 2, ABORT, 1, "regal"),
+            CompiledStep("scouring", res, 3, 0, 0, "resistance"),
+            CompiledStep("scouring", None, 0, ABORT, 1, "scour and restart"),
+        )
+    )
+    engine = CraftEngine(
+        program,
+        apply_currency,
+        read_mods,
+        should_stop=lambda: engine.stats.transitions >= args.transitions,
+    )
+    stats = engine.run()
+    print(f"recursion limit: {sys.getrecursionlimit()}")
+    print(
+        f"{stats.transitions:,} transitions, {stats.attempts:,} attempts in "
+        f"{stats.elapsed:.2f}s: {stats.transitions / stats.elapsed:,.0f} transitions/s"
+    )
+    for step, step_stats in zip(program.steps, stats.steps):
+        per_entry = step_stats.elapsed / max(step_stats.entries, 1) * 1e6
+        print(
+            f"  {step.label:<18} entries={step_stats.entries:<9,} "
+            f"attempts={step_stats.attempts:<9,} {per_entry:.2f}us/entry"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Cost of loading the item and currency icons with and without the shared
+pixmap cache (pages/icon_cache.py).
+
+    python -m benchmarks.bench_icons
+
+Runs on the offscreen Qt platform unless QT_QPA_PLATFORM is set. "uncached"
+loads and smooth-scales the PNG on every use, as every jewel widget and
+currency button used to.
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks.common import measure_rate
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QPixmap
+from PySide6.QtWidgets import QApplication
+
+JEWEL_IMAGE = "images/large_cluster_jewel.png"
+
+
+def uncached_pixmap(path: str, size: int) -> QPixmap:
+    return QPixmap(path).scaled(
+        size,
+        size,
+        Qt.AspectRatioMode.KeepAspectRatio,
+        Qt.TransformationMode.SmoothTransformation,
+    )
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def build_pages():
+    from pages.calibration_page import CalibrationPage
+    from pages.clusters_page import ClustersPage
+    from pages.maps_page import MapsPage
+    from pages.items_page import ItemsPage
+    from pages.inventory_page import InventoryPage
+    from pages.settings_page import SettingsPage
+
+    return [
+        page()
+        for page in (
+            CalibrationPage,
+            ClustersPage,
+            MapsPage,
+            ItemsPage,
+            InventoryPage,
+            SettingsPage,
+        )
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=float, default=1.0)
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    app = QApplication([])
+    from pages import icon_cache
+    from pages.calibration_page import CalibrationPage
+    from pages.items_page import ItemsPage, StepWidget
+
+    uncached = measure_rate(lambda: uncached_pixmap(JEWEL_IMAGE, 39), args.duration)
+    icon_cache.pixmap(JEWEL_IMAGE, 39)
+    cached = measure_rate(lambda: icon_cache.pixmap(JEWEL_IMAGE, 39), args.duration)
+    print(
+        f"per jewel icon: uncached {1e6 / uncached:,.1f}us, "
+        f"cached {1e6 / cached:,.2f}us"
+    )
+
+    # The first build pays for imports and Qt's one-off style setup.
+    pages = build_pages()
+    icon_cache.clear()
+    cold = timed(lambda: pages.extend(build_pages()))
+    warm = timed(lambda: pages.extend(build_pages()))
+    print(f"all pages: {cold * 1e3:.1f}ms cold cache, {warm * 1e3:.1f}ms warm cache")
+
+    icon_cache.clear()
+    cold = timed(lambda: pages.append(CalibrationPage()))
+    warm = timed(lambda: pages.append(CalibrationPage()))
+    print(f"calibration page: {cold * 1e3:.2f}ms cold, {warm * 1e3:.2f}ms warm")
+
+    currencies = ItemsPage().currencies
+    icon_cache.clear()
+    cold = timed(lambda: pages.append(StepWidget(currencies)))
+    warm = timed(lambda: pages.append(StepWidget(currencies)))
+    print(f"item step widget: {cold * 1e3:.2f}ms cold, {warm * 1e3:.2f}ms warm")
+    for page in pages:
+        page.deleteLater()
+    app.processEvents()
+
+
+if __name__ == "__main__":
+    main()
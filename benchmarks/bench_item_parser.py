@@ -0,0 +1,70 @@
+"""
+Parses/sec of item_parser.parse_item against the legacy per-module parsers.
+
+    python -m benchmarks.bench_item_parser [--duration SECONDS]
+"""
+
+import argparse
+import re
+
+from benchmarks.common import load_corpus, measure_rate
+from item_parser import parse_item
+
+
+# Baseline implementations, kept verbatim for comparison.
+def legacy_process_cluster(item_info: str):
+    jewel_type_match = re.search(r"(\w*) Cluster Jewel\n-{8}", item_info)
+    if not jewel_type_match:
+        return None
+    re.search(r"Item Level: (\d+)", item_info)
+    re.search(r"Adds (\d+) Passive Skills \(enchant\)", item_info)
+    re.search(r"Added Small Passive Skills grant: ([^\n]+)\n", item_info)
+    mods_match = re.search(
+        r"\(enchant\)\n-{8}\n([{}\d\w\s\"(:—),\.\+\-%]*)\n-{8}", item_info, re.DOTALL
+    )
+    return mods_match and mods_match.group(1).split("\n")
+
+
+def legacy_process_item(item_info: str):
+    info = item_info.split("--------")
+    if not info or len(info) < 3:
+        return tuple()
+    mods = [mod for mod in info[-3].strip().split("\n") if not mod.startswith("(")]
+    implicits = info[1].strip().split("\n")
+    return mods, implicits
+
+
+def legacy_process_item_info(item_info: str):
+    info = item_info.split("--------")
+    if len(info) < 2:
+        return []
+    return [mod for mod in info[-2].strip().split("\n") if not mod.startswith("(")]
+
+
+LEGACY_PARSERS = {
+    "cluster": legacy_process_cluster,
+    "map": legacy_process_item,
+    "item": legacy_process_item_info,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=float, default=0.5)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    print(
+        f"{'item':<24}{'parse_item/s':>14}"
+        + "".join(f"{'legacy ' + name + '/s':>20}" for name in LEGACY_PARSERS)
+    )
+    for name, text in corpus.items():
+        row = f"{name:<24}"
+        row += f"{measure_rate(lambda: parse_item(text), args.duration):>14,.0f}"
+        for legacy in LEGACY_PARSERS.values():
+            row += f"{measure_rate(lambda: legacy(text), args.duration):>20,.0f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Checks/sec of ModMatcher against the legacy nested `for mod / for regex` loop.
+
+    python -m benchmarks.bench_mod_matcher [--duration SECONDS]
+"""
+
+import argparse
+import re
+
+from benchmarks.common import load_corpus, measure_rate
+from item_parser import parse_item
+from mod_matcher import ModMatcher
+
+MAP_REGEXES = [
+    "reflect",
+    "cannot Regenerate",
+    "less Recovery",
+    "maximum Resistances",
+    "Cursed with",
+    "Chain \\d+ additional",
+    "extra Physical Damage as \\w+",
+    "Monster Life",
+    "avoid Elemental Ailments",
+    "Poison on Hit",
+    "Players have \\d+% less Area of Effect",
+    "increased Critical Strike Chance",
+    "Hexproof",
+    "Frenzy Charge",
+    "Power Charge",
+    "Endurance Charge",
+    "Unique Boss deals",
+    "Burning Ground",
+    "Shocked Ground",
+    "Temporal Chains",
+]
+
+
+def legacy_count(mods: list[str], regexes: list[str]) -> int:
+    matched = 0
+    for modtext in mods:
+        for regex in regexes:
+            if re.search(regex, modtext):
+                matched += 1
+    return matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=float, default=0.5)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    mods = parse_item(corpus["t17_map_rare"]).explicit_lines()
+    print(f"{len(mods)} mod lines")
+    print(f"{'regexes':>8}{'legacy loop/s':>16}{'ModMatcher/s':>16}{'speedup':>10}")
+    for count in (1, 3, 5, 10, 20):
+        regexes = MAP_REGEXES[:count]
+        matcher = ModMatcher(regexes)
+        assert matcher.count(mods) == legacy_count(mods, regexes)
+        legacy = measure_rate(lambda: legacy_count(mods, regexes), args.duration)
+        combined = measure_rate(lambda: matcher.count(mods, limit=count), args.duration)
+        print(f"{count:>8}{legacy:>16,.0f}{combined:>16,.0f}{combined / legacy:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
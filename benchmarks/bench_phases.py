@@ -0,0 +1,340 @@
+"""
+Per-phase latency of the map, cluster and item craft loops.
+
+    python -m benchmarks.bench_phases [--runs N] [--output FILE] [--compare FILE]
+
+Every backend call and the parse/match functions of each loop are timed while
+the loop runs against the simulator. Two clocks are reported per phase:
+
+- wall: time spent in our code (and the simulator), i.e. the bot's own cost
+- modelled: the simulator's virtual clock, which charges pyautogui.PAUSE per
+  input call plus the fixed sleeps, i.e. what the loop waits on in the game
+
+Input batches (Bot.run) are timed action by action under the same phases as
+single calls (move, right_click, left_click, ...) with their delays as
+"sleep"; the JSON results also hold the first entries of each loop's action
+timeline.
+
+Results are written as JSON so runs can be compared between releases.
+"""
+
+import argparse
+import dataclasses
+import json
+import os
+import platform
+import statistics
+import time
+from collections import defaultdict
+
+from benchmarks.common import BENCH_DIR
+from bot_backend import BotBackend, PyAutoGuiBackend
+from bot_controller import Bot
+from input_actions import RecordingBackend
+from mytypes import Position
+from simulator import SimulatorBackend
+from loguru import logger
+import cluster_module
+import item_craft_module
+import map_module
+import session_log
+
+# Batched action kind -> phase, as for the single calls below.
+ACTION_PHASES = {
+    "move_to": "move",
+    "left_click": "left_click",
+    "right_click": "right_click",
+    "press": "press",
+    "hotkey": "hotkey",
+    "key_down": "key",
+    "key_up": "key",
+}
+
+ITEM_POS = Position(600, 400)
+CLUSTER_BUTTON = Position(800, 500)
+TIMELINE_ENTRIES = 40
+MAP_REGEXES = ["extra Physical Damage as Fire", "maximum Resistances"]
+CLUSTER_REGEXES = ["Burning Bright", "Prismatic Heart"]
+ITEM_STEPS = [
+    item_craft_module.CraftingStep(
+        "", "transmutation", on_success=1, auto_success=True
+    ),
+    item_craft_module.CraftingStep(
+        "maximum Life", "alteration", on_failure=1, on_success=2, max_attempts=10_000
+    ),
+    item_craft_module.CraftingStep("", "regal", on_success=3, auto_success=True),
+    item_craft_module.CraftingStep("", "scouring", on_success=4, auto_success=True),
+]
+
+
+class PhaseTimer:
+    def __init__(self, clock):
+        self.clock = clock  # Modelled clock
+        self.wall: dict[str, list[float]] = defaultdict(list)
+        self.modelled: dict[str, list[float]] = defaultdict(list)
+
+    def timed(self, phase: str, func):
+        def wrapper(*args, **kwargs):
+            wall_start = time.perf_counter()
+            modelled_start = self.clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.wall[phase].append(time.perf_counter() - wall_start)
+                self.modelled[phase].append(self.clock() - modelled_start)
+
+        return wrapper
+
+
+class TimingBackend(BotBackend):
+    """
+    Forwards every call to another backend and records how long it took.
+    Each copy starts a new iteration of the craft loop.
+    """
+
+    def __init__(self, backend: BotBackend, timer: PhaseTimer):
+        self.backend = backend
+        self.timer = timer
+        self._iteration: tuple[float, float] | None = None
+        self._move_to = timer.timed("move", backend.move_to)
+        self._left_click = timer.timed("left_click", backend.left_click)
+        self._right_click = timer.timed("right_click", backend.right_click)
+        self._press = timer.timed("press", backend.press)
+        self._key_down = timer.timed("key", backend.key_down)
+        self._key_up = timer.timed("key", backend.key_up)
+        self._read_clipboard = timer.timed("clipboard_read", backend.read_clipboard)
+        self._write_clipboard = timer.timed("clipboard_clear", backend.write_clipboard)
+        self._activate_window = timer.timed("activate", backend.activate_window)
+        self._wait_for_click = timer.timed("wait_for_click", backend.wait_for_click)
+        self._sleep = timer.timed("sleep", backend.sleep)
+        self._copy = timer.timed("copy", backend.hotkey)
+        self._batched = {
+            kind: timer.timed(phase, backend.run_actions)
+            for kind, phase in ACTION_PHASES.items()
+        }
+
+    def run_actions(self, actions, interruptible: bool = True) -> None:
+        # One action per batch, so each is timed under its own phase; the
+        # wrapped backend still runs it as a batch (no per-call PAUSE).
+        for action in actions:
+            if interruptible and self.stopped():
+                return
+            self._batched[action.kind](
+                (dataclasses.replace(action, delay=0.0),), interruptible
+            )
+            if action.delay:
+                self.sleep(action.delay)
+
+    def move_to(self, x: int, y: int) -> None:
+        self._move_to(x, y)
+
+    def left_click(self) -> None:
+        self._left_click()
+
+    def right_click(self) -> None:
+        self._right_click()
+
+    def press(self, key: str) -> None:
+        self._press(key)
+
+    def key_down(self, key: str) -> None:
+        self._key_down(key)
+
+    def key_up(self, key: str) -> None:
+        self._key_up(key)
+
+    def read_clipboard(self) -> str:
+        return self._read_clipboard()
+
+    def write_clipboard(self, text: str) -> None:
+        self._write_clipboard(text)
+
+    def activate_window(self, title: str) -> bool:
+        return self._activate_window(title)
+
+    def wait_for_click(self) -> Position | None:
+        return self._wait_for_click()
+
+    def sleep(self, seconds: float) -> None:
+        self._sleep(seconds)
+
+    def hotkey(self, *keys: str) -> None:
+        if keys == ("ctrl", "alt", "c"):
+            now = (time.perf_counter(), self.backend.now())
+            if self._iteration:
+                self.timer.wall["iteration"].append(now[0] - self._iteration[0])
+                self.timer.modelled["iteration"].append(now[1] - self._iteration[1])
+            self._iteration = now
+            self._copy(*keys)
+        else:
+            self.backend.hotkey(*keys)
+
+    def clipboard_sequence(self) -> int | None:
+        # Lets Bot.get_item_info wait on the sequence number instead of
+        # clearing and polling the clipboard, as with the real clipboard.
+        return self.backend.clipboard_sequence()
+
+    def now(self) -> float:
+        return self.backend.now()
+
+
+def summarize(samples: list[float]) -> dict:
+    if len(samples) > 1:
+        cuts = statistics.quantiles(samples, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = samples[0]
+    return {
+        "count": len(samples),
+        "mean": statistics.fmean(samples),
+        "p50": p50,
+        "p95": p95,
+        "p99": p99,
+        "total": sum(samples),
+    }
+
+
+def run_loop(name: str, runs: int, seed: int) -> dict:
+    sim = SimulatorBackend(seed, action_cost=PyAutoGuiBackend.PAUSE)
+    timer = PhaseTimer(sim.now)
+    recorder = RecordingBackend(sim)
+    Bot.set_backend(TimingBackend(recorder, timer))
+    patched = []
+
+    def patch(module, attr: str, phase: str):
+        original = getattr(module, attr)
+        patched.append((module, attr, original))
+        setattr(module, attr, timer.timed(phase, original))
+
+    try:
+        if name == "map":
+            patch(map_module, "process_item", "parse")
+            patch(map_module, "filter_mods_by_regex", "match")
+            patch(map_module, "filter_implicits", "match_implicits")
+            session = sim.session(**{"map-item": ITEM_POS})
+            for _ in range(runs):
+                sim.place_item(ITEM_POS, "map", "Rare")
+                map_module.craft_map(
+                    MAP_REGEXES, len(MAP_REGEXES), {"Item Quantity": 40}, session
+                )
+        elif name == "cluster":
+            patch(cluster_module, "process_cluster", "parse")
+            patch(cluster_module, "filter_mods_by_regex", "match")
+            session = sim.session(**{"button-location": CLUSTER_BUTTON})
+            for _ in range(runs):
+                sim.add_cluster_bench(CLUSTER_BUTTON)
+                cluster_module.craft_cluster(CLUSTER_REGEXES, session=session)
+        else:
+            patch(item_craft_module, "process_item_info", "parse")
+            program = item_craft_module.compile_steps(ITEM_STEPS)
+            program = dataclasses.replace(
+                program,
+                steps=tuple(
+                    (
+                        step
+                        if step.predicate is None
+                        else dataclasses.replace(
+                            step, predicate=timer.timed("match", step.predicate)
+                        )
+                    )
+                    for step in program.steps
+                ),
+            )
+            session = sim.session(**{"craft-item": ITEM_POS})
+            for _ in range(runs):
+                sim.place_item(ITEM_POS, "ring")
+                item_craft_module.craft_item_advanced(program, session)
+    finally:
+        for module, attr, original in patched:
+            setattr(module, attr, original)
+        Bot.set_backend(None)
+
+    return {
+        "iterations": len(timer.wall["iteration"]),
+        "timeline": [
+            [at, action.kind, list(action.args), action.delay]
+            for at, action in recorder.timeline[:TIMELINE_ENTRIES]
+        ],
+        "wall": {phase: summarize(s) for phase, s in sorted(timer.wall.items())},
+        "modelled": {
+            phase: summarize(s) for phase, s in sorted(timer.modelled.items())
+        },
+    }
+
+
+def print_loop(name: str, result: dict) -> None:
+    print(f"\n{name}: {result['iterations']:,} iterations")
+    print(
+        f"  {'phase':<16}{'count':>8}"
+        f"{'wall p50':>11}{'p95':>9}{'p99':>9}"
+        f"{'modelled p50':>15}{'p95':>9}{'p99':>9}"
+    )
+    for phase, wall in result["wall"].items():
+        modelled = result["modelled"][phase]
+        print(
+            f"  {phase:<16}{wall['count']:>8,}"
+            f"{wall['p50'] * 1e6:>9.1f}us{wall['p95'] * 1e6:>7.1f}us"
+            f"{wall['p99'] * 1e6:>7.1f}us"
+            f"{modelled['p50'] * 1e3:>13.1f}ms{modelled['p95'] * 1e3:>7.1f}ms"
+            f"{modelled['p99'] * 1e3:>7.1f}ms"
+        )
+
+
+def compare(results: dict, baseline_file: str) -> None:
+    with open(baseline_file, "r") as f:
+        baseline = json.load(f)
+    print(f"\nwall p50 change against {baseline_file}:")
+    for name, result in results["loops"].items():
+        old = baseline.get("loops", {}).get(name)
+        if not old:
+            continue
+        for phase, wall in result["wall"].items():
+            if phase in old["wall"] and old["wall"][phase]["p50"]:
+                change = wall["p50"] / old["wall"][phase]["p50"] - 1
+                print(f"  {name:<8}{phase:<16}{change:>+8.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output", default=os.path.join(BENCH_DIR, "results", "phases.json")
+    )
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    for module in (
+        "map_module",
+        "cluster_module",
+        "item_craft_module",
+        "pacing",
+        "bot_controller",
+    ):
+        logger.disable(module)
+    session_log.disable()
+    results = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": args.runs,
+            "seed": args.seed,
+            "pause": PyAutoGuiBackend.PAUSE,
+        },
+        "loops": {},
+    }
+    for name in ("map", "cluster", "item"):
+        results["loops"][name] = run_loop(name, args.runs, args.seed)
+        print_loop(name, results["loops"][name])
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Cost of the session log (session_log.py) to the craft loop, and what the
+writer keeps up with.
+
+    python -m benchmarks.bench_session_log [--attempts N] [--texts]
+
+Records --attempts simulated map chaos rolls into a temporary database: the
+time record() takes in the calling thread, how long the writer needs to get
+everything on disk, and the database size per attempt, without the raw item
+texts and, with --texts, again with them. Then runs the simulated map craft
+with and without the log and compares the CPU time per attempt.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.common import load_corpus  # noqa: F401 (sets up sys.path)
+from bot_controller import Bot
+from map_module import craft_map, process_item
+from mytypes import Position
+from simulator import SimulatorBackend
+from loguru import logger
+import session_log
+
+ITEM_POS = Position(600, 400)
+MAP_REGEXES = ["extra Physical Damage as Fire", "maximum Resistances"]
+
+
+def map_rolls(attempts: int, seed: int) -> list[tuple[str, list[str]]]:
+    """
+    Texts and parsed mods of simulated maps chaosed until both MAP_REGEXES
+    roll, like the craft loop reads them: nearly every roll is distinct.
+    """
+    sim = SimulatorBackend(seed)
+    rolls = []
+    item = None
+    while len(rolls) < attempts:
+        if item is None:
+            item = sim.place_item(ITEM_POS, "map", "Rare")
+        else:
+            sim.apply_currency("chaos", item)
+        text = sim.render(item)
+        mods = process_item(text)[0]
+        rolls.append((text, mods))
+        if all(any(regex in mod for mod in mods) for regex in MAP_REGEXES):
+            item = None
+    return rolls
+
+
+def bench_writer(
+    rolls: list[tuple[str, list[str]]], path: str, keep_texts: bool
+) -> None:
+    log = session_log.SessionLog(path, keep_texts)
+    job = log.start_job("bench")
+    costs = []
+    started = time.perf_counter()
+    for text, mods in rolls:
+        before = time.perf_counter()
+        log.record(job, text, mods, session_log.MISS, "chaos")
+        costs.append(time.perf_counter() - before)
+    recorded = time.perf_counter()
+    log.flush()
+    flushed = time.perf_counter()
+    log.close()
+    costs.sort()
+    attempts = len(rolls)
+    size = sum(
+        os.path.getsize(path + suffix)
+        for suffix in ("", "-wal")
+        if os.path.exists(path + suffix)
+    )
+    print(f"{'with' if keep_texts else 'without'} raw texts:")
+    print(
+        f"  record(): mean {statistics.mean(costs) * 1e6:.2f}us  "
+        f"p99 {costs[int(len(costs) * 0.99)] * 1e6:.2f}us  "
+        f"max {costs[-1] * 1e6:.0f}us"
+    )
+    print(
+        f"  writer: {attempts} attempts on disk "
+        f"{(flushed - started) * 1e3:.0f}ms after the first record() "
+        f"({attempts / (flushed - started):,.0f}/s, "
+        f"{(flushed - recorded) * 1e3:.0f}ms after the last)"
+    )
+    print(
+        f"  database: {size / 1024:.0f}KiB, {size / attempts:.0f} bytes/attempt "
+        f"for {len(set(text for text, _ in rolls))} distinct texts "
+        f"(raw texts average {statistics.mean(len(t) for t, _ in rolls):.0f} bytes)"
+    )
+    logged = sum(1 for _ in session_log.read_attempts(path))
+    assert logged == attempts, f"{logged} of {attempts} read back"
+
+
+def craft_cpu(crafts: int, seed: int) -> tuple[float, int]:
+    """
+    CPU seconds per chaos orb over `crafts` simulated map crafts.
+    """
+    sim = SimulatorBackend(seed)
+    Bot.set_backend(sim)
+    session = sim.session(**{"map-item": ITEM_POS})
+    attempts = 0
+
+    def attempt():
+        nonlocal attempts
+        attempts += 1
+
+    started = time.process_time()
+    for _ in range(crafts):
+        sim.place_item(ITEM_POS, "map", "Rare")
+        craft_map(
+            MAP_REGEXES,
+            len(MAP_REGEXES),
+            {"Item Quantity": 40},
+            session,
+            attempt_callback=attempt,
+        )
+    session_log.current().flush()
+    elapsed = time.process_time() - started
+    Bot.set_backend(None)
+    return elapsed / attempts, attempts
+
+
+def bench_loop(args, path: str) -> None:
+    for module in ("map_module", "pacing", "bot_controller"):
+        logger.disable(module)
+    session_log.disable()
+    off, attempts = craft_cpu(args.crafts, args.seed)
+    session_log.set_current(session_log.SessionLog(path))
+    on, _ = craft_cpu(args.crafts, args.seed)
+    session_log.disable()
+    print(
+        f"map craft, {attempts} chaos: {off * 1e6:.0f}us CPU per attempt without "
+        f"the log, {on * 1e6:.0f}us with it (writer included)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--attempts", type=int, default=100_000)
+    parser.add_argument(
+        "--texts", action="store_true", help="Also measure with raw texts kept"
+    )
+    parser.add_argument("--crafts", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        rolls = map_rolls(args.attempts, args.seed)
+        bench_writer(rolls, os.path.join(tmp, "writer.sqlite3"), False)
+        if args.texts:
+            bench_writer(rolls, os.path.join(tmp, "texts.sqlite3"), True)
+        bench_loop(args, os.path.join(tmp, "loop.sqlite3"))
+
+
+if __name__ == "__main__":
+    main()
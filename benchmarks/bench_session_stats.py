@@ -0,0 +1,124 @@
+"""
+Throughput and peak memory of session_stats over generated session logs, in
+one process and fanned out over a process pool.
+
+    python -m benchmarks.bench_session_stats [--logs 4] [--attempts 250000]
+
+Writes --logs logs of --attempts simulated map chaos rolls each to a
+temporary directory, then summarizes one log, then all of them in one process
+and with the pool (one worker per CPU by default), each in a fresh process so
+its peak RSS is its own. Peak RSS that stays flat from one log to all of them
+is the bounded-memory check.
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.common import load_corpus  # noqa: F401 (sets up sys.path)
+from mytypes import Position
+from simulator import SimulatorBackend
+from loguru import logger
+import session_log
+import session_stats
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ITEM_POS = Position(600, 400)
+TARGETS = ("extra Physical Damage as Fire", "maximum Resistances")
+
+
+def write_log(path: str, attempts: int, seed: int) -> None:
+    """
+    Chaos simulated maps until both TARGETS roll, like a long map session.
+    """
+    sim = SimulatorBackend(seed)
+    log = session_log.SessionLog(path)
+    job = log.start_job("map")
+    item = None
+    orbs = 0
+    for _ in range(attempts):
+        if item is None:
+            item = sim.place_item(ITEM_POS, "map", "Rare")
+            orbs = 0
+        else:
+            sim.apply_currency("chaos", item)
+            orbs += 1
+        mods = [line for rolled in item.mods for line in rolled.lines]
+        matched = all(any(t in line for line in mods) for t in TARGETS)
+        log.record(
+            job,
+            sim.render(item),
+            mods,
+            "matched" if matched else session_log.MISS,
+            "chaos" if orbs else None,
+        )
+        if matched:
+            item = None
+    log.close(timeout=None)
+
+
+def measure(paths: list[str], processes: int | None) -> tuple[float, int, int]:
+    """
+    Runs in a fresh process: seconds, attempts and peak RSS in KiB (the
+    largest of this process and its pool workers).
+    """
+    logger.disable("session_stats")
+    started = time.perf_counter()
+    stats = session_stats.summarize(paths, TARGETS, processes=processes)
+    elapsed = time.perf_counter() - started
+    peak = 0
+    if resource:
+        peak = max(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+        )
+    return elapsed, stats.attempts, peak
+
+
+def run(name: str, paths: list[str], processes: int | None) -> None:
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(1, mp_context=context) as pool:
+        elapsed, attempts, peak = pool.submit(measure, paths, processes).result()
+    rss = f"peak RSS {peak / 1024:.0f}MiB" if peak else "peak RSS n/a"
+    print(
+        f"{name:<24} {attempts:>10,} attempts in {elapsed:6.2f}s  "
+        f"{attempts / elapsed:>10,.0f}/s  {rss}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logs", type=int, default=4)
+    parser.add_argument("--attempts", type=int, default=250_000)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, f"session{i}.sqlite3") for i in range(args.logs)]
+        started = time.perf_counter()
+        # In workers: a fork inherits the peak RSS of its parent, so the
+        # parent stays small for the measurements.
+        with ProcessPoolExecutor(
+            mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            for i, path in enumerate(paths):
+                pool.submit(write_log, path, args.attempts, args.seed + i)
+        size = sum(os.path.getsize(path) for path in paths)
+        print(
+            f"wrote {args.logs} x {args.attempts:,} attempts "
+            f"({size / 2**20:.0f}MiB) in {time.perf_counter() - started:.0f}s"
+        )
+        run("1 log", paths[:1], 1)
+        run(f"{args.logs} logs, 1 process", paths, 1)
+        run(f"{args.logs} logs, pool", paths, args.processes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+End-to-end attempts/sec of the map, cluster and item craft loops against the
+simulated game client.
+
+    python -m benchmarks.bench_simulator [--runs N] [--seed S]
+        [--pacing adaptive|fixed] [--pause SECONDS] [--latency SECONDS] [--hold]
+
+--pause is charged to the virtual clock per input call (pyautogui.PAUSE) and
+--latency is how long the simulated game takes to show a changed item.
+`--pacing fixed --pause 0.05` reproduces the old fixed 0.1s sleeps.
+"""
+
+import argparse
+import time
+
+from benchmarks.common import load_corpus  # noqa: F401 (sets up sys.path)
+from bot_backend import PyAutoGuiBackend
+from bot_controller import Bot
+from cluster_module import craft_cluster
+from item_craft_module import CraftingStep, craft_item_advanced
+from map_module import craft_map
+from mytypes import Position
+from pacing import AdaptivePacer, FixedPacer
+from simulator import SimulatorBackend
+from loguru import logger
+import session_log
+
+ITEM_POS = Position(600, 400)
+CLUSTER_BUTTON = Position(800, 500)
+
+MAP_REGEXES = ["extra Physical Damage as Fire", "maximum Resistances"]
+CLUSTER_REGEXES = ["Burning Bright", "Prismatic Heart"]
+ITEM_STEPS = [
+    CraftingStep("", "transmutation", on_success=1, auto_success=True),
+    CraftingStep(
+        "maximum Life", "alteration", on_failure=1, on_success=2, max_attempts=10_000
+    ),
+    CraftingStep("", "regal", on_success=3, auto_success=True),
+    CraftingStep("", "scouring", on_success=4, auto_success=True),
+]
+
+
+def report(name: str, runs: int, attempts: int, wall: float, sim: SimulatorBackend):
+    print(
+        f"{name:<8} {runs} runs, {attempts:,} attempts in {wall:.2f}s: "
+        f"{attempts / wall:,.0f} attempts/s, {sim.counts['ctrl+alt+c']:,} copies, "
+        f"{sim.clock:.0f}s virtual: {attempts / sim.clock:.2f} attempts/virtual s"
+    )
+
+
+def new_simulator(args) -> SimulatorBackend:
+    sim = SimulatorBackend(
+        args.seed, action_cost=args.pause, response_latency=args.latency
+    )
+    Bot.set_backend(sim)
+    if args.pacing == "fixed":
+        # Old loops: no wait after a copy or a map chaos, 0.1s otherwise.
+        Bot.set_pacer(FixedPacer(0.1, {"copy": 0.0, "chaos": 0.0}))
+    else:
+        Bot.set_pacer(AdaptivePacer())
+    return sim
+
+
+def bench_map(runs: int, args) -> None:
+    sim = new_simulator(args)
+    session = sim.session(**{"map-item": ITEM_POS})
+    start = time.perf_counter()
+    for _ in range(runs):
+        sim.place_item(ITEM_POS, "map", "Rare")
+        craft_map(
+            MAP_REGEXES,
+            len(MAP_REGEXES),
+            {"Item Quantity": 40},
+            session,
+            hold_currency=args.hold,
+        )
+    report("map", runs, sim.counts["chaos"], time.perf_counter() - start, sim)
+
+
+def bench_cluster(runs: int, args) -> None:
+    sim = new_simulator(args)
+    session = sim.session(**{"button-location": CLUSTER_BUTTON})
+    start = time.perf_counter()
+    for _ in range(runs):
+        sim.add_cluster_bench(CLUSTER_BUTTON)
+        craft_cluster(CLUSTER_REGEXES, session=session)
+    attempts = sim.counts["cluster_reroll"]
+    report("cluster", runs, attempts, time.perf_counter() - start, sim)
+
+
+def bench_item(runs: int, args) -> None:
+    sim = new_simulator(args)
+    session = sim.session(**{"craft-item": ITEM_POS})
+    attempts = 0
+    saved = 0.0
+    start = time.perf_counter()
+    for _ in range(runs):
+        sim.place_item(ITEM_POS, "ring")
+        stats = craft_item_advanced(ITEM_STEPS, session, hold_currency=args.hold)
+        attempts += stats.attempts
+        saved += stats.held_saving
+    report("item", runs, attempts, time.perf_counter() - start, sim)
+    if args.hold:
+        print(f"{'':<8} holding currency saved {saved:.1f}s virtual")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pacing", choices=("adaptive", "fixed"), default="adaptive")
+    parser.add_argument("--pause", type=float, default=PyAutoGuiBackend.PAUSE)
+    parser.add_argument("--latency", type=float, default=0.03)
+    parser.add_argument(
+        "--hold", action="store_true", help="Apply currency with shift held"
+    )
+    args = parser.parse_args()
+
+    for module in (
+        "map_module",
+        "cluster_module",
+        "item_craft_module",
+        "pacing",
+        "bot_controller",
+        "held_currency",
+    ):
+        logger.disable(module)
+    session_log.disable()
+    bench_map(args.runs, args)
+    bench_cluster(args.runs, args)
+    bench_item(args.runs, args)
+    Bot.set_backend(None)
+    Bot.set_pacer(None)
+
+
+if __name__ == "__main__":
+    main()
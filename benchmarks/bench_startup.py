@@ -0,0 +1,169 @@
+"""
+Cold start of the GUI: import-time breakdown and time to first paint.
+
+    python -m benchmarks.bench_startup [--runs 5] [--top 12] [--eager]
+
+Every run is a fresh interpreter that imports main, builds the window the way
+`python main.py` does and quits on the first paint event. "first paint" is
+wall time from spawning the process, so it includes interpreter startup.
+--eager builds every page before showing the window, as main.py used to.
+Runs on the offscreen Qt platform unless QT_QPA_PLATFORM is set.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.common import BENCH_DIR
+
+ROOT = os.path.dirname(BENCH_DIR)
+
+# Not needed to show the window; listed if they were loaded by first paint.
+DEFERRED = (
+    "bot_controller",
+    "bot_backend",
+    "job_executor",
+    "loguru",
+    "pyautogui",
+    "pygetwindow",
+    "pynput",
+    "pyperclip",
+    "keyboard",
+    "cluster_module",
+    "map_module",
+    "item_craft_module",
+    "session_log",
+    "session_stats",
+)
+
+MARKER = "bench_startup: importing main"
+PAINT_MARKER = "bench_startup: first paint"
+_IMPORTTIME_RGX = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def child(eager: bool) -> None:
+    """
+    Run in the spawned interpreter: start the app, report on first paint.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    # Imports before the marker are the benchmark's own.
+    print(MARKER, file=sys.stderr, flush=True)
+    start = time.perf_counter()
+    import main
+    from PySide6.QtCore import QEvent, QObject, QTimer
+
+    imported = time.perf_counter()
+    app = main.create_app([])
+    window = main.MainWindow()
+    if eager:
+        for index in range(len(main.PAGES)):
+            window.page(index)
+    built = time.perf_counter()
+    report = {}
+
+    class FirstPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint and not report:
+                print(PAINT_MARKER, file=sys.stderr, flush=True)
+                report.update(
+                    painted=time.time(),
+                    import_main=imported - start,
+                    build_window=built - imported,
+                    show_to_paint=time.perf_counter() - built,
+                    loaded=[name for name in DEFERRED if name in sys.modules],
+                )
+                QTimer.singleShot(0, app.quit)
+            return False
+
+    first_paint = FirstPaint()
+    app.installEventFilter(first_paint)
+    window.show()
+    app.exec()
+    print(json.dumps(report), flush=True)
+
+
+def spawn(eager: bool, importtime: bool = False) -> tuple[dict, str]:
+    args = [sys.executable]
+    if importtime:
+        args += ["-X", "importtime"]
+    args += ["-m", "benchmarks.bench_startup", "--child"]
+    if eager:
+        args.append("--eager")
+    spawned = time.time()
+    result = subprocess.run(args, cwd=ROOT, capture_output=True, text=True)
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        sys.exit(f"startup failed:\n{result.stderr[-2000:]}")
+    report = json.loads(lines[-1])
+    report["first_paint"] = report.pop("painted") - spawned
+    return report, result.stderr
+
+
+def import_breakdown(stderr: str) -> list[tuple[str, int, int]]:
+    """
+    (module, depth, cumulative us) from -X importtime output. Lines are in
+    post-order: a module is printed after everything it imported.
+    """
+    entries = []
+    stderr = stderr[stderr.find(MARKER) : stderr.find(PAINT_MARKER)]
+    for line in stderr.splitlines():
+        if match := _IMPORTTIME_RGX.match(line):
+            _, cumulative, indent, name = match.groups()
+            entries.append((name, (len(indent) - 1) // 2, int(cumulative)))
+    return entries
+
+
+def print_breakdown(entries: list[tuple[str, int, int]], top: int) -> None:
+    total = sum(cumulative for _, depth, cumulative in entries if depth == 0)
+    print(f"imports before first paint: {total / 1e3:.0f}ms")
+    # Direct imports of main, then what building the window imported.
+    rows = []
+    pending = []
+    for name, depth, cumulative in entries:
+        if depth == 1:
+            pending.append((name, cumulative))
+        elif depth == 0:
+            if name == "main":
+                rows += [(f"main > {child}", us) for child, us in pending]
+            else:
+                rows.append((name, cumulative))
+            pending = []
+    rows.sort(key=lambda row: row[1], reverse=True)
+    for name, cumulative in rows[:top]:
+        print(f"  {cumulative / 1e3:7.1f}ms  {name}")
+
+
+def ms(values: list[float]) -> str:
+    median = statistics.median(values)
+    return f"median {median * 1e3:6.0f}ms  max {max(values) * 1e3:6.0f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--eager", action="store_true")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.eager)
+        return
+
+    report, stderr = spawn(args.eager, importtime=True)
+    print_breakdown(import_breakdown(stderr), args.top)
+    loaded = ", ".join(report["loaded"]) or "none"
+    print(f"deferred modules loaded by first paint: {loaded}")
+
+    reports = [spawn(args.eager)[0] for _ in range(args.runs)]
+    print(f"\n{args.runs} runs{' (eager pages)' if args.eager else ''}:")
+    for key in ("import_main", "build_window", "show_to_paint", "first_paint"):
+        print(f"  {key:<14} {ms([report[key] for report in reports])}")
+
+
+if __name__ == "__main__":
+    main()
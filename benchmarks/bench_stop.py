@@ -0,0 +1,109 @@
+"""
+How long a craft job keeps going after the killswitch, against a simulator
+that runs in real time.
+
+    python -m benchmarks.bench_stop [--samples N] [--seed S] [--legacy]
+
+Each sample starts a map craft that never matches, presses the killswitch
+after a random delay and measures the time until the job returns, plus the
+chaos orbs applied after the press. --legacy reproduces the old killswitch:
+uninterruptible sleeps and batches with the old fixed waits.
+"""
+
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from benchmarks.common import load_corpus  # noqa: F401 (sets up sys.path)
+from bot_backend import PyAutoGuiBackend
+from bot_controller import Bot
+from map_module import craft_map
+from mytypes import Position
+from pacing import AdaptivePacer, FixedPacer
+from simulator import SimulatorBackend
+from loguru import logger
+import session_log
+
+ITEM_POS = Position(600, 400)
+
+
+class RealtimeSimulator(SimulatorBackend):
+    """
+    Pays action_cost and sleeps in wall time, like the real client.
+    """
+
+    def _tick(self) -> None:
+        super()._tick()
+        time.sleep(self.action_cost)
+
+    def sleep(self, seconds: float) -> None:
+        start = time.perf_counter()
+        if self.stop is None:
+            time.sleep(seconds)
+        else:
+            self.stop.wait(seconds)
+        self.clock += time.perf_counter() - start
+
+
+def sample(sim: SimulatorBackend, session, delay: float) -> tuple[float, int]:
+    sim.place_item(ITEM_POS, "map", "Rare")
+    job = threading.Thread(
+        target=craft_map, args=([], 0, {"Item Quantity": 1000}, session)
+    )
+    job.start()
+    time.sleep(delay)
+    chaos = sim.counts["chaos"]
+    Bot.toggle_killswitch()
+    pressed = time.perf_counter()
+    job.join()
+    latency = time.perf_counter() - pressed
+    Bot.toggle_killswitch()
+    return latency, sim.counts["chaos"] - chaos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.03)
+    parser.add_argument("--legacy", action="store_true")
+    args = parser.parse_args()
+
+    for module in ("map_module", "pacing", "bot_controller"):
+        logger.disable(module)
+    session_log.disable()
+    sim = RealtimeSimulator(
+        args.seed,
+        action_cost=PyAutoGuiBackend.PAUSE,
+        response_latency=args.latency,
+    )
+    Bot.set_backend(sim)
+    if args.legacy:
+        sim.stop = None
+        Bot.set_pacer(FixedPacer(0.1, {"copy": 0.0, "chaos": 0.0}))
+    else:
+        Bot.set_pacer(AdaptivePacer())
+    session = sim.session(**{"map-item": ITEM_POS})
+    rng = random.Random(args.seed)
+    latencies = []
+    overwritten = 0
+    for _ in range(args.samples):
+        latency, chaos = sample(sim, session, rng.uniform(0.2, 0.5))
+        latencies.append(latency)
+        overwritten += chaos
+    latencies.sort()
+    print(
+        f"{'legacy' if args.legacy else 'event'} killswitch, {args.samples} stops: "
+        f"median {statistics.median(latencies) * 1e3:.1f}ms, "
+        f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1e3:.1f}ms, "
+        f"max {latencies[-1] * 1e3:.1f}ms, {overwritten} chaos applied after the "
+        "press"
+    )
+    Bot.set_backend(None)
+    Bot.set_pacer(None)
+
+
+if __name__ == "__main__":
+    main()
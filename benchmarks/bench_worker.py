@@ -0,0 +1,136 @@
+"""
+Attempt-interval jitter of the map craft loop with a busy GUI in the same
+process, and with the loop isolated in a worker process (craft_worker.py).
+
+    python -m benchmarks.bench_worker [--attempts N] [--load 0.5] [--seed S]
+
+The craft runs against a simulator that runs in real time. A stand-in GUI
+thread spends --load of every 60Hz frame in Python (item delegates, samplers,
+tooltips), holding the GIL. "thread" runs the craft on the job executor next
+to it, as the GUI does by default; "process" runs it in a CraftWorker while the
+GUI thread keeps going and polls the worker's status block.
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+from benchmarks.bench_stop import RealtimeSimulator
+from bot_backend import PyAutoGuiBackend
+from bot_controller import Bot
+from craft_worker import CraftWorker
+from map_module import craft_map
+from mytypes import Position
+import job_executor
+import session_log
+from loguru import logger
+
+ITEM_POS = Position(600, 400)
+MAP_REGEXES = ["extra Physical Damage as Fire", "maximum Resistances"]
+FRAME = 1 / 60
+
+
+def timed_craft(attempts: int) -> list[float]:
+    """
+    Seconds between consecutive chaos orbs within each craft, over as many
+    crafts as it takes. Runs in whichever process has the simulator backend.
+    """
+    for module in ("map_module", "pacing", "bot_controller", "held_currency"):
+        logger.disable(module)
+    session_log.disable()
+    sim = Bot.backend()
+    session = sim.session(**{"map-item": ITEM_POS})
+    intervals: list[float] = []
+    while len(intervals) < attempts:
+        stamps: list[float] = []
+        sim.place_item(ITEM_POS, "map", "Rare")
+        craft_map(
+            MAP_REGEXES,
+            len(MAP_REGEXES),
+            {"Item Quantity": 40},
+            session,
+            attempt_callback=lambda: stamps.append(time.perf_counter()),
+        )
+        intervals += [later - earlier for earlier, later in zip(stamps, stamps[1:])]
+    return intervals[:attempts]
+
+
+def busy_gui(load: float, stop: threading.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        while time.perf_counter() - start < FRAME * load:
+            pass
+        stop.wait(FRAME * (1 - load))
+
+
+def new_simulator(args) -> RealtimeSimulator:
+    return RealtimeSimulator(
+        args.seed, action_cost=PyAutoGuiBackend.PAUSE, response_latency=args.latency
+    )
+
+
+def in_thread(args) -> list[float]:
+    Bot.set_backend(new_simulator(args))
+    done = threading.Event()
+
+    def listener(job: job_executor.Job) -> None:
+        if job.state not in (job_executor.QUEUED, job_executor.RUNNING):
+            done.set()
+
+    executor = job_executor.executor()
+    executor.add_listener(listener)
+    job = executor.submit("jitter", timed_craft, args.attempts)
+    done.wait()
+    executor.remove_listener(listener)
+    Bot.set_backend(None)
+    return job.result
+
+
+def in_process(args) -> list[float]:
+    worker = CraftWorker(backend=new_simulator(args))
+    try:
+        return worker.run(timed_craft, args.attempts)
+    finally:
+        worker.close()
+
+
+def report(name: str, intervals: list[float]) -> None:
+    ordered = sorted(intervals)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1e3
+
+    print(
+        f"{name:<22} mean {statistics.mean(ordered) * 1e3:6.1f}ms  "
+        f"stdev {statistics.stdev(ordered) * 1e3:5.2f}ms  p50 {percentile(0.5):6.1f}  "
+        f"p99 {percentile(0.99):6.1f}  max {ordered[-1] * 1e3:6.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--attempts", type=int, default=300)
+    parser.add_argument("--load", type=float, default=0.5)
+    parser.add_argument("--latency", type=float, default=0.03)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logger.disable("job_executor")
+
+    report("thread, idle GUI", in_thread(args))
+    for name, run in (
+        ("thread, busy GUI", in_thread),
+        ("process, busy GUI", in_process),
+    ):
+        stop = threading.Event()
+        gui = threading.Thread(target=busy_gui, args=(args.load, stop), daemon=True)
+        gui.start()
+        try:
+            report(name, run(args))
+        finally:
+            stop.set()
+            gui.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import os
+import sys
+import time
+from typing import Callable
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+
+# Benchmarks import the application modules the same way main.py does.
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+
+def load_corpus() -> dict[str, str]:
+    corpus = {}
+    for filename in sorted(os.listdir(CORPUS_DIR)):
+        if filename.endswith(".txt"):
+            with open(os.path.join(CORPUS_DIR, filename), "r", encoding="utf-8") as f:
+                corpus[filename[:-4]] = f.read()
+    return corpus
+
+
+def measure_rate(func: Callable[[], object], duration: float = 1.0) -> float:
+    """
+    Call func repeatedly for roughly `duration` seconds and return calls/sec.
+    """
+    batch = 1
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < duration:
+        for _ in range(batch):
+            func()
+        calls += batch
+        batch = min(batch * 2, 4096)
+        elapsed = time.perf_counter() - start
+    return calls / elapsed
@@ -0,0 +1,242 @@
+import json
+import re
+from typing import Iterable
+from craft_engine import ABORT, CompiledStep, CraftProgram
+from mod_matcher import ModMatcher
+from loguru import logger
+
+
+class BlueprintError(ValueError):
+    def __init__(self, problems: list[str]):
+        super().__init__("\n".join(problems))
+        self.problems = problems
+
+
+class AnyMatch:
+    """OR: at least one condition regex matches a mod."""
+
+    __slots__ = ("matcher",)
+
+    def __init__(self, matcher: ModMatcher):
+        self.matcher = matcher
+
+    def __call__(self, mods: list[str]) -> bool:
+        return self.matcher.matches_any(mods)
+
+
+class AllMatch(AnyMatch):
+    """AND: every condition regex matches some mod."""
+
+    __slots__ = ()
+
+    def __call__(self, mods: list[str]) -> bool:
+        return self.matcher.matches_all(mods)
+
+
+class NoMatch(AnyMatch):
+    """NOT: no condition regex matches any mod."""
+
+    __slots__ = ()
+
+    def __call__(self, mods: list[str]) -> bool:
+        return not self.matcher.matches_any(mods)
+
+
+PREDICATES = {"AND": AllMatch, "OR": AnyMatch, "NOT": NoMatch}
+
+
+def _is_int(value) -> bool:
+    # bool is an int subclass, but True is not a count or a step number.
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _conditions(config: dict, label: str, problems: list[str]) -> list[str]:
+    condition = config.get("condition", "")
+    if isinstance(condition, str):
+        condition = [condition]
+    if not isinstance(condition, list) or not all(
+        isinstance(regex, str) for regex in condition
+    ):
+        problems.append(f"{label}: condition must be a regex or a list of regexes")
+        return []
+    return [regex.strip() for regex in condition if regex.strip()]
+
+
+def _step_target(
+    config: dict, kind: str, label: str, total: int, problems: list[str]
+) -> int:
+    """
+    Index of the step numbered by config[f"{kind}_step"] (1-based).
+    """
+    number = config.get(f"{kind}_step", 1)
+    if not _is_int(number):
+        problems.append(f"{label}: invalid {kind} step {number!r}")
+        return 0
+    if not 1 <= number <= total:
+        problems.append(f"{label}: {kind} step #{number} out of range")
+        return 0
+    return number - 1
+
+
+def _targets(
+    index: int, config: dict, total: int, label: str, problems: list[str]
+) -> tuple[int, int]:
+    """
+    Success and failure targets of a step, mirroring the StepWidget checkboxes.
+    """
+    if config.get("success_gostep", False):
+        on_success = _step_target(config, "success", label, total, problems)
+    else:
+        on_success = index + 1
+    if config.get("failure_gostep", False):
+        on_failure = _step_target(config, "failure", label, total, problems)
+    elif config.get("failure_restart", False):
+        on_failure = 0
+    elif config.get("failure_loop", True):
+        on_failure = index
+    else:
+        on_failure = ABORT
+    return on_success, on_failure
+
+
+def _free_edges(step: CompiledStep) -> list[int]:
+    """
+    Transitions a step can take without applying any currency.
+    """
+    edges = []
+    if step.predicate is not None:
+        edges.append(step.on_success)
+    if step.max_attempts == 0:
+        edges.append(step.on_failure)
+    return edges
+
+
+def _check_graph(steps: tuple[CompiledStep, ...], problems: list[str]) -> None:
+    total = len(steps)
+
+    def edges(step: CompiledStep) -> list[int]:
+        if step.predicate is None and step.max_attempts > 0:
+            return [step.on_success]
+        if step.predicate is None:
+            return [step.on_failure]
+        return [step.on_success, step.on_failure]
+
+    reachable = {0}
+    pending = [0]
+    while pending:
+        for target in edges(steps[pending.pop()]):
+            if 0 <= target < total and target not in reachable:
+                reachable.add(target)
+                pending.append(target)
+    for index in range(total):
+        if index not in reachable:
+            logger.warning(f"Blueprint step {index + 1} is unreachable")
+
+    # Steps that can eventually finish or abort the sequence.
+    exits = set()
+    changed = True
+    while changed:
+        changed = False
+        for index in reachable - exits:
+            if any(t >= total or t == ABORT or t in exits for t in edges(steps[index])):
+                exits.add(index)
+                changed = True
+    for index in sorted(reachable - exits):
+        problems.append(f"Step {index + 1} loops forever: no path ends the sequence")
+
+    # Cycles that can spin without applying currency never make progress.
+    done: set[int] = set()
+    for start in sorted(reachable):
+        if start in done:
+            continue
+        path = [start]
+        stack = [iter(_free_edges(steps[start]))]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                done.add(path.pop())
+                stack.pop()
+            elif child in path:
+                cycle = " -> ".join(str(i + 1) for i in path[path.index(child) :])
+                problems.append(
+                    f"Steps {cycle} -> {child + 1} can cycle without applying currency"
+                )
+            elif 0 <= child < total and child not in done:
+                path.append(child)
+                stack.append(iter(_free_edges(steps[child])))
+
+
+def compile_blueprint(
+    blueprint: list[dict], currencies: Iterable[str] | None = None
+) -> CraftProgram:
+    """
+    Validate blueprint JSON (as written by ItemsPage.save_blueprint) and turn
+    it into a CraftProgram with its condition regexes compiled once.
+    Raises BlueprintError listing every problem found.
+    """
+    if not isinstance(blueprint, list):
+        raise BlueprintError(["Blueprint is not a list of steps"])
+    known = set(currencies) if currencies is not None else None
+    problems: list[str] = []
+    steps: list[CompiledStep] = []
+    total = len(blueprint)
+    if not total:
+        raise BlueprintError(["Blueprint has no steps"])
+
+    for index, config in enumerate(blueprint):
+        label = f"Step {index + 1}"
+        if not isinstance(config, dict):
+            problems.append(f"{label}: not an object")
+            continue
+        method = config.get("method")
+        if (
+            not isinstance(method, str)
+            or not method
+            or (known is not None and method not in known)
+        ):
+            problems.append(f"{label}: unknown currency {method!r}")
+        max_attempts = config.get("max_attempts", 10)
+        if not _is_int(max_attempts) or max_attempts < 0:
+            problems.append(f"{label}: invalid max_attempts {max_attempts!r}")
+            max_attempts = 0
+        on_success, on_failure = _targets(index, config, total, label, problems)
+
+        predicate = None
+        regexes = _conditions(config, label, problems)
+        if not config.get("auto_success", False):
+            logic = config.get("logic", "AND")
+            if not isinstance(logic, str) or logic not in PREDICATES:
+                problems.append(f"{label}: unknown logic {logic!r}")
+                logic = "AND"
+            try:
+                matcher = ModMatcher(regexes, re.IGNORECASE)
+            except re.error as e:
+                problems.append(f"{label}: invalid regex ({e})")
+            else:
+                predicate = PREDICATES[logic](matcher)
+            if not regexes:
+                problems.append(f"{label}: no condition and not automatic success")
+
+        steps.append(
+            CompiledStep(
+                currency=method,
+                predicate=predicate,
+                on_success=on_success,
+                on_failure=on_failure,
+                max_attempts=max_attempts,
+                label=" / ".join(regexes) or method or "",
+            )
+        )
+
+    if not problems:
+        _check_graph(tuple(steps), problems)
+    if problems:
+        raise BlueprintError(problems)
+    return CraftProgram(tuple(steps))
+
+
+def load_blueprint(
+    filename: str, currencies: Iterable[str] | None = None
+) -> CraftProgram:
+    with open(filename, "r") as f:
+        return compile_blueprint(json.load(f), currencies)
@@ -0,0 +1,196 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from mytypes import Position
+
+
+class BotBackend(ABC):
+    """
+    Mouse, keyboard, clipboard and window operations used by Bot. Craft loops
+    never talk to the OS directly, so a backend can be swapped for a
+    simulator (see simulator.py).
+    """
+
+    # Set by Bot to its stop event (killswitch or job cancelled): sleeps
+    # return as soon as it is set and batches stop between actions.
+    stop: threading.Event | None = None
+
+    def stopped(self) -> bool:
+        return self.stop is not None and self.stop.is_set()
+
+    @abstractmethod
+    def move_to(self, x: int, y: int) -> None: ...
+
+    @abstractmethod
+    def left_click(self) -> None: ...
+
+    @abstractmethod
+    def right_click(self) -> None: ...
+
+    @abstractmethod
+    def press(self, key: str) -> None: ...
+
+    @abstractmethod
+    def hotkey(self, *keys: str) -> None: ...
+
+    @abstractmethod
+    def key_down(self, key: str) -> None: ...
+
+    @abstractmethod
+    def key_up(self, key: str) -> None: ...
+
+    @abstractmethod
+    def read_clipboard(self) -> str: ...
+
+    @abstractmethod
+    def write_clipboard(self, text: str) -> None: ...
+
+    def clipboard_sequence(self) -> int | None:
+        """
+        A number that changes on every clipboard write, or None if the
+        backend cannot tell.
+        """
+        return None
+
+    @abstractmethod
+    def activate_window(self, title: str) -> bool:
+        """
+        Bring the window with the given title to the foreground.
+        Returns False if no such window exists.
+        """
+
+    @abstractmethod
+    def wait_for_click(self) -> Position | None:
+        """
+        Block until the user clicks and return the clicked position.
+        """
+
+    @property
+    def window_enumerations(self) -> int:
+        """
+        Top-level window enumerations performed so far.
+        """
+        return 0
+
+    def run_actions(self, actions, interruptible: bool = True) -> None:
+        """
+        Execute a batch of input_actions.Action in order, sleeping each
+        action's delay after it. An interruptible batch stops before the next
+        action once the stop event is set.
+        """
+        for action in actions:
+            if interruptible and self.stopped():
+                return
+            getattr(self, action.kind)(*action.args)
+            if action.delay:
+                self.sleep(action.delay)
+
+    def sleep(self, seconds: float) -> None:
+        if self.stop is None:
+            time.sleep(seconds)
+        else:
+            self.stop.wait(seconds)
+
+    def now(self) -> float:
+        return time.perf_counter()
+
+
+class PyAutoGuiBackend(BotBackend):
+    """
+    Drives the real game client through pyautogui, pygetwindow, pynput and
+    the native clipboard (see clipboard.py). The libraries are imported on
+    construction so that importing the bot layer does not require them
+    (pygetwindow only supports Windows).
+    """
+
+    # Delay pyautogui adds after every call. Only needs to keep input events
+    # apart: waiting for the game is left to the pacer (see pacing.py).
+    PAUSE = 0.01
+
+    def __init__(self):
+        import pyautogui
+        import pygetwindow
+        from pynput import mouse
+        from clipboard import system_clipboard
+        from window_manager import WindowManager
+
+        self.pyautogui = pyautogui
+        self.clipboard = system_clipboard()
+        self.windows = WindowManager(pygetwindow.getWindowsWithTitle, pyautogui.press)
+        self.mouse = mouse
+        pyautogui.PAUSE = self.PAUSE
+
+    def move_to(self, x: int, y: int) -> None:
+        self.pyautogui.moveTo(x, y)
+
+    def left_click(self) -> None:
+        self.pyautogui.leftClick()
+
+    def right_click(self) -> None:
+        self.pyautogui.rightClick()
+
+    def press(self, key: str) -> None:
+        self.pyautogui.press(key)
+
+    def hotkey(self, *keys: str) -> None:
+        self.pyautogui.hotkey(*keys)
+
+    def key_down(self, key: str) -> None:
+        self.pyautogui.keyDown(key)
+
+    def key_up(self, key: str) -> None:
+        self.pyautogui.keyUp(key)
+
+    def read_clipboard(self) -> str:
+        return self.clipboard.read()
+
+    def write_clipboard(self, text: str) -> None:
+        self.clipboard.write(text)
+
+    def clipboard_sequence(self) -> int | None:
+        return self.clipboard.sequence()
+
+    def run_actions(self, actions, interruptible: bool = True) -> None:
+        # No PAUSE between the batch's actions: each carries its own delay
+        # instead. Every call still does pyautogui's own failsafe check.
+        pyautogui = self.pyautogui
+        calls = {
+            "move_to": pyautogui.moveTo,
+            "left_click": pyautogui.leftClick,
+            "right_click": pyautogui.rightClick,
+            "press": pyautogui.press,
+            "hotkey": pyautogui.hotkey,
+            "key_down": pyautogui.keyDown,
+            "key_up": pyautogui.keyUp,
+        }
+        for action in actions:
+            if interruptible and self.stopped():
+                return
+            calls[action.kind](*action.args, _pause=False)
+            if action.delay:
+                if interruptible:
+                    self.sleep(action.delay)
+                else:
+                    time.sleep(action.delay)
+
+    def activate_window(self, title: str) -> bool:
+        return self.windows.activate(title)
+
+    @property
+    def window_enumerations(self) -> int:
+        return self.windows.enumerations
+
+    def wait_for_click(self) -> Position | None:
+        clicked: list[Position] = []
+
+        def click_callback(x, y, button, pressed) -> bool:
+            # Finish on the release, so that a listener started right after
+            # (e.g. for the second grid corner) does not see it.
+            if pressed:
+                return True
+            clicked.append(Position(x, y))
+            return False
+
+        with self.mouse.Listener(on_click=click_callback) as listener:
+            listener.join()
+        return clicked[0] if clicked else None
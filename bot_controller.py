@@ -1,67 +1,260 @@
-import pyautogui
-import pyperclip
-import pygetwindow as gw
 from loguru import logger
-from pynput import mouse
 from mytypes import Position
-from typing import Any
+from bot_backend import BotBackend, PyAutoGuiBackend
+from input_actions import ActionSequence
+from pacing import AdaptivePacer
+from typing import Any, Callable
+import functools
 import sys
+import threading
+import time
 
-pyautogui.PAUSE = 0.05  # Example: reduce delay to 10ms
+GAME_WINDOW_TITLE = "Path of Exile"
 
 
 class Bot:
-    _SIGNALS_ = {}
+    _KILLSWITCH_ = threading.Event()
+    _STOP_ = threading.Event()  # Killswitch on or the running job cancelled
     _GLOBALS_ = {}
+    _BACKEND_: BotBackend | None = None
+    _PACER_ = None
+    _CURSOR_: Position | None = None
+    _CLICK_LISTENERS_: list[Callable[[Position], None]] = []
+    _CANCELLATION_ = None  # Token of the running job, see job_executor
+    _STOPPED_AT_: float | None = None
 
     @classmethod
     def get_global(cls, key) -> Any:
         return Bot._GLOBALS_.get(key)
 
+    @classmethod
+    def set_global(cls, key, value) -> None:
+        Bot._GLOBALS_[key] = value
+
+    @classmethod
+    def get_globals(cls) -> dict:
+        return dict(Bot._GLOBALS_)
+
+    @classmethod
+    def backend(cls) -> BotBackend:
+        if Bot._BACKEND_ is None:
+            Bot._BACKEND_ = PyAutoGuiBackend()
+            Bot._BACKEND_.stop = Bot._STOP_
+        return Bot._BACKEND_
+
+    @classmethod
+    def set_backend(cls, backend: BotBackend | None) -> None:
+        """
+        Route all input, clipboard and window calls through the given backend.
+        None restores the default pyautogui backend on next use.
+        """
+        if backend is not None:
+            backend.stop = Bot._STOP_
+        Bot._BACKEND_ = backend
+
+    @classmethod
+    def pacer(cls):
+        if Bot._PACER_ is None:
+            Bot._PACER_ = AdaptivePacer()
+        return Bot._PACER_
+
+    @classmethod
+    def set_pacer(cls, pacer) -> None:
+        """
+        Replace how the bot waits for the game, e.g. with pacing.FixedPacer.
+        None restores the adaptive pacer on next use.
+        """
+        Bot._PACER_ = pacer
+
     @classmethod
     def activate_poe(cls) -> bool:
-        if poe_windows := gw.getWindowsWithTitle("Path of Exile"):
-            poe = poe_windows[0]
-            if not poe.isActive:
-                pyautogui.press("altleft")
-                poe.activate()
-            return True
-        return False
+        return cls.backend().activate_window(GAME_WINDOW_TITLE)
 
     @classmethod
-    def get_item_info(cls, pos: Position, retries=0) -> str:
-        pyperclip.copy("")
-        if not cls.activate_poe():
-            logger.error("Could not activate PoE")
-            return ""
-        pyautogui.moveTo(pos.x, pos.y)
-        pyautogui.hotkey("ctrl", "alt", "c")
-        ret = pyperclip.paste().replace("\r\n", "\n")
-        if not ret and retries < 3:
-            return Bot.get_item_info(pos, retries=retries + 1)
-        return ret
+    def get_item_info(cls, pos: Position, retries=0, single: bool = False) -> str:
+        """
+        Advanced copy of the item at pos, retried until 3 retries have been
+        made (counting from `retries`) or the bot is stopped. single copies
+        once without retrying, e.g. for a cell that may be empty.
+        """
+        backend = cls.backend()
+        while True:
+            # With a clipboard sequence number the copy is detected without
+            # clearing the clipboard first or reading it until it has changed.
+            sequence = backend.clipboard_sequence()
+            if sequence is None:
+                backend.write_clipboard("")
+            if not cls.activate_poe():
+                logger.error("Could not activate PoE")
+                return ""
+            backend.move_to(pos.x, pos.y)
+            Bot._CURSOR_ = pos
+            backend.hotkey("ctrl", "alt", "c")
+
+            def copied() -> str | None:
+                if sequence is None:
+                    return backend.read_clipboard() or None
+                if backend.clipboard_sequence() != sequence:
+                    return backend.read_clipboard()
+                return None
+
+            ret = cls.pacer().wait_until(backend, "copy", copied)
+            if ret or single or retries >= 3 or Bot._STOP_.is_set():
+                return (ret or "").replace("\r\n", "\n")
+            retries += 1
 
     @classmethod
-    def select_pos(cls, key: str = "SELECTPOS") -> Position | None:
+    def wait_for_item_change(cls, pos: Position, previous: str, action: str) -> str:
+        """
+        Copy the item at pos until its text differs from `previous`, waiting
+        only as long as the game needs to respond to `action`. Returns the
+        last text read, which is unchanged if the game did not respond.
+        """
+        last = previous
+
+        def changed() -> str | None:
+            nonlocal last
+            last = cls.get_item_info(pos)
+            return last if last != previous else None
+
+        cls.pacer().wait_until(cls.backend(), action, changed)
+        return last
+
+    @classmethod
+    def add_click_listener(cls, listener: Callable[[Position], None]) -> None:
+        """
+        Call listener with the cursor position of every click the bot makes,
+        e.g. to learn which inventory cells a craft job may have changed.
+        """
+        Bot._CLICK_LISTENERS_.append(listener)
+
+    @classmethod
+    def remove_click_listener(cls, listener: Callable[[Position], None]) -> None:
+        if listener in Bot._CLICK_LISTENERS_:
+            Bot._CLICK_LISTENERS_.remove(listener)
+
+    @classmethod
+    def _clicked(cls) -> None:
+        if Bot._CURSOR_ is not None:
+            for listener in Bot._CLICK_LISTENERS_:
+                listener(Bot._CURSOR_)
+
+    @classmethod
+    def move_to(cls, pos: Position) -> None:
+        cls.backend().move_to(pos.x, pos.y)
+        Bot._CURSOR_ = pos
+
+    @classmethod
+    def left_click(cls) -> None:
+        cls.backend().left_click()
+        cls._clicked()
+
+    @classmethod
+    def right_click(cls) -> None:
+        cls.backend().right_click()
+        cls._clicked()
+
+    @classmethod
+    def run(cls, sequence: ActionSequence, interruptible: bool = True) -> None:
+        """
+        Execute the batch. Unless interruptible is False (e.g. for releasing
+        held keys), it stops between actions once the bot is stopped.
+        """
+        cls.backend().run_actions(sequence.actions, interruptible)
+        for action in sequence.actions:
+            if action.kind == "move_to":
+                Bot._CURSOR_ = Position(*action.args)
+            elif action.kind in ("left_click", "right_click"):
+                cls._clicked()
+
+    @classmethod
+    def sleep(cls, seconds: float) -> None:
+        """
+        Sleep, but return as soon as the bot is stopped.
+        """
+        cls.backend().sleep(seconds)
+
+    @classmethod
+    def wait_for_click(cls) -> Position | None:
         if not cls.activate_poe():
             return None
+        return cls.backend().wait_for_click()
 
-        def click_callback(x, y, button, pressed) -> bool:
-            Bot._GLOBALS_[key] = Position(x, y)
-            return False
-
-        with mouse.Listener(on_click=click_callback) as listener:
-            listener.join()
-        return Bot._GLOBALS_.get(key)
+    @classmethod
+    def select_pos(cls, key: str = "SELECTPOS") -> Position | None:
+        if pos := cls.wait_for_click():
+            Bot._GLOBALS_[key] = pos
+        return pos
 
     @classmethod
     def toggle_killswitch(cls):
-        cls._SIGNALS_["KILLSWITCH"] = not cls.get_killswitch_state()
-        logger.info(f"Killswitch state set to {cls.get_killswitch_state()}")
+        if Bot._KILLSWITCH_.is_set():
+            Bot._KILLSWITCH_.clear()
+        else:
+            Bot._KILLSWITCH_.set()
+        cls._update_stop()
+        logger.info(f"Killswitch state set to {Bot._KILLSWITCH_.is_set()}")
+
+    @classmethod
+    def set_killswitch(cls, on: bool) -> None:
+        if Bot._KILLSWITCH_.is_set() != on:
+            cls.toggle_killswitch()
+
+    @classmethod
+    def set_cancellation(cls, token) -> None:
+        """
+        Make get_killswitch_state() also report the cancellation of the given
+        job token, so a single job can be stopped without the killswitch.
+        """
+        Bot._CANCELLATION_ = token
+        if token is not None:
+            token.on_cancel(cls._update_stop)
+        cls._update_stop()
+
+    @classmethod
+    def _update_stop(cls) -> None:
+        token = Bot._CANCELLATION_
+        if Bot._KILLSWITCH_.is_set() or (token is not None and token.cancelled):
+            if not Bot._STOP_.is_set():
+                Bot._STOPPED_AT_ = time.perf_counter()
+                Bot._STOP_.set()
+        else:
+            Bot._STOP_.clear()
+
+    @classmethod
+    def stop_latency(cls) -> float | None:
+        """
+        Seconds from the last stop request until now, e.g. measured when a
+        craft job returns after the killswitch.
+        """
+        if Bot._STOPPED_AT_ is None:
+            return None
+        return time.perf_counter() - Bot._STOPPED_AT_
 
     @classmethod
     def get_killswitch_state(cls):
-        return cls._SIGNALS_.get("KILLSWITCH", False)
+        return Bot._STOP_.is_set()
+
+
+def log_window_enumerations(job):
+    """
+    Decorator for craft jobs: logs how many times the game window had to be
+    looked up while the job ran (1 when the cached handle stays valid).
+    """
+
+    @functools.wraps(job)
+    def wrapper(*args, **kwargs):
+        backend = Bot.backend()
+        start = backend.window_enumerations
+        try:
+            return job(*args, **kwargs)
+        finally:
+            logger.info(
+                f"{job.__name__}: {backend.window_enumerations - start} "
+                "game window enumeration(s)"
+            )
+
+    return wrapper
 
 
 logger.add(
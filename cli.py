@@ -0,0 +1,364 @@
+"""
+Headless craft runner: runs a saved blueprint or map config without the GUI
+(and without importing Qt).
+
+    python cli.py item blueprint.json [--item X,Y] [--runs N] [--hold]
+    python cli.py map mapSettings.json [--item X,Y | --grid] [--regex-count N]
+
+Blueprints are the JSON written by the Items page's Save Blueprint, map configs
+the JSON written by the Maps page's Save Map Config. Currency positions come
+from userconfig.json (--config) as calibrated in the GUI; without --item the
+item position is picked with a click, like the GUI's Select buttons. With
+--simulate the runs go against simulator.SimulatorBackend instead of the game.
+
+Throughput is printed every --interval seconds. Ctrl+C stops the running craft
+the way the killswitch does. Exit codes:
+
+    0    every run finished (blueprint finished, map matched)
+    1    a run ended without a result (attempts exhausted, no match, stopped)
+    2    bad arguments, blueprint or map config, or missing calibration
+    3    a run raised an exception
+    130  interrupted with Ctrl+C
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from types import MappingProxyType
+from typing import Callable
+
+import config
+import job_executor
+import session_log
+from blueprint_compiler import BlueprintError, compile_blueprint
+from bot_controller import Bot
+from craft_engine import FINISHED
+from craft_session import CraftSession, resolve_session
+from item_craft_module import craft_item_advanced
+from map_module import MATCHED, craft_map, craft_map_grid
+from mytypes import Grid, Position
+from simulator import ITEM_TEMPLATES, SimulatorBackend
+from loguru import logger
+
+EXIT_OK = 0
+EXIT_INCOMPLETE = 1
+EXIT_USAGE = 2
+EXIT_ERROR = 3
+EXIT_INTERRUPTED = 130
+
+# Map config keys (see MapsPage.save_map_config) -> implicit thresholds.
+MAP_IMPLICITS = {
+    "quant": "Item Quantity",
+    "rarity": "Item Rarity",
+    "packsize": "Monster Pack Size",
+    "moreMaps": "More Maps",
+    "moreScarabs": "More Scarabs",
+    "moreCurrency": "More Currency",
+}
+
+# Craft logs silenced by --quiet.
+LOG_MODULES = (
+    "bot_controller",
+    "blueprint_compiler",
+    "craft_session",
+    "held_currency",
+    "item_craft_module",
+    "job_executor",
+    "map_module",
+    "pacing",
+)
+
+SIM_ITEM_POS = Position(600, 400)
+SIM_GRID = Grid(Position(1300, 600), Position(1850, 800), 5, 12)
+
+
+class UsageError(Exception):
+    pass
+
+
+class Throughput:
+    """
+    Attempts and results of the runs so far, timed on the backend clock
+    (virtual under --simulate).
+    """
+
+    def __init__(self, clock: Callable[[], float]):
+        self.clock = clock
+        self.start()
+
+    def start(self) -> None:
+        self.started = self.clock()
+        self.attempts = 0
+        self.crafted = 0
+
+    def attempt(self) -> None:
+        self.attempts += 1
+
+    def success(self, *_) -> None:
+        self.crafted += 1
+
+    def line(self) -> str:
+        elapsed = self.clock() - self.started
+        rate = self.attempts / elapsed if elapsed else 0.0
+        return (
+            f"{self.attempts} attempts, {self.crafted} crafted in {elapsed:.1f}s "
+            f"({rate:.2f} attempts/s)"
+        )
+
+
+def parse_position(text: str) -> Position:
+    try:
+        x, y = (int(value) for value in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected X,Y, got {text!r}")
+    return Position(x, y)
+
+
+def load_json(path: str):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        raise UsageError(f"Could not read {path}: {e}")
+
+
+def load_map_config(path: str) -> tuple[list[str], dict]:
+    settings = load_json(path)
+    if not isinstance(settings, dict):
+        raise UsageError(f"{path} is not a map config")
+    regexes = settings.get("regexes", [])
+    expected_implicits = {
+        implicit: int(settings.get(key, 0)) for key, implicit in MAP_IMPLICITS.items()
+    }
+    return regexes, expected_implicits
+
+
+def item_position(args, key: str, sim) -> Position:
+    if args.item:
+        return args.item
+    if sim:
+        return SIM_ITEM_POS
+    print(f"Click the item to craft ({key})...", file=sys.stderr, flush=True)
+    pos = Bot.select_pos(key)
+    if not pos:
+        raise UsageError("No item position selected")
+    return pos
+
+
+def with_slot(session: CraftSession, slot: str, pos: Position) -> CraftSession:
+    return CraftSession(MappingProxyType({**session.positions, slot: pos}))
+
+
+def item_runs(args, sim, throughput: Throughput) -> list[Callable[[], bool]]:
+    blueprint = load_json(args.file)
+    if not isinstance(blueprint, list):
+        raise UsageError(f"{args.file} is not a blueprint")
+    currencies = sim.stacks.keys() if sim else None
+    program = compile_blueprint(blueprint, currencies)
+    item_pos = item_position(args, "craft-item", sim)
+    if sim:
+        session = sim.session(**{"craft-item": item_pos})
+    else:
+        session = resolve_session(program.currencies)
+        if not session:
+            raise UsageError("Calibrate the currencies used by the blueprint")
+        session = with_slot(session, "craft-item", item_pos)
+
+    def run() -> bool:
+        if sim:
+            sim.place_item(item_pos, args.sim_item)
+        stats = craft_item_advanced(
+            program,
+            session,
+            hold_currency=args.hold,
+            success_callback=throughput.success,
+            attempt_callback=throughput.attempt,
+        )
+        return stats is not None and stats.outcome == FINISHED
+
+    return [run] * args.runs
+
+
+def map_runs(args, sim, throughput: Throughput) -> list[Callable[[], bool]]:
+    regexes, expected_implicits = load_map_config(args.file)
+    regex_count = len(regexes) if args.regex_count is None else args.regex_count
+    if regex_count > len(regexes):
+        raise UsageError(f"--regex-count {regex_count} but only {len(regexes)} regexes")
+    if args.grid:
+        grid = config.get_value_as_grid("map", "grid") or (SIM_GRID if sim else None)
+        if not grid:
+            raise UsageError("Calibrate the map grid in the GUI first")
+    else:
+        map_pos = item_position(args, "map-item", sim)
+    session = sim.session() if sim else resolve_session(["chaos"])
+    if not session:
+        raise UsageError("Calibrate the chaos orb first")
+    callbacks = dict(
+        hold_currency=args.hold,
+        success_callback=throughput.success,
+        attempt_callback=throughput.attempt,
+    )
+
+    def run_grid() -> bool:
+        if sim:
+            for row in range(grid.rows):
+                for col in range(grid.cols):
+                    sim.place_item(grid.cell(row, col), "map", "Rare")
+        stats = craft_map_grid(
+            regexes, regex_count, expected_implicits, grid, session, **callbacks
+        )
+        return stats is not None and not stats.stopped and not stats.failed
+
+    def run_map() -> bool:
+        if sim:
+            sim.place_item(map_pos, "map", "Rare")
+        outcome = craft_map(
+            regexes,
+            regex_count,
+            expected_implicits,
+            with_slot(session, "map-item", map_pos),
+            **callbacks,
+        )
+        return outcome == MATCHED
+
+    return [run_grid if args.grid else run_map] * args.runs
+
+
+def run_jobs(name: str, runs: list[Callable[[], bool]], throughput, interval) -> int:
+    """
+    Run on the job executor, like the GUI, so Ctrl+C cancels the same way the
+    Cancel Job button does.
+    """
+    executor = job_executor.executor()
+    changed = threading.Event()
+    total = len(runs)
+
+    def listener(job: job_executor.Job) -> None:
+        changed.set()
+
+    def wait(jobs: list[job_executor.Job]) -> None:
+        deadline = time.monotonic() + interval
+        while any(
+            job.state in (job_executor.QUEUED, job_executor.RUNNING) for job in jobs
+        ):
+            changed.wait(max(0.0, deadline - time.monotonic()))
+            changed.clear()
+            if time.monotonic() >= deadline:
+                print(throughput.line(), flush=True)
+                deadline += interval
+
+    executor.add_listener(listener)
+    throughput.start()
+    jobs = executor.chain(
+        (f"{name} {i + 1}/{total}", run) for i, run in enumerate(runs)
+    )
+    interrupted = False
+    try:
+        wait(jobs)
+    except KeyboardInterrupt:
+        interrupted = True
+        print("Stopping...", file=sys.stderr, flush=True)
+        executor.cancel_all()
+        wait(jobs)
+    finally:
+        executor.remove_listener(listener)
+
+    complete = sum(1 for job in jobs if job.state == job_executor.DONE and job.result)
+    print(f"{name}: {complete}/{total} runs complete, {throughput.line()}")
+    if interrupted:
+        return EXIT_INTERRUPTED
+    if any(job.state == job_executor.FAILED for job in jobs):
+        return EXIT_ERROR
+    return EXIT_OK if complete == total else EXIT_INCOMPLETE
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__[__doc__.index("Exit codes") :],
+    )
+    parser.add_argument(
+        "--config", default=config.CONFIG_FILE, help="Calibration file to use"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=5.0,
+        help="Seconds between throughput lines",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Hide the craft logs")
+    parser.add_argument(
+        "--no-log",
+        action="store_true",
+        help="Don't record the attempts in the session log",
+    )
+    parser.add_argument(
+        "--simulate",
+        action="store_true",
+        help="Craft against the simulated game client instead of the game",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Simulator seed")
+    modes = parser.add_subparsers(dest="mode", required=True)
+
+    item = modes.add_parser("item", help="Run a crafting blueprint")
+    item.add_argument("file", help="Blueprint JSON")
+    item.add_argument(
+        "--sim-item",
+        default="ring",
+        choices=sorted(ITEM_TEMPLATES),
+        help="Simulator item template crafted under --simulate",
+    )
+
+    map_ = modes.add_parser("map", help="Chaos maps to a map config")
+    map_.add_argument("file", help="Map config JSON")
+    map_.add_argument(
+        "--grid", action="store_true", help="Roll every map in the calibrated grid"
+    )
+    map_.add_argument(
+        "--regex-count",
+        type=int,
+        help="Regexes that must match (default: all)",
+    )
+
+    for mode in (item, map_):
+        mode.add_argument(
+            "--item", type=parse_position, help="Item position X,Y (default: click)"
+        )
+        mode.add_argument("--runs", type=int, default=1, help="Times to run it")
+        mode.add_argument(
+            "--hold",
+            action="store_true",
+            help="Apply currency with shift held (experimental)",
+        )
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    config.CONFIG_FILE = args.config
+    if args.quiet:
+        for module in LOG_MODULES:
+            logger.disable(module)
+    if args.no_log:
+        session_log.disable()
+    sim = None
+    if args.simulate:
+        sim = SimulatorBackend(args.seed)
+        Bot.set_backend(sim)
+    throughput = Throughput(Bot.backend().now)
+    try:
+        if args.mode == "item":
+            runs = item_runs(args, sim, throughput)
+        else:
+            runs = map_runs(args, sim, throughput)
+    except (UsageError, BlueprintError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    return run_jobs(args.mode, runs, throughput, args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
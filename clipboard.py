@@ -0,0 +1,191 @@
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from loguru import logger
+
+
+class Clipboard(ABC):
+    """
+    Text clipboard access that stays connected between calls. sequence()
+    returns a number that changes whenever the clipboard is written, or None
+    if the platform cannot tell.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def read(self) -> str: ...
+
+    @abstractmethod
+    def write(self, text: str) -> None: ...
+
+    def sequence(self) -> int | None:
+        return None
+
+
+class Win32Clipboard(Clipboard):
+    """
+    Native clipboard through user32/kernel32, resolved once with ctypes. The
+    sequence number comes from GetClipboardSequenceNumber, which is cheap
+    enough to poll every millisecond.
+    """
+
+    name = "win32"
+    CF_UNICODETEXT = 13
+    GMEM_MOVEABLE = 0x0002
+    OPEN_ATTEMPTS = 20  # Another process may hold the clipboard briefly
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        self.ctypes = ctypes
+        user32 = ctypes.WinDLL("user32", use_last_error=True)
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+
+        self._open = user32.OpenClipboard
+        self._open.argtypes = [wintypes.HWND]
+        self._open.restype = wintypes.BOOL
+        self._close = user32.CloseClipboard
+        self._close.restype = wintypes.BOOL
+        self._empty = user32.EmptyClipboard
+        self._empty.restype = wintypes.BOOL
+        self._get = user32.GetClipboardData
+        self._get.argtypes = [wintypes.UINT]
+        self._get.restype = wintypes.HANDLE
+        self._set = user32.SetClipboardData
+        self._set.argtypes = [wintypes.UINT, wintypes.HANDLE]
+        self._set.restype = wintypes.HANDLE
+        self._sequence = user32.GetClipboardSequenceNumber
+        self._sequence.restype = wintypes.DWORD
+
+        self._alloc = kernel32.GlobalAlloc
+        self._alloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+        self._alloc.restype = wintypes.HGLOBAL
+        self._free = kernel32.GlobalFree
+        self._free.argtypes = [wintypes.HGLOBAL]
+        self._lock = kernel32.GlobalLock
+        self._lock.argtypes = [wintypes.HGLOBAL]
+        self._lock.restype = wintypes.LPVOID
+        self._unlock = kernel32.GlobalUnlock
+        self._unlock.argtypes = [wintypes.HGLOBAL]
+
+    def _open_clipboard(self) -> bool:
+        for _ in range(self.OPEN_ATTEMPTS):
+            if self._open(None):
+                return True
+            time.sleep(0.001)
+        logger.warning("Could not open the clipboard")
+        return False
+
+    def read(self) -> str:
+        if not self._open_clipboard():
+            return ""
+        try:
+            handle = self._get(self.CF_UNICODETEXT)
+            if not handle:
+                return ""
+            pointer = self._lock(handle)
+            if not pointer:
+                return ""
+            try:
+                return self.ctypes.wstring_at(pointer)
+            finally:
+                self._unlock(handle)
+        finally:
+            self._close()
+
+    def write(self, text: str) -> None:
+        if not self._open_clipboard():
+            return
+        try:
+            self._empty()
+            if not text:
+                return
+            data = text.encode("utf-16-le") + b"\0\0"
+            handle = self._alloc(self.GMEM_MOVEABLE, len(data))
+            pointer = self._lock(handle)
+            self.ctypes.memmove(pointer, data, len(data))
+            self._unlock(handle)
+            # The clipboard owns the memory once SetClipboardData succeeds.
+            if not self._set(self.CF_UNICODETEXT, handle):
+                self._free(handle)
+        finally:
+            self._close()
+
+    def sequence(self) -> int:
+        return self._sequence()
+
+
+class TkClipboard(Clipboard):
+    """
+    Keeps a hidden Tk root connected to the display instead of spawning
+    xclip/xsel per call. Tk objects are bound to the thread that created
+    them, so each thread gets its own root.
+    """
+
+    name = "tk"
+
+    def __init__(self):
+        import tkinter
+
+        self.tkinter = tkinter
+        self._local = threading.local()
+        self._root()  # Fail early if there is no display
+
+    def _root(self):
+        root = getattr(self._local, "root", None)
+        if root is None:
+            root = self._local.root = self.tkinter.Tk()
+            root.withdraw()
+        return root
+
+    def read(self) -> str:
+        try:
+            return self._root().clipboard_get()
+        except self.tkinter.TclError:
+            return ""
+
+    def write(self, text: str) -> None:
+        root = self._root()
+        root.clipboard_clear()
+        root.clipboard_append(text)
+        root.update()
+
+
+class PyperclipClipboard(Clipboard):
+    """
+    Fallback through pyperclip, which spawns a helper process per call on
+    Linux.
+    """
+
+    name = "pyperclip"
+
+    def __init__(self):
+        import pyperclip
+
+        self.pyperclip = pyperclip
+
+    def read(self) -> str:
+        return self.pyperclip.paste()
+
+    def write(self, text: str) -> None:
+        self.pyperclip.copy(text)
+
+
+def system_clipboard() -> Clipboard:
+    """
+    The fastest clipboard available on this platform.
+    """
+    candidates = [PyperclipClipboard]
+    if sys.platform == "win32":
+        candidates.insert(0, Win32Clipboard)
+    else:
+        candidates.insert(0, TkClipboard)
+    for candidate in candidates[:-1]:
+        try:
+            return candidate()
+        except Exception as e:
+            logger.warning(f"{candidate.name} clipboard unavailable: {e}")
+    return candidates[-1]()
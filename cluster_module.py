@@ -1,69 +1,79 @@
-import pyautogui
 import re
-import config
-import time
 from mytypes import Position, Cluster
-from bot_controller import Bot
+from bot_controller import Bot, log_window_enumerations
+from craft_session import CraftSession, resolve_session
+from input_actions import compile_actions, left_click, move
+from item_parser import parse_item
+from mod_matcher import ModMatcher
+import session_log
 from loguru import logger
 
+CLUSTER_TYPE_RGX = re.compile(r"(\w*) Cluster Jewel")
+PASSIVES_RGX = re.compile(r"Adds (\d+) Passive Skills")
+SMALL_PASSIVES_PREFIX = "Added Small Passive Skills grant: "
+
 
 def process_cluster(item_info: str) -> Cluster | None:
-    jewel_type_match = re.search(r"(\w*) Cluster Jewel\n-{8}", item_info)
+    item = parse_item(item_info)
+    if not item:
+        return None
+    jewel_type_match = CLUSTER_TYPE_RGX.search(item.base)
     if not jewel_type_match:
         return None
     jewel_type = f"{jewel_type_match.group(1)} Cluster Jewel"
     jewel_base = ""
-    ilvl = -1
     passives = -1
-    if ilvl_rgx := re.search(r"Item Level: (\d+)", item_info):
-        ilvl = int(ilvl_rgx.group(1))
-    if passives_rgx := re.search(r"Adds (\d+) Passive Skills \(enchant\)", item_info):
-        passives = int(passives_rgx.group(1))
-    if base_rgx := re.search(
-        r"Added Small Passive Skills grant: ([^\n]+)\n", item_info
-    ):
-        jewel_base = base_rgx.group(1)
-    mods_match = re.search(
-        r"\(enchant\)\n-{8}\n([{}\d\w\s\"(:—),\.\+\-%]*)\n-{8}", item_info, re.DOTALL
-    )
-    if mods_match:
-        mods = mods_match.group(1).split("\n")
-        return Cluster(ilvl, passives, jewel_type, jewel_base, mods)
+    for enchant in item.enchants:
+        if passives_rgx := PASSIVES_RGX.match(enchant):
+            passives = int(passives_rgx.group(1))
+        elif enchant.startswith(SMALL_PASSIVES_PREFIX):
+            jewel_base = enchant[len(SMALL_PASSIVES_PREFIX) :]
+    mods = item.explicit_lines()
+    if mods:
+        return Cluster(item.ilvl, passives, jewel_type, jewel_base, mods)
     return None
 
 
-def filter_mods_by_regex(cluster: Cluster, regexes: list[str]) -> bool:
-    matched = 0
-    for mod in cluster.mods:
-        for regex in regexes:
-            if re.search(regex, mod):
-                matched += 1
-    return matched == len(regexes)
+def filter_mods_by_regex(cluster: Cluster, matcher: ModMatcher) -> bool:
+    return matcher.count(cluster.mods, limit=len(matcher)) == len(matcher)
 
 
+@log_window_enumerations
 def craft_cluster(
-    regexes: list[str], attempt_callback=None, success_callback=None
+    regexes: list[str],
+    attempt_callback=None,
+    success_callback=None,
+    session: CraftSession | None = None,
 ) -> None:
-    location: Position | None = config.get_value_as_position(
-        "cluster", "button-location"
-    )
-    if not location:
+    session = session or resolve_session(config_keys=[("cluster", "button-location")])
+    if not session:
         return
-
+    location: Position = session["button-location"]
     item_location: Position = Position(location.x, location.y - 80)
+    matcher = ModMatcher(regexes)
+    reroll = compile_actions(move(location), left_click())
+    item_info: str = Bot.get_item_info(item_location, retries=5)
+    job_log = session_log.job("cluster")
+    attempts = 0
     while not Bot.get_killswitch_state():
-        item_info: str = Bot.get_item_info(item_location, retries=5)
         cluster = process_cluster(item_info)
         if not cluster:
             logger.info("No cluster info found")
             return
-        if filter_mods_by_regex(cluster, regexes):
+        matched = filter_mods_by_regex(cluster, matcher)
+        job_log.record(
+            item_info,
+            cluster.mods,
+            session_log.FINISHED if matched else session_log.MISS,
+            "cluster" if attempts else None,
+        )
+        if matched:
             logger.info("Matched mods")
             if success_callback:
                 success_callback(cluster)
             return
-        pyautogui.moveTo(location.x, location.y)
-        pyautogui.leftClick()
+        Bot.run(reroll)
+        attempts += 1
         if attempt_callback:
             attempt_callback()
-        time.sleep(0.1)
+        item_info = Bot.wait_for_item_change(item_location, item_info, "cluster")
@@ -1,30 +1,105 @@
+import atexit
 import json
 import os
-from mytypes import Position
+import tempfile
+import threading
+from mytypes import Grid, Position
 
 CONFIG_FILE = "userconfig.json"
+SAVE_DELAY = 0.5  # Seconds to coalesce set_value calls into a single write
 
+_lock = threading.RLock()
+_cache: dict | None = None
+_cache_stamp: tuple[int, int] | None = None  # (mtime_ns, size) of the cached file
+_dirty = False
+_save_timer: threading.Timer | None = None
 
-def load_config():
-    if not os.path.exists(CONFIG_FILE):
-        default_config = {
-            "cluster": {"button-location": {"x": 0, "y": 0}},
-            "currency": {
-                "chaos": {"x": 0, "y": 0},
-                "augment": {"x": 0, "y": 0},
-                "alteration": {"x": 0, "y": 0},
-                "scouring": {"x": 0, "y": 0},
-            },
-        }
-        save_config(default_config)
-        return default_config
-    with open(CONFIG_FILE, "r") as f:
-        return json.load(f)
+
+def _file_stamp() -> tuple[int, int] | None:
+    try:
+        stat = os.stat(CONFIG_FILE)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_config() -> dict:
+    """
+    Return the process-wide cached config, reloading it only when the file on
+    disk has changed. Pending set_value writes take precedence over the file.
+    The returned dict is shared; change values through set_value.
+    """
+    global _cache, _cache_stamp
+    with _lock:
+        if _dirty:
+            return _cache
+        stamp = _file_stamp()
+        if stamp is None:
+            default_config = {
+                "cluster": {"button-location": {"x": 0, "y": 0}},
+                "currency": {
+                    "chaos": {"x": 0, "y": 0},
+                    "augment": {"x": 0, "y": 0},
+                    "alteration": {"x": 0, "y": 0},
+                    "scouring": {"x": 0, "y": 0},
+                },
+            }
+            save_config(default_config)
+            return _cache
+        if _cache is None or stamp != _cache_stamp:
+            with open(CONFIG_FILE, "r") as f:
+                _cache = json.load(f)
+            _cache_stamp = stamp
+        return _cache
+
+
+def _file_mode() -> int:
+    """
+    Mode for the rewritten config: the existing file's, or what open() would
+    give a new file under the current umask.
+    """
+    try:
+        return os.stat(CONFIG_FILE).st_mode & 0o7777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
 
 
 def save_config(config):
-    with open(CONFIG_FILE, "w") as f:
-        json.dump(config, f, indent=2)
+    """
+    Write the config atomically: dump to a temp file next to the config and
+    rename it over the original, so readers never see a partial file.
+    """
+    global _cache, _cache_stamp
+    with _lock:
+        directory = os.path.dirname(os.path.abspath(CONFIG_FILE))
+        fd, tmp_path = tempfile.mkstemp(prefix=".userconfig-", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(config, f, indent=2)
+            # mkstemp creates the file 0600; keep the config's own mode.
+            os.chmod(tmp_path, _file_mode())
+            os.replace(tmp_path, CONFIG_FILE)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        _cache = config
+        _cache_stamp = _file_stamp()
+
+
+def flush():
+    """
+    Write pending set_value changes to disk immediately.
+    """
+    global _dirty, _save_timer
+    with _lock:
+        if _save_timer:
+            _save_timer.cancel()
+            _save_timer = None
+        if _dirty:
+            save_config(_cache)
+            _dirty = False
 
 
 def get_value(section, key):
@@ -33,11 +108,17 @@ def get_value(section, key):
 
 
 def set_value(value, section, key):
-    config_data = load_config()
-    if section not in config_data:
-        config_data[section] = {}
-    config_data[section][key] = value
-    save_config(config_data)
+    global _dirty, _save_timer
+    with _lock:
+        config_data = load_config()
+        if section not in config_data:
+            config_data[section] = {}
+        config_data[section][key] = value
+        _dirty = True
+        if not _save_timer:
+            _save_timer = threading.Timer(SAVE_DELAY, flush)
+            _save_timer.daemon = True
+            _save_timer.start()
 
 
 def get_value_as_position(section, key):
@@ -45,3 +126,18 @@ def get_value_as_position(section, key):
     if val:
         return Position(val["x"], val["y"])
     return None
+
+
+def get_value_as_grid(section, key):
+    val = get_value(section, key)
+    if val:
+        return Grid(
+            Position(val["first"]["x"], val["first"]["y"]),
+            Position(val["last"]["x"], val["last"]["y"]),
+            val["rows"],
+            val["cols"],
+        )
+    return None
+
+
+atexit.register(flush)
@@ -0,0 +1,163 @@
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+FINISHED = "finished"  # Ran past the last step
+FAILED = "failed"  # A step failed with no failure transition
+STOPPED = "stopped"  # Killswitch or cancellation
+LIMIT = "limit"  # Global attempt limit reached
+
+ABORT = -1  # on_failure target that ends the sequence
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledStep:
+    currency: str
+    predicate: Callable[[list[str]], bool] | None  # None: automatic success
+    on_success: int
+    on_failure: int
+    max_attempts: int
+    label: str = ""
+
+
+@dataclass(frozen=True, slots=True)
+class CraftProgram:
+    """
+    Transition table for the engine: steps are referenced by index, a target
+    past the last step finishes the sequence and ABORT ends it as failed.
+    """
+
+    steps: tuple[CompiledStep, ...]
+
+    @property
+    def currencies(self) -> set[str]:
+        return {step.currency for step in self.steps}
+
+
+@dataclass(slots=True)
+class StepStats:
+    entries: int = 0
+    attempts: int = 0
+    successes: int = 0
+    failures: int = 0
+    elapsed: float = 0.0  # Seconds spent in the step, summed over entries
+
+
+@dataclass(slots=True)
+class EngineStats:
+    steps: list[StepStats]
+    attempts: int = 0
+    transitions: int = 0
+    elapsed: float = 0.0
+    outcome: str = ""
+    final_step: int = 0  # Index of the last step that ran
+    held_clicks: int = 0  # Applications made with the currency held
+    held_saving: float = 0.0  # Seconds saved by holding the currency
+
+
+class CraftEngine:
+    """
+    Runs a CraftProgram as a loop over its transition table, so blueprints
+    that cycle between steps run in constant stack space.
+
+    apply_currency(currency) performs one crafting action, read_mods() returns
+    the current mod lines of the item and should_stop() is polled before every
+    action. on_read(step index, mods, matched) is called after every read
+    with the decision the step made on it.
+    """
+
+    def __init__(
+        self,
+        program: CraftProgram,
+        apply_currency: Callable[[str], None],
+        read_mods: Callable[[], list[str]],
+        should_stop: Callable[[], bool] | None = None,
+        max_total_attempts: int | None = None,
+        on_read: Callable[[int, list[str], bool], None] | None = None,
+    ):
+        self.program = program
+        self.apply_currency = apply_currency
+        self.read_mods = read_mods
+        self.should_stop = should_stop or (lambda: False)
+        self.max_total_attempts = max_total_attempts
+        self.on_read = on_read
+        self.stats = EngineStats([StepStats() for _ in program.steps])
+
+    def run(self) -> EngineStats:
+        steps = self.program.steps
+        stats = self.stats
+        index = 0
+        started = time.perf_counter()
+        # The item only changes when currency is applied, so the mods read at
+        # the end of one step are still valid when the next one starts.
+        mods = self.read_mods()
+        fresh = True  # mods not yet checked by any step
+        while True:
+            if index == ABORT:
+                stats.outcome = FAILED
+                break
+            if index >= len(steps):
+                stats.outcome = FINISHED
+                break
+            if self.should_stop():
+                stats.outcome = STOPPED
+                break
+            stats.final_step = index
+            step = steps[index]
+            step_stats = stats.steps[index]
+            step_stats.entries += 1
+            step_started = time.perf_counter()
+            succeeded, mods = self._run_step(index, step, step_stats, mods, fresh)
+            fresh = False
+            step_stats.elapsed += time.perf_counter() - step_started
+            if succeeded is None:
+                break
+            stats.transitions += 1
+            if succeeded:
+                step_stats.successes += 1
+                index = step.on_success
+            else:
+                step_stats.failures += 1
+                index = step.on_failure
+        stats.elapsed += time.perf_counter() - started
+        return stats
+
+    def _run_step(
+        self,
+        index: int,
+        step: CompiledStep,
+        step_stats: StepStats,
+        mods: list[str],
+        fresh: bool,
+    ) -> tuple[bool | None, list[str]]:
+        """
+        Returns (True, mods) on success, (False, mods) once max_attempts is
+        used up and (None, mods) if the run has to stop.
+        """
+        attempts = 0
+        while True:
+            if step.predicate is not None:
+                matched = step.predicate(mods)
+            else:
+                matched = attempts > 0
+            if fresh and self.on_read is not None:
+                self.on_read(index, mods, matched)
+            if matched:
+                return True, mods
+            if attempts >= step.max_attempts:
+                return False, mods
+            if self.should_stop():
+                self.stats.outcome = STOPPED
+                return None, mods
+            if (
+                self.max_total_attempts is not None
+                and self.stats.attempts >= self.max_total_attempts
+            ):
+                self.stats.outcome = LIMIT
+                return None, mods
+            self.apply_currency(step.currency)
+            attempts += 1
+            step_stats.attempts += 1
+            self.stats.attempts += 1
+            mods = self.read_mods()
+            fresh = True
@@ -0,0 +1,51 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Iterable, Mapping
+from mytypes import Position
+from bot_controller import Bot
+from loguru import logger
+import config
+
+
+@dataclass(frozen=True, slots=True)
+class CraftSession:
+    """
+    Calibrated positions needed by one craft job, resolved once before the
+    first click. Slots are currency names, config keys or Bot globals.
+    """
+
+    positions: Mapping[str, Position]
+
+    def __getitem__(self, slot: str) -> Position:
+        return self.positions[slot]
+
+    def __contains__(self, slot: str) -> bool:
+        return slot in self.positions
+
+
+def is_unset(pos: Position | None) -> bool:
+    return not pos or (pos.x == 0 and pos.y == 0)
+
+
+def resolve_session(
+    currencies: Iterable[str] = (),
+    config_keys: Iterable[tuple[str, str]] = (),
+    global_keys: Iterable[str] = (),
+) -> CraftSession | None:
+    """
+    Resolve every position a job needs up front. Logs every missing
+    calibration and returns None if any of them is unset, so the job fails
+    before its first click instead of partway through a run.
+    """
+    positions: dict[str, Position] = {}
+    for currency in currencies:
+        positions[currency] = config.get_value_as_position("currency", currency)
+    for section, key in config_keys:
+        positions[key] = config.get_value_as_position(section, key)
+    for key in global_keys:
+        positions[key] = Bot.get_global(key)
+    missing = [slot for slot, pos in positions.items() if is_unset(pos)]
+    if missing:
+        logger.error(f"Calibration not set for: {', '.join(missing)}")
+        return None
+    return CraftSession(MappingProxyType(positions))
@@ -0,0 +1,341 @@
+import atexit
+import itertools
+import multiprocessing
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from functools import partial
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable
+from loguru import logger
+import config
+import session_log
+
+POLL = 0.01  # Seconds between status polls while a job runs
+ITEM_BYTES = 8192  # Room for the last item text in the status block
+CALLBACKS = ("attempt_callback", "success_callback")
+
+# seq, job id, running, item length, attempts, crafted, last attempt
+_HEADER = struct.Struct("<QQIIQQd")
+_SEQ = struct.Struct("<Q")
+BLOCK_SIZE = _HEADER.size + ITEM_BYTES
+
+
+@dataclass(slots=True)
+class WorkerStatus:
+    job_id: int = 0
+    running: bool = False
+    attempts: int = 0
+    crafted: int = 0
+    last_attempt: float = 0.0  # time.monotonic() of the last attempt
+    item_info: str = ""  # Item text of the last success
+
+
+class StatusBlock:
+    """
+    WorkerStatus in shared memory, written by the worker and polled by the
+    GUI without a round trip. A sequence number around every write (odd while
+    writing) lets readers retry torn reads instead of taking a lock.
+    """
+
+    def __init__(self, buf: memoryview):
+        self.buf = buf
+        self._seq = _SEQ.unpack_from(buf)[0]
+
+    def write(self, status: WorkerStatus, item_changed: bool = False) -> None:
+        item = status.item_info.encode("utf-8")[:ITEM_BYTES]
+        self._seq += 1
+        _SEQ.pack_into(self.buf, 0, self._seq)
+        if item_changed:
+            self.buf[_HEADER.size : _HEADER.size + len(item)] = item
+        _HEADER.pack_into(
+            self.buf,
+            0,
+            self._seq,
+            status.job_id,
+            status.running,
+            len(item),
+            status.attempts,
+            status.crafted,
+            status.last_attempt,
+        )
+        self._seq += 1
+        _SEQ.pack_into(self.buf, 0, self._seq)
+
+    def read(self) -> WorkerStatus:
+        while True:
+            seq = _SEQ.unpack_from(self.buf)[0]
+            if seq % 2 == 0:
+                _, job_id, running, length, attempts, crafted, last = (
+                    _HEADER.unpack_from(self.buf)
+                )
+                item = bytes(self.buf[_HEADER.size : _HEADER.size + length])
+                if _SEQ.unpack_from(self.buf)[0] == seq:
+                    return WorkerStatus(
+                        job_id,
+                        bool(running),
+                        attempts,
+                        crafted,
+                        last,
+                        item.decode("utf-8", "replace"),
+                    )
+            time.sleep(0)
+
+
+def _serve(conn, shm_name: str, backend=None) -> None:
+    """
+    Worker process main loop: runs one job at a time on a thread, publishes
+    its counters to the status block and answers commands from the pipe.
+    """
+    from bot_controller import Bot
+    from job_executor import CANCELLED, DONE, FAILED, CancellationToken
+
+    # Spawned children share the GUI's resource tracker, so attaching here
+    # doesn't make the block this process's to unlink.
+    shm = SharedMemory(name=shm_name)
+    block = StatusBlock(shm.buf)
+    status = WorkerStatus()
+    block.write(status, item_changed=True)
+    send_lock = threading.Lock()
+    if backend is not None:
+        Bot.set_backend(backend)
+    current: dict[int, CancellationToken] = {}
+
+    def send(*message) -> None:
+        with send_lock:
+            conn.send(message)
+
+    def attempt() -> None:
+        status.attempts += 1
+        status.last_attempt = time.monotonic()
+        block.write(status)
+
+    def success(payload=None) -> None:
+        status.crafted += 1
+        if isinstance(payload, str):
+            status.item_info = payload
+        block.write(status, item_changed=isinstance(payload, str))
+        send("success", status.job_id, payload)
+
+    def run(job_id, func, args, kwargs, callbacks, token) -> None:
+        if "attempt_callback" in callbacks:
+            kwargs["attempt_callback"] = attempt
+        if "success_callback" in callbacks:
+            kwargs["success_callback"] = success
+        Bot.set_cancellation(token)
+        result, error = None, None
+        try:
+            result = func(*args, **kwargs)
+            state = CANCELLED if Bot.get_killswitch_state() else DONE
+        except Exception as e:
+            logger.exception(f"Worker job {job_id} failed")
+            state, error = FAILED, repr(e)
+        finally:
+            Bot.set_cancellation(None)
+            status.running = False
+            block.write(status)
+            current.pop(job_id, None)
+        try:
+            send("done", job_id, state, result, error)
+        except Exception as e:
+            # The result didn't pickle; the outcome still has to get back.
+            send("done", job_id, state, None, f"Unpicklable result: {e!r}")
+
+    while True:
+        try:
+            command, *message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if command == "start":
+            job_id, func, args, kwargs, callbacks, globals_ = message
+            if current:
+                send("done", job_id, FAILED, None, "Worker is busy")
+                continue
+            for key, value in globals_.items():
+                Bot.set_global(key, value)
+            status.job_id = job_id
+            status.running = True
+            status.attempts = status.crafted = 0
+            status.item_info = ""
+            block.write(status, item_changed=True)
+            token = current[job_id] = CancellationToken()
+            threading.Thread(
+                target=run,
+                args=(job_id, func, args, kwargs, callbacks, token),
+                name="craft-worker-job",
+                daemon=True,
+            ).start()
+        elif command == "stop":
+            if token := current.get(message[0]):
+                token.cancel()
+        elif command == "killswitch":
+            Bot.set_killswitch(message[0])
+        elif command == "quit":
+            break
+    for token in list(current.values()):
+        token.cancel()
+    # Process children exit without running atexit handlers.
+    session_log.disable()
+    shm.close()
+
+
+class CraftWorker:
+    """
+    A process that runs craft jobs away from the GUI, so Qt painting and the
+    GUI's threads don't hold the GIL in the middle of the click/copy/parse
+    loop. Commands go over a pipe; counters and the last item are published in
+    a shared memory StatusBlock. `backend` replaces the worker's bot backend,
+    e.g. with a simulator.
+    """
+
+    def __init__(self, backend=None):
+        context = multiprocessing.get_context("spawn")
+        self.shm = SharedMemory(create=True, size=BLOCK_SIZE)
+        self.block = StatusBlock(self.shm.buf)
+        self.block.write(WorkerStatus(), item_changed=True)
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_serve,
+            args=(child_conn, self.shm.name, backend),
+            name="craft-worker",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self._send_lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def _send(self, *message) -> None:
+        with self._send_lock:
+            self.conn.send(message)
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def status(self) -> WorkerStatus:
+        return self.block.read()
+
+    def stop(self, job_id: int) -> None:
+        self._send("stop", job_id)
+
+    def killswitch(self, on: bool) -> None:
+        self._send("killswitch", on)
+
+    def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs) in the worker and block until it returns.
+        func and its arguments must pickle; attempt_callback and
+        success_callback stay in this process and are called from here as
+        the worker reports attempts and successes. The Bot killswitch or job
+        cancellation of the calling thread stops the worker's job.
+        """
+        from bot_controller import Bot
+
+        callbacks = {name: kwargs.pop(name) for name in CALLBACKS if kwargs.get(name)}
+        job_id = next(self._ids)
+        self._send(
+            "start", job_id, func, args, kwargs, tuple(callbacks), Bot.get_globals()
+        )
+        attempts = 0
+        stopping = False
+        while True:
+            if not stopping and Bot.get_killswitch_state():
+                self.stop(job_id)
+                stopping = True
+            message = self.conn.recv() if self.conn.poll(POLL) else None
+            status = self.status()
+            if status.job_id == job_id and (
+                callback := callbacks.get("attempt_callback")
+            ):
+                for _ in range(status.attempts - attempts):
+                    callback()
+                attempts = status.attempts
+            if message is None:
+                if not self.alive():
+                    raise RuntimeError("Craft worker exited")
+                continue
+            kind, message_id, *payload = message
+            if message_id != job_id:
+                continue
+            if kind == "success" and (callback := callbacks.get("success_callback")):
+                callback(*payload)
+            elif kind == "done":
+                state, result, error = payload
+                if error is not None:
+                    raise RuntimeError(f"Craft worker: {error}")
+                return result
+
+    def close(self) -> None:
+        try:
+            self._send("quit")
+        except OSError:
+            pass
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+        self.shm.close()
+        self.shm.unlink()
+
+
+_worker: CraftWorker | None = None
+_worker_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return bool(config.get_value("worker", "process"))
+
+
+def worker() -> CraftWorker:
+    """
+    The shared worker process, started (or restarted after a crash) on use.
+    """
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.alive():
+            if _worker is not None:
+                logger.warning("Craft worker exited, restarting it")
+                _worker.close()
+            _worker = CraftWorker()
+            logger.info(f"Craft worker started (pid {_worker.process.pid})")
+        return _worker
+
+
+def shutdown() -> None:
+    global _worker
+    with _worker_lock:
+        if _worker is not None:
+            _worker.close()
+            _worker = None
+
+
+def notify_killswitch(on: bool) -> None:
+    """
+    Mirror the GUI killswitch in the worker, if one is running.
+    """
+    with _worker_lock:
+        if _worker is not None and _worker.alive():
+            _worker.killswitch(on)
+
+
+def _run_in_worker(func: Callable, *args, **kwargs) -> Any:
+    return worker().run(func, *args, **kwargs)
+
+
+def dispatch(func: Callable) -> Callable:
+    """
+    func itself, or a stand-in that runs it in the worker process when
+    "Run crafts in a separate process" is enabled in Settings.
+    """
+    if not enabled():
+        return func
+    return partial(_run_in_worker, func)
+
+
+atexit.register(shutdown)
+
+logger.add(
+    sys.stderr, format="{time} {level} {message}", filter="craft_worker", level="INFO"
+)
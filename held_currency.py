@@ -0,0 +1,99 @@
+from typing import Mapping
+from bot_controller import Bot
+from input_actions import (
+    apply_currency_actions,
+    compile_actions,
+    key_down,
+    key_up,
+    left_click,
+    move,
+    right_click,
+)
+from mytypes import Position
+from loguru import logger
+
+
+class HeldCurrency:
+    """
+    Applies currency with shift held: the currency is picked up once and
+    every further application of the same currency is a move to the item and
+    a single shift+left click. Shift is held only for the clicks, so the copies in
+    between are a plain ctrl+alt+c and activating the window never presses
+    alt with shift down. Switching currency, leaving the `with` block
+    (success, killswitch or an exception) or calling release() drops the
+    currency.
+
+    Times the batches of both kinds so the saving can be reported.
+
+    Only used with the "Hold Shift" / --hold toggle, off by default: that the
+    currency stays on the cursor while shift is up between clicks is modelled
+    by the simulator but not yet confirmed in game.
+    """
+
+    def __init__(
+        self, positions: Mapping[str, Position], item_pos: Position | None = None
+    ):
+        self.positions = positions
+        self.item_pos = item_pos
+        self.current: str | None = None
+        self._release = compile_actions(key_up("shift"), right_click())
+        self.pickups = 0
+        self.pickup_time = 0.0
+        self.clicks = 0
+        self.click_time = 0.0
+
+    def apply(self, currency: str, item_pos: Position | None = None) -> None:
+        """
+        Apply the currency to `item_pos` (default the item given to the
+        constructor), picking it up first if it is not the one held.
+        """
+        backend = Bot.backend()
+        start = backend.now()
+        item_pos = item_pos or self.item_pos
+        if currency == self.current:
+            Bot.run(
+                compile_actions(
+                    key_down("shift"), move(item_pos), left_click(), key_up("shift")
+                )
+            )
+            self.clicks += 1
+            self.click_time += backend.now() - start
+            return
+        self.release()
+        start = backend.now()
+        actions = apply_currency_actions(self.positions[currency], item_pos)
+        Bot.run(compile_actions(key_down("shift"), *actions.actions, key_up("shift")))
+        self.current = currency
+        self.pickups += 1
+        self.pickup_time += backend.now() - start
+
+    def release(self) -> None:
+        if self.current is not None:
+            # Never cut short: shift must come up even if the killswitch
+            # interrupted a click.
+            Bot.run(self._release, interruptible=False)
+            self.current = None
+
+    def saving(self) -> float:
+        """
+        Seconds saved against picking the currency up for every click.
+        """
+        if not self.pickups or not self.clicks:
+            return 0.0
+        per_click = self.pickup_time / self.pickups - self.click_time / self.clicks
+        return per_click * self.clicks
+
+    def log_saving(self) -> None:
+        if self.clicks:
+            logger.info(
+                f"Held currency: {self.pickups} pick-ups, {self.clicks} held clicks, "
+                f"saved {self.clicks} moves, {self.clicks} clicks and "
+                f"{self.saving():.2f}s"
+            )
+
+    def __enter__(self) -> "HeldCurrency":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+        self.log_saving()
@@ -0,0 +1,150 @@
+from dataclasses import dataclass
+from typing import Iterable
+from bot_backend import BotBackend
+from mytypes import Position
+
+CLICK_DELAY = 0.01  # Settle time after a click inside a batch
+
+
+@dataclass(frozen=True, slots=True)
+class Action:
+    kind: str  # BotBackend method name
+    args: tuple = ()
+    delay: float = 0.0  # Seconds to wait after the action
+
+
+def move(pos: Position, delay: float = 0.0) -> Action:
+    return Action("move_to", (pos.x, pos.y), delay)
+
+
+def left_click(delay: float = CLICK_DELAY) -> Action:
+    return Action("left_click", (), delay)
+
+
+def right_click(delay: float = CLICK_DELAY) -> Action:
+    return Action("right_click", (), delay)
+
+
+def press(key: str, delay: float = 0.0) -> Action:
+    return Action("press", (key,), delay)
+
+
+def hotkey(*keys: str, delay: float = 0.0) -> Action:
+    return Action("hotkey", keys, delay)
+
+
+def key_down(key: str, delay: float = 0.0) -> Action:
+    return Action("key_down", (key,), delay)
+
+
+def key_up(key: str, delay: float = 0.0) -> Action:
+    return Action("key_up", (key,), delay)
+
+
+@dataclass(frozen=True, slots=True)
+class ActionSequence:
+    """
+    Input actions compiled once per job and handed to the backend as a
+    single batch (see BotBackend.run_actions).
+    """
+
+    actions: tuple[Action, ...]
+
+    @property
+    def delay(self) -> float:
+        return sum(action.delay for action in self.actions)
+
+
+def compile_actions(*actions: Action) -> ActionSequence:
+    return ActionSequence(tuple(actions))
+
+
+def apply_currency_actions(currency_pos: Position, item_pos: Position):
+    """
+    Pick up a currency with a right click and use it on the item.
+    """
+    return compile_actions(
+        move(currency_pos), right_click(), move(item_pos), left_click()
+    )
+
+
+class RecordingBackend(BotBackend):
+    """
+    Records every action with the time it started, then forwards it to
+    `backend`. Without a backend it is a fake that only records and keeps a
+    virtual clock, e.g. for checking which inputs a loop produces.
+    """
+
+    def __init__(self, backend: BotBackend | None = None):
+        self.backend = backend
+        self.clock = 0.0
+        self.timeline: list[tuple[float, Action]] = []
+
+    def _record(self, kind: str, *args) -> None:
+        self.timeline.append((self.now(), Action(kind, args)))
+        if self.backend:
+            getattr(self.backend, kind)(*args)
+
+    def run_actions(self, actions: Iterable[Action], interruptible=True) -> None:
+        actions = tuple(actions)
+        if not self.backend:
+            return super().run_actions(actions, interruptible)
+        start = self.now()
+        offset = 0.0
+        for action in actions:
+            self.timeline.append((start + offset, action))
+            offset += action.delay
+        self.backend.run_actions(actions, interruptible)
+
+    def move_to(self, x: int, y: int) -> None:
+        self._record("move_to", x, y)
+
+    def left_click(self) -> None:
+        self._record("left_click")
+
+    def right_click(self) -> None:
+        self._record("right_click")
+
+    def press(self, key: str) -> None:
+        self._record("press", key)
+
+    def hotkey(self, *keys: str) -> None:
+        self._record("hotkey", *keys)
+
+    def key_down(self, key: str) -> None:
+        self._record("key_down", key)
+
+    def key_up(self, key: str) -> None:
+        self._record("key_up", key)
+
+    def read_clipboard(self) -> str:
+        return self.backend.read_clipboard() if self.backend else ""
+
+    def write_clipboard(self, text: str) -> None:
+        if self.backend:
+            self.backend.write_clipboard(text)
+
+    def clipboard_sequence(self) -> int | None:
+        return self.backend.clipboard_sequence() if self.backend else None
+
+    def activate_window(self, title: str) -> bool:
+        return self.backend.activate_window(title) if self.backend else True
+
+    def wait_for_click(self) -> Position | None:
+        return self.backend.wait_for_click() if self.backend else None
+
+    @property
+    def window_enumerations(self) -> int:
+        return self.backend.window_enumerations if self.backend else 0
+
+    def stopped(self) -> bool:
+        return super().stopped() or bool(self.backend and self.backend.stopped())
+
+    def sleep(self, seconds: float) -> None:
+        if self.backend:
+            self.backend.sleep(seconds)
+        else:
+            self.clock += seconds
+
+    def now(self) -> float:
+        return self.backend.now() if self.backend else self.clock
@@ -0,0 +1,258 @@
+import re
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Mapping
+from bot_controller import Bot
+from item_parser import parse_item
+from mod_matcher import ModMatcher
+from mytypes import Grid, ParsedItem, Position
+from loguru import logger
+import config
+
+_NUMBER_RGX = re.compile(r"[+-]?\d+(?:\.\d+)?")
+
+Cell = tuple[int, int]  # (row, col) in the grid
+
+
+def mod_key(line: str) -> tuple[str, list[float]]:
+    """
+    Split a mod line into its template and values:
+    "+32% to Fire Resistance" -> ("#% to Fire Resistance", [32.0]).
+    """
+    values = [float(number) for number in _NUMBER_RGX.findall(line)]
+    return _NUMBER_RGX.sub("#", line), values
+
+
+@dataclass(slots=True)
+class IndexedItem:
+    cell: Cell
+    pos: Position
+    text: str
+    item: ParsedItem
+    mods: dict[str, list[float]]  # Template -> values, implicits included
+
+
+@dataclass(slots=True)
+class ScanStats:
+    copied: int = 0  # Cells hovered and copied
+    changed: int = 0  # Cells whose text differed from the last scan
+    empty: int = 0
+    skipped: int = 0  # Clean cells not copied again
+    elapsed: float = 0.0
+    stopped: bool = False
+
+
+@dataclass(slots=True)
+class Query:
+    """
+    base: substring of the base type, case-insensitive.
+    min_ilvl: minimum item level.
+    mods: regexes that must each match one mod line (implicits included).
+    values: template substring -> minimum of the first value of the matching
+    line, e.g. {"Item Quantity": 80} or {"to maximum Life": 70}.
+    """
+
+    base: str = ""
+    min_ilvl: int = 0
+    mods: tuple[str, ...] = ()
+    values: Mapping[str, float] = field(default_factory=dict)
+
+
+class InventoryIndex:
+    """
+    Parsed items of every cell in a grid, indexed by base, item level and mod
+    template so queries don't parse or regex the whole inventory.
+
+    Scans are incremental: a cell is copied again only when it is dirty, i.e.
+    never scanned or clicked by the bot since (see Bot.add_click_listener).
+    Moving items by hand is invisible to the bot, so that needs a full scan.
+    """
+
+    def __init__(self, grid: Grid):
+        self.grid = grid
+        self.items: dict[Cell, IndexedItem] = {}
+        self.empty: set[Cell] = set()
+        self.dirty: set[Cell] = {
+            (row, col) for row in range(grid.rows) for col in range(grid.cols)
+        }
+        self.by_base: dict[str, set[Cell]] = defaultdict(set)
+        self.by_ilvl: dict[int, set[Cell]] = defaultdict(set)
+        self.by_mod: dict[str, dict[Cell, list[float]]] = defaultdict(dict)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def mark_dirty(self, pos: Position) -> None:
+        if cell := self.grid.locate(pos):
+            with self._lock:
+                self.dirty.add(cell)
+
+    def mark_all_dirty(self) -> None:
+        with self._lock:
+            self.dirty.update(
+                (row, col)
+                for row in range(self.grid.rows)
+                for col in range(self.grid.cols)
+            )
+
+    def _remove(self, cell: Cell) -> None:
+        indexed = self.items.pop(cell, None)
+        if indexed is None:
+            return
+        self.by_base[indexed.item.base].discard(cell)
+        self.by_ilvl[indexed.item.ilvl].discard(cell)
+        for key in indexed.mods:
+            self.by_mod[key].pop(cell, None)
+
+    def _add(self, cell: Cell, pos: Position, text: str, item: ParsedItem) -> None:
+        mods: dict[str, list[float]] = {}
+        lines = [line for mod in item.implicits for line in mod.lines]
+        lines += item.explicit_lines()
+        # Map quantity, rarity etc. are properties, not mods.
+        lines += item.properties
+        for line in lines:
+            key, values = mod_key(line)
+            mods.setdefault(key, values)
+        indexed = IndexedItem(cell, pos, text, item, mods)
+        self.items[cell] = indexed
+        self.by_base[item.base].add(cell)
+        self.by_ilvl[item.ilvl].add(cell)
+        for key, values in mods.items():
+            self.by_mod[key][cell] = values
+
+    def update(self, cell: Cell, text: str) -> bool:
+        """
+        Store the copied text of a cell. Returns whether it changed; unchanged
+        text is not parsed again.
+        """
+        with self._lock:
+            self.dirty.discard(cell)
+            current = self.items.get(cell)
+            if current is not None and current.text == text:
+                return False
+            if current is None and not text and cell in self.empty:
+                return False
+            self._remove(cell)
+            item = parse_item(text)
+            if item is None:
+                self.empty.add(cell)
+            else:
+                self.empty.discard(cell)
+                self._add(cell, self.grid.cell(*cell), text, item)
+            return True
+
+    def scan(
+        self, full: bool = False, should_stop: Callable[[], bool] | None = None
+    ) -> ScanStats:
+        """
+        Copy every dirty cell (every cell with full=True) in serpentine order
+        and index the results.
+        """
+        stats = ScanStats()
+        backend = Bot.backend()
+        start = backend.now()
+        if full:
+            self.mark_all_dirty()
+        for cell in self.grid.serpentine(self.grid.first):
+            if should_stop and should_stop():
+                stats.stopped = True
+                break
+            with self._lock:
+                dirty = cell in self.dirty
+            if not dirty:
+                stats.skipped += 1
+                continue
+            # No retries: an empty cell never answers, and each retry would
+            # cost a full timeout.
+            text = Bot.get_item_info(self.grid.cell(*cell), single=True)
+            stats.copied += 1
+            if self.update(cell, text):
+                stats.changed += 1
+            if not text:
+                stats.empty += 1
+        stats.elapsed = backend.now() - start
+        return stats
+
+    def query(self, query: Query) -> list[IndexedItem]:
+        """
+        Items matching every field of the query, in grid order.
+        """
+        with self._lock:
+            cells = set(self.items)
+            if query.base:
+                base = query.base.lower()
+                cells &= {
+                    cell
+                    for name, matches in self.by_base.items()
+                    if base in name.lower()
+                    for cell in matches
+                }
+            if query.min_ilvl:
+                cells &= {
+                    cell
+                    for ilvl, matches in self.by_ilvl.items()
+                    if ilvl >= query.min_ilvl
+                    for cell in matches
+                }
+            for stat, minimum in query.values.items():
+                stat = stat.lower()
+                cells &= {
+                    cell
+                    for key, matches in self.by_mod.items()
+                    if stat in key.lower()
+                    for cell, values in matches.items()
+                    if values and values[0] >= minimum
+                }
+            if query.mods and cells:
+                matcher = ModMatcher(query.mods, re.IGNORECASE)
+                cells = {
+                    cell
+                    for cell in cells
+                    if matcher.matches_all(self._lines(self.items[cell].item))
+                }
+            return [self.items[cell] for cell in sorted(cells)]
+
+    @staticmethod
+    def _lines(item: ParsedItem) -> Iterable[str]:
+        for mod in item.implicits:
+            yield from mod.lines
+        yield from item.explicit_lines()
+        yield from item.properties
+
+
+_index: InventoryIndex | None = None
+_index_lock = threading.Lock()
+
+
+def current(grid: Grid | None = None) -> InventoryIndex | None:
+    """
+    The shared index of the calibrated inventory grid, or None if it isn't
+    calibrated. Kept up to date by scan_inventory and craft job clicks.
+    """
+    global _index
+    grid = grid or config.get_value_as_grid("inventory", "grid")
+    if grid is None:
+        return None
+    with _index_lock:
+        if _index is None or _index.grid != grid:
+            if _index is not None:
+                Bot.remove_click_listener(_index.mark_dirty)
+            _index = InventoryIndex(grid)
+            Bot.add_click_listener(_index.mark_dirty)
+        return _index
+
+
+def scan_inventory(grid: Grid | None = None, full: bool = False) -> ScanStats | None:
+    index = current(grid)
+    if index is None:
+        logger.error("Inventory grid is not calibrated")
+        return None
+    stats = index.scan(full, Bot.get_killswitch_state)
+    logger.info(
+        f"Inventory scan: {stats.copied} copied ({stats.changed} changed, "
+        f"{stats.empty} empty), {stats.skipped} unchanged skipped, "
+        f"{len(index)} items indexed in {stats.elapsed:.2f}s"
+    )
+    return stats
@@ -1,11 +1,21 @@
-import pyautogui
 import re
-import time
+from contextlib import nullcontext
 from dataclasses import dataclass
-from mytypes import Position
-from bot_controller import Bot
+from bot_controller import Bot, log_window_enumerations
+from craft_engine import (
+    FINISHED,
+    CompiledStep,
+    CraftEngine,
+    CraftProgram,
+    EngineStats,
+)
+from craft_session import CraftSession, resolve_session
+from held_currency import HeldCurrency
+from input_actions import apply_currency_actions
+from item_parser import parse_item
+from mod_matcher import ModMatcher
+import session_log
 from loguru import logger
-import config
 
 # TODO: implement crafting 'blueprints' alt/regal/alch etc for fully fledged crafting
 # TODO: implement delve crafting (pick out resonators -> put fossil in -> craft)
@@ -25,90 +35,118 @@ class CraftingStep:
 
 def process_item_info(item_info: str) -> list[str]:
     """
-    Process the item info text and extract a list of mods.
-    Assumes that mods are in the second-to-last block of text.
+    Process the item info text and extract a list of explicit mod lines.
     """
-    info = item_info.split("--------")
-    if len(info) < 2:
+    item = parse_item(item_info)
+    if not item:
         return []
-    mods = [mod for mod in info[-2].strip().split("\n") if not mod.startswith("(")]
-    return mods
+    return item.explicit_lines()
 
 
-def craft_item_advanced(steps: list[CraftingStep], counter=0) -> None:
+def compile_steps(steps: list[CraftingStep]) -> CraftProgram:
+    return CraftProgram(
+        tuple(
+            CompiledStep(
+                currency=step.currency,
+                predicate=(
+                    None
+                    if step.auto_success
+                    else ModMatcher([step.condition_regex], re.IGNORECASE).matches_any
+                ),
+                on_success=step.on_success,
+                on_failure=step.on_failure,
+                max_attempts=step.max_attempts,
+                label=step.condition_regex,
+            )
+            for step in steps
+        )
+    )
+
+
+@log_window_enumerations
+def craft_item_advanced(
+    steps: list[CraftingStep] | CraftProgram,
+    session: CraftSession | None = None,
+    hold_currency: bool = False,
+    success_callback=None,
+    attempt_callback=None,
+) -> EngineStats | None:
     """
     Automates item crafting using a sequence of steps.
     For each step, repeatedly perform the crafting method until the condition (regex match)
-    is met or max_attempts is reached.
+    is met or max_attempts is reached, then follow the step's success/failure transition.
+    With hold_currency, repeated applications of the same currency keep it on
+    the cursor with shift held. success_callback is called with the item text
+    when the sequence finishes, attempt_callback after every currency applied.
     """
-    # Retrieve the global item position used for extracting item info.
-    item_pos = Bot.get_global("craft-item")
-    if not item_pos:
-        logger.error("Item position not set.")
-        return
-
-    if counter >= len(steps):
-        logger.info("Crafting sequence finished")
-        return
-    step = steps[counter]
-
-    # Get initial item info.
+    program = steps if isinstance(steps, CraftProgram) else compile_steps(steps)
+    # Resolve the item position and every currency used by the steps up front.
+    session = session or resolve_session(program.currencies, global_keys=["craft-item"])
+    if not session:
+        return None
+    item_pos = session["craft-item"]
+    actions = {
+        currency: apply_currency_actions(session[currency], item_pos)
+        for currency in program.currencies
+    }
+    held = HeldCurrency(session.positions, item_pos) if hold_currency else None
     item_info = Bot.get_item_info(item_pos)
-    mods = process_item_info(item_info)
-
-    attempts = 0
-    # Continue the step until the condition is met or max_attempts reached.
-    while attempts < step.max_attempts and not Bot.get_killswitch_state():
-        # Check if any mod matches the condition for this step.
-        if any(re.search(step.condition_regex, mod, re.IGNORECASE) for mod in mods):
-            logger.info(f"Step condition met: {step.condition_regex}")
-            break  # Proceed to next step.
-        # Execute the crafting method for this step.
-        method_position = currency_pos_lookup(step.currency)
-        if not method_position:
-            continue
-        pyautogui.moveTo(method_position.x, method_position.y)
-        pyautogui.rightClick()
-        pyautogui.moveTo(item_pos.x, item_pos.y)
-        pyautogui.leftClick()
-        attempts += 1
-        time.sleep(0.1)
-        # Update item info and mods after the crafting action.
-        item_info = Bot.get_item_info(item_pos)
-        mods = process_item_info(item_info)
-    else:
-        # If the while loop completes without a break, the condition was never met.
-        logger.info(f"Step failed after {attempts} attempts: {step.condition_regex}")
-        if step.on_failure != -1:
-            return craft_item_advanced(steps, counter=step.on_failure)
-        return  # Exit the crafting sequence.
-    craft_item_advanced(steps, counter=step.on_success)
+    job_log = session_log.job("item")
+    last_currency = None
 
+    def apply_currency(currency: str) -> None:
+        nonlocal item_info, last_currency
+        last_currency = currency
+        if held:
+            held.apply(currency)
+        else:
+            Bot.run(actions[currency])
+        if attempt_callback:
+            attempt_callback()
+        item_info = Bot.wait_for_item_change(item_pos, item_info, currency)
 
-def currency_pos_lookup(method: str) -> Position | None:
-    if not (value := config.get_value_as_position("currency", method)):
-        logger.error(f"Calibration for {method} not set.")
-        return None
+    def read_mods() -> list[str]:
+        return process_item_info(item_info)
 
-    return value
+    # Each read is logged once the next one comes in, so the last can be
+    # logged as FINISHED if the engine finishes on it.
+    last_read: tuple | None = None
 
+    def record(index: int, mods: list[str], matched: bool) -> None:
+        nonlocal last_read
+        if last_read:
+            job_log.record(*last_read)
+        outcome = session_log.HIT if matched else session_log.MISS
+        last_read = (item_info, mods, outcome, last_currency, index)
 
-def filter_mods_by_regex(
-    match_any_mod: bool,
-    mods: list[str],
-    regexes: list[str],
-    matching_tiers: list[tuple[int, bool]],
-) -> bool:
-    matched = 0
-    for tier, modtext in zip(mods[::2], mods[1::2]):
-        for i, regex in enumerate(regexes):
-            if re.search(regex, modtext.lower()):
-                logger.info(f"Regex found, {regex}; {modtext}")
-                if _tier := re.search(r"Tier: (\d+)", tier):
-                    tier_number = int(_tier.group(1))
-                    matching_tier, gthan = matching_tiers[i]
-                    if (gthan and tier_number <= matching_tier) or (
-                        tier_number == matching_tier
-                    ):
-                        matched += 1
-    return (match_any_mod and matched > 0) or (matched == len(regexes))
+    engine = CraftEngine(
+        program,
+        apply_currency,
+        read_mods,
+        Bot.get_killswitch_state,
+        on_read=record,
+    )
+    with held or nullcontext():
+        stats = engine.run()
+    if last_read:
+        text, mods, outcome, currency, index = last_read
+        if stats.outcome == FINISHED:
+            outcome = session_log.FINISHED
+        job_log.record(text, mods, outcome, currency, index)
+    if held:
+        stats.held_clicks = held.clicks
+        stats.held_saving = held.saving()
+    if stats.outcome == FINISHED and success_callback:
+        success_callback(item_info)
+    logger.info(
+        f"Crafting sequence {stats.outcome} at step {stats.final_step + 1} after "
+        f"{stats.attempts} attempts and {stats.transitions} transitions "
+        f"in {stats.elapsed:.1f}s"
+    )
+    for i, step_stats in enumerate(stats.steps):
+        logger.info(
+            f"Step {i + 1}: {step_stats.entries} entries, {step_stats.attempts} "
+            f"attempts, {step_stats.successes} successes, {step_stats.failures} "
+            f"failures, {step_stats.elapsed:.2f}s"
+        )
+    return stats
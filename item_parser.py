@@ -0,0 +1,116 @@
+import re
+from mytypes import ItemMod, ParsedItem
+
+SEPARATOR = "--------"
+
+# { Prefix Modifier "Savage" (Tier: 1) — Damage }
+# { Master Crafted Suffix Modifier "of Craft" (Rank: 2) — Attribute }
+# { Implicit Modifier — Elemental, Resistance }
+MOD_HEADER_RGX = re.compile(
+    r'^\{ (?P<kind>.+?) Modifier(?: "(?P<name>[^"]*)")?'
+    r"(?: \((?:Tier|Rank): (?P<tier>\d+)\))?"
+)
+
+_ENCHANT_SUFFIX = " (enchant)"
+_IMPLICIT_SUFFIX = " (implicit)"
+
+
+def parse_item(item_info: str) -> ParsedItem | None:
+    """
+    Parse advanced copy (ctrl+alt+c) item text in a single pass over its lines.
+    Returns None when the text does not look like an item.
+    """
+    if not item_info:
+        return None
+    item = ParsedItem()
+    name_lines: list[str] = []
+    section = 0
+    section_line = 0
+    skip_section = False
+    current: ItemMod | None = None
+    current_implicit = False
+
+    for line in item_info.splitlines():
+        if not line:
+            continue
+        if line == SEPARATOR:
+            section += 1
+            section_line = 0
+            skip_section = False
+            current = None
+            continue
+        section_line += 1
+
+        if section == 0:
+            if line.startswith("Item Class: "):
+                item.item_class = line[12:]
+            elif line.startswith("Rarity: "):
+                item.rarity = line[8:]
+            else:
+                name_lines.append(line)
+            continue
+        if skip_section:
+            continue
+
+        first = line[0]
+        if first == "{":
+            if header := MOD_HEADER_RGX.match(line):
+                kind = header["kind"].lower()
+                tier = header["tier"]
+                current = ItemMod(
+                    line, kind, header["name"] or "", int(tier) if tier else -1, []
+                )
+                current_implicit = "implicit" in kind
+                if current_implicit:
+                    item.implicits.append(current)
+                else:
+                    item.explicits.append(current)
+                continue
+        elif first == "(":
+            # Reminder text, e.g. "(Elemental Ailments are Ignited, ...)"
+            continue
+
+        if current is not None:
+            if current_implicit and line.endswith(_IMPLICIT_SUFFIX):
+                line = line[: -len(_IMPLICIT_SUFFIX)]
+            current.lines.append(line)
+        elif line.endswith(_ENCHANT_SUFFIX):
+            item.enchants.append(line[: -len(_ENCHANT_SUFFIX)])
+        elif line.endswith(_IMPLICIT_SUFFIX):
+            # Implicits without an advanced copy header
+            current = ItemMod("", "implicit", "", -1, [line[: -len(_IMPLICIT_SUFFIX)]])
+            current_implicit = True
+            item.implicits.append(current)
+        elif line.startswith("Item Level: "):
+            item.ilvl = int(line[12:])
+        elif line == "Corrupted":
+            item.corrupted = True
+        elif section_line == 1 and line == "Requirements:":
+            skip_section = True
+        elif section == 1:
+            item.properties.append(line)
+
+    if not item.rarity:
+        return None
+    if name_lines:
+        item.name = name_lines[0]
+        item.base = name_lines[-1]
+        if item.rarity == "Magic" and len(name_lines) == 1:
+            item.base = magic_base(item.name, item.explicits)
+    return item
+
+
+def magic_base(name: str, explicits: list[ItemMod]) -> str:
+    """
+    A magic item's single name line is "<prefix> <base> <suffix>"; strip the
+    affix names given in the mod headers.
+    """
+    base = name
+    for mod in explicits:
+        if not mod.name:
+            continue
+        if mod.kind.endswith("prefix") and base.startswith(mod.name + " "):
+            base = base[len(mod.name) + 1 :]
+        elif mod.kind.endswith("suffix") and base.endswith(" " + mod.name):
+            base = base[: -len(mod.name) - 1]
+    return base
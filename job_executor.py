@@ -0,0 +1,178 @@
+import queue
+import threading
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Iterable
+from loguru import logger
+import sys
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class CancellationToken:
+    """
+    Set once to stop a job (and the rest of its chain). Craft loops see it
+    through Bot.get_killswitch_state() while the job runs.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks: list[Callable[[], None]] = []
+
+    def cancel(self) -> None:
+        self._event.set()
+        for callback in self._callbacks:
+            callback()
+
+    def on_cancel(self, callback: Callable[[], None]) -> None:
+        """
+        Call callback on cancel, or right away if already cancelled.
+        """
+        self._callbacks.append(callback)
+        if self.cancelled:
+            callback()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+@dataclass(eq=False)
+class Job:
+    name: str
+    func: Callable[[], Any]
+    token: CancellationToken = field(default_factory=CancellationToken)
+    state: str = QUEUED
+    result: Any = None
+    error: BaseException | None = None
+
+
+class JobExecutor:
+    """
+    Runs craft jobs one at a time on a single worker thread, the only thread
+    that drives the mouse and keyboard. Jobs submitted while another runs
+    are queued and start as soon as it finishes. Listeners are called from
+    the worker thread on every state change.
+    """
+
+    def __init__(self):
+        self._queue: queue.Queue[Job] = queue.Queue()
+        self._listeners: list[Callable[[Job], None]] = []
+        self._pending: list[Job] = []
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.current: Job | None = None
+
+    def add_listener(self, listener: Callable[[Job], None]) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Job], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _set_state(self, job: Job, state: str) -> None:
+        job.state = state
+        for listener in self._listeners:
+            try:
+                listener(job)
+            except Exception as e:
+                logger.error(f"Job listener failed: {e}")
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="job-executor", daemon=True
+                )
+                self._thread.start()
+
+    def _enqueue(self, job: Job) -> Job:
+        with self._lock:
+            self._pending.append(job)
+        self._set_state(job, QUEUED)
+        self._queue.put(job)
+        self._start()
+        return job
+
+    def submit(self, name: str, func: Callable, *args, **kwargs) -> Job:
+        return self._enqueue(Job(name, partial(func, *args, **kwargs)))
+
+    def chain(self, steps: Iterable[tuple[str, Callable[[], Any]]]) -> list[Job]:
+        """
+        Queue jobs to run back-to-back. They share one token: cancelling any
+        of them, or one failing, cancels the rest of the chain.
+        """
+        token = CancellationToken()
+        return [self._enqueue(Job(name, func, token)) for name, func in steps]
+
+    def pending(self) -> list[Job]:
+        with self._lock:
+            return list(self._pending)
+
+    def cancel_current(self) -> None:
+        if job := self.current:
+            job.token.cancel()
+
+    def cancel_all(self) -> None:
+        for job in self.pending():
+            job.token.cancel()
+        self.cancel_current()
+
+    def _run(self) -> None:
+        # Imported on the worker: the bot stack loads when the first job runs.
+        from bot_controller import Bot
+
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                self._pending.remove(job)
+            if job.token.cancelled or Bot.get_killswitch_state():
+                self._set_state(job, CANCELLED)
+                continue
+            self.current = job
+            Bot.set_cancellation(job.token)
+            self._set_state(job, RUNNING)
+            try:
+                job.result = job.func()
+            except Exception as e:
+                job.error = e
+                job.token.cancel()
+                logger.exception(f"Job {job.name} failed")
+                state = FAILED
+            else:
+                state = DONE
+                if Bot.get_killswitch_state():
+                    state = CANCELLED
+                    latency = Bot.stop_latency()
+                    logger.info(
+                        f"Job {job.name} stopped {latency * 1e3:.0f}ms after the request"
+                    )
+            finally:
+                Bot.set_cancellation(None)
+                self.current = None
+            self._set_state(job, state)
+
+
+_executor: JobExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def executor() -> JobExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = JobExecutor()
+        return _executor
+
+
+def submit(name: str, func: Callable, *args, **kwargs) -> Job:
+    return executor().submit(name, func, *args, **kwargs)
+
+
+logger.add(
+    sys.stderr, format="{time} {level} {message}", filter="job_executor", level="INFO"
+)
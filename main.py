@@ -1,3 +1,4 @@
+import importlib
 import sys
 import threading
 
@@ -19,20 +20,11 @@ from PySide6.QtWidgets import (
     QPushButton,
     QLabel,
 )
-from PySide6.QtCore import Signal, QObject
+from PySide6.QtCore import Signal, QObject, QTimer
 from PySide6.QtWidgets import QPushButton, QGraphicsDropShadowEffect
-from PySide6.QtGui import QIcon, QColor, QFont
+from PySide6.QtGui import QColor, QFont
 
-# Import pages from the pages subpackage
-from pages.calibration_page import CalibrationPage
-from pages.clusters_page import ClustersPage
-from pages.maps_page import MapsPage
-from pages.items_page import ItemsPage
-from pages.settings_page import SettingsPage
-
-from bot_controller import Bot
-
-import config
+from pages import icon_cache
 from theme import (
     get_stylesheet,
     get_button_style,
@@ -48,28 +40,74 @@ class KillswitchMonitor(QObject):
         self.start_monitor()
 
     def start_monitor(self):
-        import keyboard
-
         def monitor():
+            import keyboard
+
             while True:
                 keyboard.wait("+")
+                from bot_controller import Bot
+                import craft_worker, job_executor
 
                 Bot.toggle_killswitch()
                 state = Bot.get_killswitch_state()
+                if state:
+                    # Don't start queued jobs once the user hits the killswitch.
+                    job_executor.executor().cancel_all()
+                craft_worker.notify_killswitch(state)
                 self.killswitch_toggled.emit(state)
 
         threading.Thread(target=monitor, daemon=True).start()
 
 
+class JobMonitor(QObject):
+    job_changed = Signal(object)
+
+    def __init__(self):
+        import job_executor
+
+        super().__init__()
+        # Listeners run on the executor thread; the signal hands the job to
+        # the GUI thread.
+        job_executor.executor().add_listener(self.job_changed.emit)
+
+
+# Sidebar order. Pages are imported and built on first visit, so only the
+# calibration page is paid for before the window shows.
+PAGES = (
+    ("pages.calibration_page", "CalibrationPage"),
+    ("pages.clusters_page", "ClustersPage"),
+    ("pages.maps_page", "MapsPage"),
+    ("pages.items_page", "ItemsPage"),
+    ("pages.inventory_page", "InventoryPage"),
+    ("pages.stats_page", "StatsPage"),
+    ("pages.settings_page", "SettingsPage"),
+)
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Odin - PySide6 Version")
         self.setGeometry(100, 100, 800, 600)
+        self.theme_name = "Classic Dark"
+        self.built_pages: dict[int, QWidget] = {}
+        self.killswitch_monitor = None
+        self.job_monitor = None
         self.init_ui()
-        self.load_positions()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.killswitch_monitor is None:
+            # The monitors pull in the job executor and loguru; start them
+            # once the window is on screen.
+            self.killswitch_monitor = False
+            QTimer.singleShot(0, self.start_monitors)
+
+    def start_monitors(self):
         self.killswitch_monitor = KillswitchMonitor()
         self.killswitch_monitor.killswitch_toggled.connect(self.update_killswitch_label)
+        self.job_monitor = JobMonitor()
+        self.job_monitor.job_changed.connect(self.update_job_label)
 
     def init_ui(self):
         central_widget = QWidget()
@@ -85,7 +123,7 @@ class MainWindow(QMainWindow):
         button_style = get_button_style("Classic Dark")
 
         self.home_btn = QPushButton("Home")
-        self.home_btn.setIcon(QIcon("images/portal_scroll.png"))
+        self.home_btn.setIcon(icon_cache.icon("images/portal_scroll.png"))
         self.home_btn.setStyleSheet(button_style)
         # Create and assign a drop shadow effect
         shadow = QGraphicsDropShadowEffect(self.home_btn)
@@ -97,7 +135,7 @@ class MainWindow(QMainWindow):
         sidebar_layout.addWidget(self.home_btn)
 
         self.clusters_btn = QPushButton("Clusters")
-        self.clusters_btn.setIcon(QIcon("images/large_cluster_jewel.png"))
+        self.clusters_btn.setIcon(icon_cache.icon("images/large_cluster_jewel.png"))
         self.clusters_btn.setStyleSheet(button_style)
 
         # Create and assign a drop shadow effect
@@ -111,7 +149,7 @@ class MainWindow(QMainWindow):
         sidebar_layout.addWidget(self.clusters_btn)
 
         self.maps_btn = QPushButton("Maps")
-        self.maps_btn.setIcon(QIcon("images/t17_map.png"))
+        self.maps_btn.setIcon(icon_cache.icon("images/t17_map.png"))
         self.maps_btn.setStyleSheet(button_style)
 
         # Create and assign a drop shadow effect
@@ -125,7 +163,7 @@ class MainWindow(QMainWindow):
         sidebar_layout.addWidget(self.maps_btn)
 
         self.items_btn = QPushButton("Items")
-        self.items_btn.setIcon(QIcon("images/crafting_recipe.png"))
+        self.items_btn.setIcon(icon_cache.icon("images/crafting_recipe.png"))
         self.items_btn.setStyleSheet(button_style)
 
         # Create and assign a drop shadow effect
@@ -138,6 +176,32 @@ class MainWindow(QMainWindow):
         self.items_btn.clicked.connect(lambda: self.switch_page(3))
         sidebar_layout.addWidget(self.items_btn)
 
+        self.inventory_btn = QPushButton("Inventory")
+        self.inventory_btn.setStyleSheet(button_style)
+
+        # Create and assign a drop shadow effect
+        shadow = QGraphicsDropShadowEffect(self.inventory_btn)
+        shadow.setColor(QColor(0, 0, 0, 180))  # Black color with 180/255 opacity
+        shadow.setBlurRadius(10)  # Adjust the blur radius as desired
+        shadow.setOffset(2, 2)  # Adjust the offset for the shadow
+        self.inventory_btn.setGraphicsEffect(shadow)
+
+        self.inventory_btn.clicked.connect(lambda: self.switch_page(4))
+        sidebar_layout.addWidget(self.inventory_btn)
+
+        self.stats_btn = QPushButton("Stats")
+        self.stats_btn.setStyleSheet(button_style)
+
+        # Create and assign a drop shadow effect
+        shadow = QGraphicsDropShadowEffect(self.stats_btn)
+        shadow.setColor(QColor(0, 0, 0, 180))  # Black color with 180/255 opacity
+        shadow.setBlurRadius(10)  # Adjust the blur radius as desired
+        shadow.setOffset(2, 2)  # Adjust the offset for the shadow
+        self.stats_btn.setGraphicsEffect(shadow)
+
+        self.stats_btn.clicked.connect(lambda: self.switch_page(5))
+        sidebar_layout.addWidget(self.stats_btn)
+
         self.settings_btn = QPushButton("Settings")
         self.settings_btn.setStyleSheet(button_style)
         # Create and assign a drop shadow effect
@@ -146,75 +210,102 @@ class MainWindow(QMainWindow):
         shadow.setBlurRadius(10)  # Adjust the blur radius as desired
         shadow.setOffset(2, 2)  # Adjust the offset for the shadow
         self.settings_btn.setGraphicsEffect(shadow)
-        self.settings_btn.clicked.connect(lambda: self.switch_page(4))
+        self.settings_btn.clicked.connect(lambda: self.switch_page(6))
         sidebar_layout.addWidget(self.settings_btn)
 
         self.killswitch_label = QLabel("Killswitch: OFF")
         sidebar_layout.addWidget(self.killswitch_label)
+        self.job_label = QLabel("Job: Idle")
+        self.job_label.setWordWrap(True)
+        sidebar_layout.addWidget(self.job_label)
+        self.cancel_job_btn = QPushButton("Cancel Job")
+        self.cancel_job_btn.setStyleSheet(button_style)
+        self.cancel_job_btn.clicked.connect(self.cancel_job)
+        sidebar_layout.addWidget(self.cancel_job_btn)
         sidebar_layout.addStretch()
         sidebar.setLayout(sidebar_layout)
 
         # Pages
         self.pages = QStackedWidget()
-        self.calibration_page = CalibrationPage()
-        self.clusters_page = ClustersPage()
-        self.maps_page = MapsPage()
-        self.items_page = ItemsPage()
-        self.settings_page = SettingsPage()
-
-        # Connect theme change signal to propagate changes.
-        self.settings_page.theme_changed.connect(self.on_theme_changed)
-
-        self.pages.addWidget(self.calibration_page)
-        self.pages.addWidget(self.clusters_page)
-        self.pages.addWidget(self.maps_page)
-        self.pages.addWidget(self.items_page)
-        self.pages.addWidget(self.settings_page)
+        self.switch_page(0)
 
         main_layout.addWidget(sidebar)
         main_layout.addWidget(self.pages)
         central_widget.setLayout(main_layout)
         self.setCentralWidget(central_widget)
 
-    def load_positions(self):
-        cluster_pos = config.get_value("cluster", "button-location")
-        if cluster_pos:
-            self.settings_page.cluster_calib_status.setText(
-                f"({cluster_pos['x']}, {cluster_pos['y']})"
-            )
-        for key, label in self.calibration_page.currency_labels.items():
-            pos = config.get_value("currency", key)
-            if pos:
-                label.setText(f"({pos['x']}, {pos['y']})")
+    def page(self, index) -> QWidget:
+        """
+        The page at a sidebar index, importing and building it on first use.
+        """
+        if index not in self.built_pages:
+            module_name, class_name = PAGES[index]
+            page = getattr(importlib.import_module(module_name), class_name)()
+            if hasattr(page, "update_theme"):
+                page.update_theme(self.theme_name)
+            if hasattr(page, "theme_changed"):
+                # Connect theme change signal to propagate changes.
+                page.theme_changed.connect(self.on_theme_changed)
+            self.pages.addWidget(page)
+            self.built_pages[index] = page
+        return self.built_pages[index]
 
     def on_theme_changed(self, theme_name):
         # Update the application's stylesheet so the program's background and widget styles change.
         stylesheet = get_stylesheet(theme_name)
         super().setStyleSheet(stylesheet)
 
-        # Propagate the theme change to all pages that have an update_theme() method.
-        self.calibration_page.update_theme(theme_name)
-        self.items_page.update_theme(theme_name)
+        # Pages built later get the theme when they are built.
+        self.theme_name = theme_name
+        for page in self.built_pages.values():
+            if hasattr(page, "update_theme"):
+                page.update_theme(theme_name)
         # Update sidebar buttons if needed
         button_style = get_button_style(theme_name)
         self.home_btn.setStyleSheet(button_style)
         self.clusters_btn.setStyleSheet(button_style)
         self.maps_btn.setStyleSheet(button_style)
         self.items_btn.setStyleSheet(button_style)
+        self.inventory_btn.setStyleSheet(button_style)
+        self.stats_btn.setStyleSheet(button_style)
         self.settings_btn.setStyleSheet(button_style)
+        self.cancel_job_btn.setStyleSheet(button_style)
 
     def update_killswitch_label(self, state):
         self.killswitch_label.setText("Killswitch: ON" if state else "Killswitch: OFF")
 
+    def cancel_job(self):
+        import job_executor
+
+        job_executor.executor().cancel_current()
+
+    def update_job_label(self, job):
+        import job_executor
+
+        executor = job_executor.executor()
+        current = executor.current
+        queued = len(executor.pending())
+        text = f"Job: {current.name}" if current else "Job: Idle"
+        if queued:
+            text += f", {queued} queued"
+        if job.state in (job_executor.FAILED, job_executor.CANCELLED):
+            text += f"\n{job.name} {job.state}"
+        self.job_label.setText(text)
+
     def switch_page(self, index):
-        self.pages.setCurrentIndex(index)
+        self.pages.setCurrentWidget(self.page(index))
 
 
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    app.setWindowIcon(QIcon("images/tower_of_ordeals.png"))
+def create_app(argv) -> QApplication:
+    app = QApplication(argv)
+    app.setWindowIcon(icon_cache.icon("images/tower_of_ordeals.png"))
     app.setStyleSheet(get_stylesheet("Classic Dark"))
     app.setFont(QFont("Roboto", 10))
+    return app
+
+
+if __name__ == "__main__":
+    app = create_app(sys.argv)
     window = MainWindow()
     window.show()
     sys.exit(app.exec())
@@ -1,20 +1,25 @@
-import pyautogui
 import re
-import config
-import time
-from mytypes import Position
-from bot_controller import Bot
+from contextlib import nullcontext
+from dataclasses import dataclass
+from functools import partial
+from mytypes import Grid, Position
+from bot_controller import Bot, log_window_enumerations
+from craft_session import CraftSession, resolve_session
+from held_currency import HeldCurrency
+from input_actions import apply_currency_actions
+from item_parser import parse_item
+from mod_matcher import ModMatcher
 from loguru import logger
+import config
+import session_log
 import sys
 
 
 def process_item(item_info: str) -> tuple[list[str], list[str]]:
-    info = item_info.split("--------")
-    if not info or len(info) < 3:
+    item = parse_item(item_info)
+    if not item:
         return tuple()
-    mods = [mod for mod in info[-3].strip().split("\n") if not mod.startswith("(")]
-    implicits = info[1].strip().split("\n")
-    return mods, implicits
+    return item.explicit_lines(), item.properties
 
 
 CONST_IMPLICITS = (
@@ -27,13 +32,19 @@ CONST_IMPLICITS = (
 )
 
 
+MATCHED = "matched"
+EMPTY = "empty"  # Nothing to copy in the cell
+NO_MODS = "no mods"  # Not a map with mods to roll
+STOPPED = "stopped"
+
+IMPLICITS_RGX = re.compile(rf"({'|'.join(CONST_IMPLICITS)}): \+(\d+)%")
+
+
 def filter_implicits(item_implicits: list[str], expected_implicits: dict) -> bool:
     matched = {}
-    for implicit in CONST_IMPLICITS:
-        for mod in item_implicits:
-            r = re.search(rf"{implicit}: \+(\d+)%", mod)
-            if r:
-                matched[implicit] = int(r.group(1))
+    for mod in item_implicits:
+        if r := IMPLICITS_RGX.search(mod):
+            matched[r.group(1)] = int(r.group(2))
     return all(
         matched.get(_type, 0) >= value
         for _type, value in expected_implicits.items()
@@ -41,40 +52,204 @@ def filter_implicits(item_implicits: list[str], expected_implicits: dict) -> boo
     )
 
 
-def filter_mods_by_regex(regex_count: int, mods: list[str], regexes: list[str]) -> bool:
-    matched = 0
-    for modtext in mods:
-        for regex in regexes:
-            if re.search(regex, modtext):
-                matched += 1
-    return matched == regex_count
+def filter_mods_by_regex(
+    regex_count: int, mods: list[str], matcher: ModMatcher
+) -> bool:
+    return matcher.count(mods, limit=regex_count) == regex_count
 
 
-def craft_map(regexes: list[str], regex_count: int, expected_implicits: dict) -> None:
-    method_pos: Position | None = config.get_value_as_position("currency", "chaos")
-    map_pos: Position = Bot.get_global("map-item")
-    if not method_pos or not map_pos:
-        logger.info("Method pos or Map pos not set")
-        return
+def roll_map(
+    map_pos: Position,
+    regex_count: int,
+    expected_implicits: dict,
+    matcher: ModMatcher,
+    apply_chaos,
+    item_info: str | None = None,
+    attempt_callback=None,
+    job_log: session_log.JobLog | None = None,
+) -> tuple[str, int, str]:
+    """
+    Chaos the map at map_pos until the regexes and implicit thresholds match.
+    Returns the outcome (MATCHED, EMPTY, NO_MODS or STOPPED), the number of
+    chaos orbs used and the last item text read. Every map read is recorded
+    in job_log.
+    """
+    if item_info is None:
+        item_info = Bot.get_item_info(map_pos)
+    attempts = 0
     while not Bot.get_killswitch_state():
-        item_info: str = Bot.get_item_info(map_pos)
         processed = process_item(item_info)
         if not processed:
+            if not item_info and not attempts:
+                return EMPTY, attempts, item_info
+            item_info = Bot.get_item_info(map_pos)
             continue
         mods: list[str] = processed[0]
         implicits: list[str] = processed[1]
         if not mods:
-            logger.info("Could not find processed mods")
-            return
-        if filter_mods_by_regex(regex_count, mods, regexes) and filter_implicits(
+            outcome = NO_MODS
+        elif filter_mods_by_regex(regex_count, mods, matcher) and filter_implicits(
             implicits, expected_implicits
         ):
-            logger.info("Regexes matched")
-            return
-        pyautogui.moveTo(method_pos.x, method_pos.y)
-        pyautogui.rightClick()
-        pyautogui.moveTo(map_pos.x, map_pos.y)
-        pyautogui.leftClick()
+            outcome = MATCHED
+        else:
+            outcome = session_log.MISS
+        if job_log:
+            job_log.record(item_info, mods, outcome, "chaos" if attempts else None)
+        if outcome != session_log.MISS:
+            return outcome, attempts, item_info
+        apply_chaos()
+        attempts += 1
+        if attempt_callback:
+            attempt_callback()
+        item_info = Bot.wait_for_item_change(map_pos, item_info, "chaos")
+    return STOPPED, attempts, item_info
+
+
+@log_window_enumerations
+def craft_map(
+    regexes: list[str],
+    regex_count: int,
+    expected_implicits: dict,
+    session: CraftSession | None = None,
+    hold_currency: bool = False,
+    success_callback=None,
+    attempt_callback=None,
+) -> str | None:
+    """
+    Chaos the map until the regexes and implicit thresholds match. With
+    hold_currency the chaos orb is picked up once and applied with shift held.
+    success_callback is called with the item text of the finished map and
+    attempt_callback after every chaos orb. Returns the outcome of roll_map,
+    or None if the calibration is missing.
+    """
+    session = session or resolve_session(["chaos"], global_keys=["map-item"])
+    if not session:
+        return None
+    method_pos: Position = session["chaos"]
+    map_pos: Position = session["map-item"]
+    matcher = ModMatcher(regexes)
+    held = HeldCurrency(session.positions, map_pos) if hold_currency else None
+    if held:
+        apply_chaos = partial(held.apply, "chaos")
+    else:
+        apply_chaos = partial(Bot.run, apply_currency_actions(method_pos, map_pos))
+    with held or nullcontext():
+        outcome, _, item_info = roll_map(
+            map_pos,
+            regex_count,
+            expected_implicits,
+            matcher,
+            apply_chaos,
+            attempt_callback=attempt_callback,
+            job_log=session_log.job("map"),
+        )
+    if outcome == MATCHED:
+        logger.info("Regexes matched")
+        if success_callback:
+            success_callback(item_info)
+    elif outcome == NO_MODS:
+        logger.info("Could not find processed mods")
+    elif outcome == EMPTY:
+        logger.info("No item found at the map position")
+    return outcome
+
+
+@dataclass(slots=True)
+class GridStats:
+    cells: int = 0
+    empty: int = 0
+    qualified: int = 0  # Already matched before any chaos orb
+    crafted: int = 0
+    failed: int = 0  # Not a map, or no mods to roll
+    attempts: int = 0
+    elapsed: float = 0.0
+    stopped: bool = False
+
+    @property
+    def maps_per_hour(self) -> float:
+        return self.crafted / self.elapsed * 3600 if self.elapsed else 0.0
+
+
+@log_window_enumerations
+def craft_map_grid(
+    regexes: list[str],
+    regex_count: int,
+    expected_implicits: dict,
+    grid: Grid | None = None,
+    session: CraftSession | None = None,
+    hold_currency: bool = False,
+    success_callback=None,
+    attempt_callback=None,
+) -> GridStats | None:
+    """
+    Roll every map in the calibrated grid (config "map"/"grid"), skipping
+    empty cells and maps that already match. success_callback is called with
+    the item text of every map crafted to match, attempt_callback after every
+    chaos orb.
+    """
+    grid = grid or config.get_value_as_grid("map", "grid")
+    if not grid:
+        logger.error("Map grid not calibrated")
+        return None
+    session = session or resolve_session(["chaos"])
+    if not session:
+        return None
+    method_pos: Position = session["chaos"]
+    matcher = ModMatcher(regexes)
+    # No default item: every application names its cell.
+    held = HeldCurrency(session.positions) if hold_currency else None
+    stats = GridStats()
+    job_log = session_log.job("map grid")
+    backend = Bot.backend()
+    started = backend.now()
+    with held or nullcontext():
+        # Starting next to the currency keeps consecutive maps neighbours and
+        # the first trips from the chaos stack short.
+        for row, col in grid.serpentine(method_pos):
+            cell = grid.cell(row, col)
+            if Bot.get_killswitch_state():
+                stats.stopped = True
+                break
+            stats.cells += 1
+            # A single copy without retries tells an empty cell apart.
+            item_info = Bot.get_item_info(cell, single=True)
+            if held:
+                apply_chaos = partial(held.apply, "chaos", cell)
+            else:
+                apply_chaos = partial(Bot.run, apply_currency_actions(method_pos, cell))
+            outcome, attempts, item_info = roll_map(
+                cell,
+                regex_count,
+                expected_implicits,
+                matcher,
+                apply_chaos,
+                item_info,
+                attempt_callback,
+                job_log,
+            )
+            stats.attempts += attempts
+            if outcome == EMPTY:
+                stats.empty += 1
+            elif outcome == MATCHED and not attempts:
+                stats.qualified += 1
+            elif outcome == MATCHED:
+                stats.crafted += 1
+                if success_callback:
+                    success_callback(item_info)
+            elif outcome == STOPPED:
+                stats.stopped = True
+                break
+            else:
+                stats.failed += 1
+    stats.elapsed = backend.now() - started
+    logger.info(
+        f"Map grid {'stopped' if stats.stopped else 'done'}: {stats.crafted} "
+        f"crafted, {stats.qualified} already matching, {stats.empty} empty, "
+        f"{stats.failed} failed out of {stats.cells} cells; {stats.attempts} "
+        f"chaos in {stats.elapsed:.1f}s, {stats.maps_per_hour:.0f} maps/hour"
+    )
+    return stats
 
 
 logger.add(
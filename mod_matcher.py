@@ -0,0 +1,90 @@
+import re
+from typing import Iterable
+
+# Patterns that cannot share one compiled expression with others: numbered or
+# named backreferences and named groups depend on their own group numbering.
+_STANDALONE_RGX = re.compile(r"\\[1-9]|\(\?P[<=]")
+
+
+class ModMatcher:
+    """
+    Matches a list of regexes against item mod lines.
+
+    All regexes are combined into a single alternation, so a line that matches
+    none of them is rejected by one `search` call. Only lines that hit the
+    alternation are checked against each precompiled regex to find out which
+    targets matched. Build it once per craft session.
+    """
+
+    def __init__(self, regexes: Iterable[str], flags: int = 0, lowercase: bool = False):
+        self.regexes: list[str] = list(regexes)
+        self.lowercase = lowercase
+        default_flags = re.compile("", flags).flags
+        parts = []
+        self._compiled: list[tuple[int, re.Pattern]] = []
+        self._standalone: list[tuple[int, re.Pattern]] = []
+        for i, regex in enumerate(self.regexes):
+            compiled = re.compile(regex, flags)
+            if compiled.flags != default_flags or _STANDALONE_RGX.search(regex):
+                self._standalone.append((i, compiled))
+            else:
+                self._compiled.append((i, compiled))
+                # Non-capturing groups keep sre's literal prefix optimisations,
+                # which capturing groups in an alternation disable.
+                parts.append(f"(?:{regex})")
+        self._combined = re.compile("|".join(parts), flags) if parts else None
+
+    def __len__(self) -> int:
+        return len(self.regexes)
+
+    def line_targets(self, line: str) -> list[int]:
+        """
+        Indexes of the regexes that match the given mod line.
+        """
+        if self.lowercase:
+            line = line.lower()
+        targets = []
+        if self._combined and self._combined.search(line):
+            targets = [i for i, compiled in self._compiled if compiled.search(line)]
+        for i, compiled in self._standalone:
+            if compiled.search(line):
+                targets.append(i)
+        return targets
+
+    def count(self, lines: Iterable[str], limit: int | None = None) -> int:
+        """
+        Number of (line, regex) matches. Stops scanning once the count exceeds
+        `limit`, since callers comparing against it already know the outcome.
+        """
+        matched = 0
+        for line in lines:
+            matched += len(self.line_targets(line))
+            if limit is not None and matched > limit:
+                break
+        return matched
+
+    def matched_targets(self, lines: Iterable[str]) -> set[int]:
+        """
+        Indexes of the regexes matching at least one line. Stops scanning once
+        every regex has matched.
+        """
+        matched: set[int] = set()
+        total = len(self.regexes)
+        for line in lines:
+            matched.update(self.line_targets(line))
+            if len(matched) == total:
+                break
+        return matched
+
+    def matches_any(self, lines: Iterable[str]) -> bool:
+        for line in lines:
+            if self.lowercase:
+                line = line.lower()
+            if self._combined and self._combined.search(line):
+                return True
+            if any(compiled.search(line) for _, compiled in self._standalone):
+                return True
+        return False
+
+    def matches_all(self, lines: Iterable[str]) -> bool:
+        return len(self.matched_targets(lines)) == len(self.regexes)
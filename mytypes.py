@@ -1,12 +1,68 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Position:
     x: int
     y: int
 
 
+@dataclass(frozen=True, slots=True)
+class Grid:
+    first: Position  # Centre of one corner cell
+    last: Position  # Centre of the opposite corner cell
+    rows: int
+    cols: int
+
+    def cell(self, row: int, col: int) -> Position:
+        dx = (self.last.x - self.first.x) / (self.cols - 1) if self.cols > 1 else 0
+        dy = (self.last.y - self.first.y) / (self.rows - 1) if self.rows > 1 else 0
+        return Position(round(self.first.x + col * dx), round(self.first.y + row * dy))
+
+    def locate(self, pos: Position) -> tuple[int, int] | None:
+        """
+        (row, col) of the cell containing pos, or None if it is outside.
+        """
+        dx = (self.last.x - self.first.x) / (self.cols - 1) if self.cols > 1 else 0
+        dy = (self.last.y - self.first.y) / (self.rows - 1) if self.rows > 1 else 0
+        col = round((pos.x - self.first.x) / dx) if dx else 0
+        row = round((pos.y - self.first.y) / dy) if dy else 0
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return None
+        center = self.cell(row, col)
+        if (
+            abs(center.x - pos.x) > abs(dx) / 2 + 1
+            or abs(center.y - pos.y) > abs(dy) / 2 + 1
+        ):
+            return None
+        return row, col
+
+    def serpentine(self, start: Position) -> list[tuple[int, int]]:
+        """
+        (row, col) of every cell in serpentine order, beginning at the corner
+        closest to `start`, so consecutive cells are always neighbours.
+        """
+        rows = range(self.rows)
+        cols = range(self.cols)
+        corners = [(r, c) for r in (0, self.rows - 1) for c in (0, self.cols - 1)]
+
+        def distance(cell: tuple[int, int]) -> int:
+            pos = self.cell(*cell)
+            return (pos.x - start.x) ** 2 + (pos.y - start.y) ** 2
+
+        first_row, first_col = min(corners, key=distance)
+        if first_row:
+            rows = reversed(rows)
+        if first_col:
+            cols = reversed(cols)
+        cols = list(cols)
+        order = []
+        for i, row in enumerate(rows):
+            for col in cols if i % 2 == 0 else reversed(cols):
+                order.append((row, col))
+        return order
+
+
 @dataclass
 class Cluster:
     ilvl: int
@@ -14,3 +70,29 @@ class Cluster:
     jewel_type: str
     jewel_base: str
     mods: list[str]
+
+
+@dataclass(slots=True)
+class ItemMod:
+    header: str  # Advanced copy header, e.g. '{ Prefix Modifier "Savage" (Tier: 1) }'
+    kind: str  # "prefix", "suffix", "implicit", "master crafted prefix", ...
+    name: str  # Affix name from the header, empty for unnamed mods
+    tier: int  # Tier (or crafting rank) from the header, -1 if absent
+    lines: list[str]  # Mod text lines, reminder text excluded
+
+
+@dataclass(slots=True)
+class ParsedItem:
+    item_class: str = ""
+    rarity: str = ""
+    name: str = ""
+    base: str = ""
+    ilvl: int = -1
+    properties: list[str] = field(default_factory=list)
+    implicits: list[ItemMod] = field(default_factory=list)
+    enchants: list[str] = field(default_factory=list)
+    explicits: list[ItemMod] = field(default_factory=list)
+    corrupted: bool = False
+
+    def explicit_lines(self) -> list[str]:
+        return [line for mod in self.explicits for line in mod.lines]
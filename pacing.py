@@ -0,0 +1,95 @@
+from collections import Counter
+from typing import Callable, TypeVar
+from bot_backend import BotBackend
+from loguru import logger
+
+T = TypeVar("T")
+
+
+class AdaptivePacer:
+    """
+    Waits for the game instead of sleeping a fixed time. wait_until() polls a
+    check with exponential backoff until it returns something other than None,
+    and keeps a rolling latency estimate per action (like TCP's RTT estimate)
+    so the first poll of the next wait lands just before the expected answer.
+    """
+
+    ALPHA = 0.125  # Weight of a new sample in the latency estimate
+    BETA = 0.25  # Weight of a new sample in the deviation estimate
+    LEAD = 0.8  # Fraction of the estimate slept before the first poll
+    MIN_POLL = 0.005
+    MAX_POLL = 0.05
+    MIN_TIMEOUT = 0.25
+    MAX_TIMEOUT = 1.5
+
+    def __init__(self):
+        self.estimates: dict[str, float] = {}
+        self.deviations: dict[str, float] = {}
+        self.timeouts: Counter = Counter()
+
+    def timeout(self, action: str) -> float:
+        if action not in self.estimates:
+            return self.MAX_TIMEOUT
+        timeout = self.estimates[action] + 4 * self.deviations[action]
+        return min(max(timeout, self.MIN_TIMEOUT), self.MAX_TIMEOUT)
+
+    def record(self, action: str, elapsed: float) -> None:
+        if action not in self.estimates:
+            self.estimates[action] = elapsed
+            self.deviations[action] = elapsed / 2
+            return
+        estimate = self.estimates[action]
+        self.deviations[action] += self.BETA * (
+            abs(elapsed - estimate) - self.deviations[action]
+        )
+        self.estimates[action] = estimate + self.ALPHA * (elapsed - estimate)
+
+    def wait_until(
+        self, backend: BotBackend, action: str, check: Callable[[], T | None]
+    ) -> T | None:
+        """
+        Returns the first non-None result of check(), or None if the action
+        timed out or the backend was stopped. Timeouts are not fed into the
+        estimate.
+        """
+        start = backend.now()
+        if estimate := self.estimates.get(action):
+            backend.sleep(estimate * self.LEAD)
+        delay = self.MIN_POLL
+        timeout = self.timeout(action)
+        while not backend.stopped():
+            # Measure up to the start of the successful check: its own cost
+            # is not game latency, and counting it would let the lead sleep
+            # inflate the estimate on every wait.
+            checked = backend.now() - start
+            result = check()
+            elapsed = backend.now() - start
+            if result is not None:
+                self.record(action, checked)
+                return result
+            if elapsed >= timeout:
+                self.timeouts[action] += 1
+                logger.debug(f"No response to {action} after {elapsed:.3f}s")
+                return None
+            backend.sleep(delay)
+            delay = min(delay * 2, self.MAX_POLL)
+        return None
+
+
+class FixedPacer:
+    """
+    The old behaviour: sleep a fixed delay per action, then check once.
+    """
+
+    def __init__(self, default: float = 0.1, delays: dict[str, float] | None = None):
+        self.default = default
+        self.delays = delays or {}
+
+    def wait_until(
+        self, backend: BotBackend, action: str, check: Callable[[], T | None]
+    ) -> T | None:
+        if delay := self.delays.get(action, self.default):
+            backend.sleep(delay)
+        if backend.stopped():
+            return None
+        return check()
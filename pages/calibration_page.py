@@ -8,11 +8,13 @@ from PySide6.QtWidgets import (
     QLabel,
 )
 from PySide6.QtCore import Qt, QSize
-from PySide6.QtGui import QPixmap, QFont
+from PySide6.QtGui import QFont
 import os, threading
-import calibration_module
 import config
+import progress
 from theme import ShadowHeaderLabel, get_section_style, get_calibration_style
+from . import icon_cache
+from .progress_sampler import ProgressSampler
 
 
 class CalibrationPage(QWidget):
@@ -22,6 +24,10 @@ class CalibrationPage(QWidget):
         self.currency_buttons = {}
         self.currency_labels = {}
         self.init_ui()
+        self.load_positions()
+        self.progress = progress.channel("calibration")
+        self.sampler = ProgressSampler(self.progress, self)
+        self.sampler.event.connect(self.handleProgressEvent)
 
     def init_ui(self):
         main_layout = QVBoxLayout()
@@ -68,13 +74,8 @@ class CalibrationPage(QWidget):
             container_layout.addSpacing(2)
             img_path = os.path.join("images", img_file)
             img_label = QLabel()
-            if os.path.exists(img_path):
-                pixmap = QPixmap(img_path).scaled(
-                    39,
-                    39,
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation,
-                )
+            pixmap = icon_cache.pixmap(img_path, 39)
+            if not pixmap.isNull():
                 img_label.setPixmap(pixmap)
                 img_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
             else:
@@ -95,9 +96,7 @@ class CalibrationPage(QWidget):
             container.setStyleSheet(get_section_style("Classic Dark"))
             self.containers.append(container)
             grid_layout.addWidget(container, row, col)
-            btn.clicked.connect(
-                lambda checked, cur=key, lbl=status: self.calibrate_currency(cur, lbl)
-            )
+            btn.clicked.connect(lambda checked, cur=key: self.calibrate_currency(cur))
             self.currency_buttons[key] = btn
             self.currency_labels[key] = status
 
@@ -105,16 +104,31 @@ class CalibrationPage(QWidget):
         main_layout.addStretch()
         self.setLayout(main_layout)
 
-    def calibrate_currency(self, currency, label_widget):
+    def load_positions(self):
+        for key, label in self.currency_labels.items():
+            pos = config.get_value("currency", key)
+            if pos:
+                label.setText(f"({pos['x']}, {pos['y']})")
+
+    def calibrate_currency(self, currency):
+        channel = self.progress
+
         def task():
+            # The bot stack loads on the first calibration, not at startup.
+            import calibration_module
+
             pos = calibration_module.calibrate(currency)
             if pos:
-                status = f"({pos['x']}, {pos['y']})"
                 config.set_value(pos, "currency", currency)
-                label_widget.setText(status)
+                channel.post("currency", (currency, pos))
 
         threading.Thread(target=task, daemon=True).start()
 
+    def handleProgressEvent(self, kind: str, payload):
+        if kind == "currency":
+            currency, pos = payload
+            self.currency_labels[currency].setText(f"({pos['x']}, {pos['y']})")
+
     def update_theme(self, new_theme):
         # Here you can update the style; for now, we simply set a default.
 
@@ -5,31 +5,28 @@ from PySide6.QtWidgets import (
     QLabel,
     QListWidget,
     QListWidgetItem,
-    QGridLayout,
     QLineEdit,
     QPushButton,
 )
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
-import threading
-import cluster_module
+import job_executor
+import progress
 
-from .crafted_jewel_widget import CraftedJewelWidget
+from .history_model import HistoryView, cluster_entry
+from .progress_sampler import ProgressSampler
 from mytypes import Cluster
 from theme import ShadowHeaderLabel
 
 
 class ClustersPage(QWidget):
-    clusterCrafted = Signal(Cluster)
-
     def __init__(self):
         super().__init__()
-        self.cluster_attempts = 0
-        self.successful_crafts = 0
-        self.crafted_jewels = []
-        self.max_columns = 6
         self.init_ui()
-        self.clusterCrafted.connect(self.handleCraftedCluster)
+        self.progress = progress.channel("cluster")
+        self.sampler = ProgressSampler(self.progress, self)
+        self.sampler.updated.connect(self.handleProgress)
+        self.sampler.event.connect(self.handleProgressEvent)
 
     def init_ui(self):
         layout = QVBoxLayout()
@@ -64,17 +61,14 @@ class ClustersPage(QWidget):
         layout.addWidget(self.attempts_label)
         layout.addWidget(self.success_label)
 
-        # Crafted Jewels grid section.
+        # Crafted Jewels history section.
         crafted_section_label = ShadowHeaderLabel("Crafted Jewels")
         crafted_section_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         crafted_section_label.setFont(QFont("Arial", 16))
         layout.addWidget(crafted_section_label)
-        self.crafted_grid = QGridLayout()
-        self.crafted_container = QWidget()
-        self.crafted_container.setLayout(self.crafted_grid)
-        layout.addWidget(self.crafted_container)
+        self.history = HistoryView()
+        layout.addWidget(self.history)
 
-        layout.addStretch()
         self.setLayout(layout)
 
     def add_cluster_regex(self):
@@ -88,48 +82,38 @@ class ClustersPage(QWidget):
         for item in self.regex_list.selectedItems():
             self.regex_list.takeItem(self.regex_list.row(item))
 
-    def addCraftedJewel(self, cluster: Cluster):
-        widget = CraftedJewelWidget(cluster)
-        self.crafted_jewels.append(widget)
-        max_jewels = 30
-        if len(self.crafted_jewels) > max_jewels:
-            oldest = self.crafted_jewels.pop(0)
-            oldest.setParent(None)
-        self.updateCraftedGrid()
-
-    def updateCraftedGrid(self):
-        while self.crafted_grid.count():
-            child = self.crafted_grid.takeAt(0)
-            if child.widget():
-                child.widget().setParent(None)
-        for index, widget in enumerate(self.crafted_jewels):
-            row = index // self.max_columns
-            col = index % self.max_columns
-            self.crafted_grid.addWidget(widget, row, col)
-
-    def handleCraftedCluster(self, cluster: Cluster):
-        self.successful_crafts += 1
-        self.success_label.setText(f"Successful Crafts: {self.successful_crafts}")
-        self.addCraftedJewel(cluster)
+    def handleProgress(self, counters: dict):
+        self.attempts_label.setText(f"Craft Attempts: {counters.get('attempts', 0)}")
+        self.success_label.setText(f"Successful Crafts: {counters.get('crafted', 0)}")
+
+    def handleProgressEvent(self, kind: str, payload):
+        if kind == "crafted":
+            self.history.add(cluster_entry(payload))
 
     def craft_cluster(self):
         regexes = [
             self.regex_list.item(i).text() for i in range(self.regex_list.count())
         ]
 
+        import cluster_module, craft_worker
+
+        channel = self.progress
+
+        # Called on the job thread: only publish, the sampler updates labels.
         def attempt_callback():
-            self.cluster_attempts += 1
-            self.attempts_label.setText(f"Craft Attempts: {self.cluster_attempts}")
+            channel.add("attempts")
 
         def success_callback(cluster: Cluster):
-            self.clusterCrafted.emit(cluster)
-
-        threading.Thread(
-            target=lambda: cluster_module.craft_cluster(
-                regexes, attempt_callback, success_callback
-            ),
-            daemon=True,
-        ).start()
+            channel.add("crafted")
+            channel.post("crafted", cluster)
+
+        job_executor.submit(
+            "Craft Cluster",
+            craft_worker.dispatch(cluster_module.craft_cluster),
+            regexes,
+            attempt_callback=attempt_callback,
+            success_callback=success_callback,
+        )
 
     def update_theme(self, new_theme):
         # Update the style of the section container (or any other elements)
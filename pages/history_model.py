@@ -0,0 +1,174 @@
+from dataclasses import dataclass
+from html import escape
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QLineEdit,
+    QListView,
+    QStyledItemDelegate,
+    QStyle,
+)
+from PySide6.QtCore import (
+    Qt,
+    QAbstractListModel,
+    QModelIndex,
+    QSize,
+    QSortFilterProxyModel,
+)
+from item_parser import parse_item
+from mytypes import Cluster
+from . import icon_cache
+
+ICON_SIZE = 39
+SearchRole = Qt.ItemDataRole.UserRole + 1
+ImageRole = Qt.ItemDataRole.UserRole + 2
+
+
+@dataclass(frozen=True, slots=True)
+class HistoryEntry:
+    title: str
+    image: str  # Path of the icon
+    tooltip: str  # Rich text
+    search: str  # Lowercase text the search box matches against
+
+
+def cluster_entry(cluster: Cluster) -> HistoryEntry:
+    tooltip = (
+        "<b>Item Info:</b><br>"
+        f"Item Level: {cluster.ilvl}<br>"
+        f"Passives: {cluster.passives}<br>"
+        f"Jewel Type: {cluster.jewel_type}<br><br>"
+        "<b>Mods:</b><br>" + "<br>".join(escape(mod) for mod in cluster.mods)
+    )
+    search = "\n".join([cluster.jewel_type, cluster.jewel_base, *cluster.mods])
+    return HistoryEntry(
+        cluster.jewel_type,
+        f"images/{cluster.jewel_type.lower().replace(' ', '_')}.png",
+        tooltip,
+        search.lower(),
+    )
+
+
+def item_entry(item_info: str, image: str) -> HistoryEntry | None:
+    """
+    Entry for a crafted item from its advanced copy text.
+    """
+    item = parse_item(item_info)
+    if item is None:
+        return None
+    lines = [line for mod in item.implicits for line in mod.lines]
+    lines += item.explicit_lines()
+    title = item.name or item.base
+    base = f"{escape(item.base)}<br>" if item.base != title else ""
+    tooltip = (
+        f"<b>{escape(title)}</b><br>{base}"
+        f"Item Level: {item.ilvl}<br><br>"
+        + "<br>".join(escape(line) for line in item.properties + lines)
+    )
+    search = "\n".join([item.name, item.base, *item.properties, *lines])
+    return HistoryEntry(title, image, tooltip, search.lower())
+
+
+class HistoryModel(QAbstractListModel):
+    """
+    Crafted items, oldest first. Appends are a single row insert; past
+    MAX_ENTRIES the oldest are dropped in blocks.
+    """
+
+    MAX_ENTRIES = 10_000
+    DROP = 1_000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.entries: list[HistoryEntry] = []
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.entries)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self.entries[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return entry.title
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return entry.tooltip
+        if role == SearchRole:
+            return entry.search
+        if role == ImageRole:
+            return entry.image
+        return None
+
+    def append(self, entry: HistoryEntry) -> None:
+        if len(self.entries) >= self.MAX_ENTRIES:
+            self.beginRemoveRows(QModelIndex(), 0, self.DROP - 1)
+            del self.entries[: self.DROP]
+            self.endRemoveRows()
+        row = len(self.entries)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.entries.append(entry)
+        self.endInsertRows()
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self.entries.clear()
+        self.endResetModel()
+
+
+class HistoryDelegate(QStyledItemDelegate):
+    """
+    Paints an entry as its icon, or "?" when the image is missing.
+    """
+
+    def paint(self, painter, option, index):
+        if option.state & QStyle.StateFlag.State_MouseOver:
+            painter.fillRect(option.rect, option.palette.highlight())
+        pixmap = icon_cache.pixmap(index.data(ImageRole), ICON_SIZE)
+        if pixmap.isNull():
+            painter.drawText(option.rect, Qt.AlignmentFlag.AlignCenter, "?")
+        else:
+            painter.drawPixmap(option.rect.topLeft(), pixmap)
+
+    def sizeHint(self, option, index) -> QSize:
+        return QSize(ICON_SIZE, ICON_SIZE)
+
+
+class HistoryView(QWidget):
+    """
+    Searchable icon grid over a HistoryModel. Only visible rows are painted,
+    so it stays cheap with thousands of entries.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.model = HistoryModel(self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setFilterRole(SearchRole)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search")
+        self.search_input.textChanged.connect(self.proxy.setFilterFixedString)
+        layout.addWidget(self.search_input)
+
+        self.list_view = QListView()
+        self.list_view.setModel(self.proxy)
+        self.list_view.setItemDelegate(HistoryDelegate(self.list_view))
+        self.list_view.setViewMode(QListView.ViewMode.IconMode)
+        self.list_view.setResizeMode(QListView.ResizeMode.Adjust)
+        self.list_view.setMovement(QListView.Movement.Static)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setSpacing(2)
+        self.list_view.setMouseTracking(True)
+        layout.addWidget(self.list_view)
+        self.setLayout(layout)
+
+    def add(self, entry: HistoryEntry | None) -> None:
+        if entry is not None:
+            self.model.append(entry)
+
+    def __len__(self) -> int:
+        return len(self.model.entries)
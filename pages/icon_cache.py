@@ -0,0 +1,50 @@
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QIcon, QImage, QPixmap
+
+# Decoded images by path, and pixmaps scaled from them by (path, size). Only
+# used from the GUI thread, so no locking.
+_images: dict[str, QImage] = {}
+_pixmaps: dict[tuple[str, int], QPixmap] = {}
+_icons: dict[str, QIcon] = {}
+
+
+def image(path: str) -> QImage:
+    """
+    The decoded image, loaded from disk on first use. Null if it is missing.
+    """
+    if path not in _images:
+        _images[path] = QImage(path)
+    return _images[path]
+
+
+def pixmap(path: str, size: int) -> QPixmap:
+    """
+    The image smooth-scaled to fit size x size, scaled once per size.
+    """
+    key = (path, size)
+    if key not in _pixmaps:
+        source = image(path)
+        if source.isNull():
+            _pixmaps[key] = QPixmap()
+        else:
+            _pixmaps[key] = QPixmap.fromImage(
+                source.scaled(
+                    size,
+                    size,
+                    Qt.AspectRatioMode.KeepAspectRatio,
+                    Qt.TransformationMode.SmoothTransformation,
+                )
+            )
+    return _pixmaps[key]
+
+
+def icon(path: str) -> QIcon:
+    if path not in _icons:
+        _icons[path] = QIcon(QPixmap.fromImage(image(path)))
+    return _icons[path]
+
+
+def clear() -> None:
+    _images.clear()
+    _pixmaps.clear()
+    _icons.clear()
@@ -0,0 +1,197 @@
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QSpinBox,
+    QLabel,
+    QListWidget,
+    QLineEdit,
+    QPushButton,
+    QMessageBox,
+)
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QFont
+import threading
+from dataclasses import asdict
+import config, job_executor, progress
+from mytypes import Grid
+from theme import ShadowHeaderLabel
+from .progress_sampler import ProgressSampler
+
+
+class InventoryPage(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.init_ui()
+        self.progress = progress.channel("inventory")
+        self.sampler = ProgressSampler(self.progress, self)
+        self.sampler.event.connect(self.handleProgressEvent)
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+        header = ShadowHeaderLabel("Inventory")
+        header.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        header.setFont(QFont("Arial", 20))
+        layout.addWidget(header)
+
+        grid = config.get_value_as_grid("inventory", "grid")
+        grid_layout = QHBoxLayout()
+        self.grid_label = QLabel(self.grid_text(grid))
+        grid_layout.addWidget(self.grid_label)
+        self.grid_rows_spin = QSpinBox()
+        self.grid_rows_spin.setPrefix("Rows: ")
+        self.grid_rows_spin.setRange(1, 50)
+        self.grid_rows_spin.setValue(grid.rows if grid else 5)
+        grid_layout.addWidget(self.grid_rows_spin)
+        self.grid_cols_spin = QSpinBox()
+        self.grid_cols_spin.setPrefix("Columns: ")
+        self.grid_cols_spin.setRange(1, 50)
+        self.grid_cols_spin.setValue(grid.cols if grid else 12)
+        grid_layout.addWidget(self.grid_cols_spin)
+        self.calibrate_grid_btn = QPushButton("Calibrate Grid")
+        self.calibrate_grid_btn.setToolTip(
+            "Click the first cell, then the cell in the opposite corner"
+        )
+        self.calibrate_grid_btn.clicked.connect(self.calibrate_grid)
+        grid_layout.addWidget(self.calibrate_grid_btn)
+        layout.addLayout(grid_layout)
+
+        scan_layout = QHBoxLayout()
+        self.scan_btn = QPushButton("Scan")
+        self.scan_btn.setToolTip("Copy only the cells that may have changed")
+        self.scan_btn.clicked.connect(lambda: self.scan(full=False))
+        scan_layout.addWidget(self.scan_btn)
+        self.full_scan_btn = QPushButton("Full Rescan")
+        self.full_scan_btn.setToolTip("Copy every cell, e.g. after moving items")
+        self.full_scan_btn.clicked.connect(lambda: self.scan(full=True))
+        scan_layout.addWidget(self.full_scan_btn)
+        self.scan_label = QLabel("Not Yet Scanned")
+        scan_layout.addWidget(self.scan_label)
+        layout.addLayout(scan_layout)
+
+        query_layout = QHBoxLayout()
+        self.base_input = QLineEdit()
+        self.base_input.setPlaceholderText("Base")
+        query_layout.addWidget(self.base_input)
+        self.ilvl_spin = QSpinBox()
+        self.ilvl_spin.setPrefix("Min ilvl: ")
+        self.ilvl_spin.setMaximum(100)
+        query_layout.addWidget(self.ilvl_spin)
+        self.mod_input = QLineEdit()
+        self.mod_input.setPlaceholderText("Mod Regex")
+        query_layout.addWidget(self.mod_input)
+        self.stat_input = QLineEdit()
+        self.stat_input.setPlaceholderText("Stat, e.g. Item Quantity")
+        query_layout.addWidget(self.stat_input)
+        self.stat_min_spin = QSpinBox()
+        self.stat_min_spin.setPrefix("Min: ")
+        self.stat_min_spin.setRange(-1000, 10000)
+        query_layout.addWidget(self.stat_min_spin)
+        self.query_btn = QPushButton("Search")
+        self.query_btn.clicked.connect(self.run_query)
+        query_layout.addWidget(self.query_btn)
+        layout.addLayout(query_layout)
+
+        self.results_list = QListWidget()
+        layout.addWidget(self.results_list)
+
+        self.setLayout(layout)
+
+    def grid_text(self, grid: Grid | None) -> str:
+        if not grid:
+            return "Grid: Not Yet Calibrated"
+        return (
+            f"Grid: ({grid.first.x}, {grid.first.y}) to "
+            f"({grid.last.x}, {grid.last.y})"
+        )
+
+    def calibrate_grid(self):
+        rows = self.grid_rows_spin.value()
+        cols = self.grid_cols_spin.value()
+        channel = self.progress
+
+        def task():
+            import bot_controller
+
+            first = bot_controller.Bot.wait_for_click()
+            last = first and bot_controller.Bot.wait_for_click()
+            if first and last:
+                grid = Grid(first, last, rows, cols)
+                config.set_value(asdict(grid), "inventory", "grid")
+                channel.post("grid", grid)
+
+        threading.Thread(target=task, daemon=True).start()
+
+    def handleProgressEvent(self, kind: str, payload):
+        if kind == "grid":
+            self.grid_label.setText(self.grid_text(payload))
+        elif kind == "scanned":
+            self.handleScanFinished(payload)
+
+    def scan(self, full: bool):
+        grid = config.get_value_as_grid("inventory", "grid")
+        if not grid:
+            QMessageBox.warning(self, "Error", "Calibrate the inventory grid first")
+            return
+        self.scan_btn.setEnabled(False)
+        self.full_scan_btn.setEnabled(False)
+        self.scan_label.setText("Scanning...")
+
+        channel = self.progress
+
+        def task():
+            import inventory_index
+
+            stats = None
+            try:
+                stats = inventory_index.scan_inventory(grid, full)
+            finally:
+                channel.post("scanned", stats)
+
+        job_executor.submit("Full Rescan" if full else "Scan Inventory", task)
+
+    def handleScanFinished(self, stats):
+        self.scan_btn.setEnabled(True)
+        self.full_scan_btn.setEnabled(True)
+        if stats is None:
+            self.scan_label.setText("Scan Failed")
+            return
+        import inventory_index
+
+        index = inventory_index.current()
+        self.scan_label.setText(
+            f"{len(index) if index else 0} items, {stats.copied} copied, "
+            f"{stats.skipped} skipped in {stats.elapsed:.1f}s"
+        )
+        self.run_query()
+
+    def query(self):
+        from inventory_index import Query
+
+        stat = self.stat_input.text().strip()
+        mod = self.mod_input.text().strip()
+        return Query(
+            base=self.base_input.text().strip(),
+            min_ilvl=self.ilvl_spin.value(),
+            mods=(mod,) if mod else (),
+            values={stat: self.stat_min_spin.value()} if stat else {},
+        )
+
+    def run_query(self):
+        import inventory_index
+
+        self.results_list.clear()
+        index = inventory_index.current()
+        if index is None:
+            return
+        try:
+            results = index.query(self.query())
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"Invalid query: {e}")
+            return
+        for indexed in results:
+            row, col = indexed.cell
+            self.results_list.addItem(
+                f"[{row + 1}, {col + 1}] {indexed.item.name or indexed.item.base} "
+                f"(ilvl {indexed.item.ilvl})"
+            )
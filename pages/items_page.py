@@ -1,5 +1,4 @@
 import json
-import threading
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -16,10 +15,17 @@ from PySide6.QtWidgets import (
     QFrame,
     QFileDialog,
     QGraphicsDropShadowEffect,
+    QMessageBox,
 )
 from PySide6.QtCore import Qt, Signal, Slot
-from PySide6.QtGui import QIcon, QFont
-from item_craft_module import CraftingStep, craft_item_advanced
+from PySide6.QtGui import QFont
+from blueprint_compiler import BlueprintError, compile_blueprint
+import job_executor
+import progress
+from theme import ShadowHeaderLabel
+from . import icon_cache
+from .history_model import HistoryView, item_entry
+from .progress_sampler import ProgressSampler
 
 
 class StepWidget(QWidget):
@@ -65,7 +71,7 @@ class StepWidget(QWidget):
         method_label = QLabel("Choose a method:")
         self.method_combo = QComboBox()
         for key, (display_name, icon_path) in self.currencies.items():
-            self.method_combo.addItem(QIcon(icon_path), display_name, key)
+            self.method_combo.addItem(icon_cache.icon(icon_path), display_name, key)
         method_layout.addWidget(method_label)
         method_layout.addWidget(self.method_combo)
         left_layout.addLayout(method_layout)
@@ -75,13 +81,15 @@ class StepWidget(QWidget):
         cond_layout = QVBoxLayout()
         self.auto_success_cb = QCheckBox("Automatic success")
         cond_layout.addWidget(self.auto_success_cb)
-        self.condition_input = QLineEdit()
-        self.condition_input.setPlaceholderText("Condition or mod regex")
-        cond_layout.addWidget(self.condition_input)
+        self.conditions_layout = QVBoxLayout()
+        self.condition_inputs = []
+        self.condition_input = self.add_condition_input()
+        cond_layout.addLayout(self.conditions_layout)
         self.logic_combo = QComboBox()
         self.logic_combo.addItems(["AND", "OR", "NOT"])
         cond_layout.addWidget(self.logic_combo)
         add_group_btn = QPushButton("Add Condition Group")
+        add_group_btn.clicked.connect(lambda: self.add_condition_input())
         cond_layout.addWidget(add_group_btn)
         cond_group.setLayout(cond_layout)
         left_layout.addWidget(cond_group)
@@ -122,6 +130,14 @@ class StepWidget(QWidget):
         actions_layout.addWidget(self.failure_gostep_cb, 1, 3)
         actions_layout.addWidget(self.failure_step_spin, 1, 4)
 
+        # Attempts per visit of this step
+        max_attempts_label = QLabel("Max attempts:")
+        self.max_attempts_spin = QSpinBox()
+        self.max_attempts_spin.setRange(1, 100000)
+        self.max_attempts_spin.setValue(10)
+        actions_layout.addWidget(max_attempts_label, 2, 0)
+        actions_layout.addWidget(self.max_attempts_spin, 2, 1)
+
         actions_group.setLayout(actions_layout)
         left_layout.addWidget(actions_group)
         main_layout.addLayout(left_layout)
@@ -150,40 +166,22 @@ class StepWidget(QWidget):
         separator.setStyleSheet("background-color: #444444;")
         outer_layout.addWidget(separator)
 
-    def build_crafting_step(self, index_in_sequence, total_steps):
-        if self.success_gostep_cb.isChecked():
-            on_success = self.success_step_spin.value() - 1
-        elif self.success_continue_cb.isChecked():
-            on_success = (
-                index_in_sequence + 1
-                if (index_in_sequence + 1) < total_steps
-                else total_steps
-            )
-        else:
-            on_success = index_in_sequence + 1
-
-        if self.failure_gostep_cb.isChecked():
-            on_failure = self.failure_step_spin.value() - 1
-        elif self.failure_restart_cb.isChecked():
-            on_failure = 0
-        elif self.failure_loop_cb.isChecked():
-            on_failure = index_in_sequence
-        else:
-            on_failure = -1
-
-        return CraftingStep(
-            condition_regex=self.condition_input.text().strip(),
-            currency=self.method_combo.currentData(),
-            on_failure=on_failure,
-            on_success=on_success,
-            auto_success=self.auto_success_cb.isChecked(),
-            max_attempts=10,
-        )
+    def add_condition_input(self, text: str = "") -> QLineEdit:
+        condition_input = QLineEdit(text)
+        condition_input.setPlaceholderText("Condition or mod regex")
+        self.conditions_layout.addWidget(condition_input)
+        self.condition_inputs.append(condition_input)
+        return condition_input
 
     def get_blueprint_config(self):
+        conditions = [
+            condition_input.text()
+            for condition_input in self.condition_inputs
+            if condition_input.text() or condition_input is self.condition_input
+        ]
         return {
             "method": self.method_combo.currentData(),
-            "condition": self.condition_input.text(),
+            "condition": conditions[0] if len(conditions) == 1 else conditions,
             "logic": self.logic_combo.currentText(),
             "auto_success": self.auto_success_cb.isChecked(),
             "success_continue": self.success_continue_cb.isChecked(),
@@ -193,14 +191,19 @@ class StepWidget(QWidget):
             "failure_restart": self.failure_restart_cb.isChecked(),
             "failure_gostep": self.failure_gostep_cb.isChecked(),
             "failure_step": self.failure_step_spin.value(),
-            "max_attempts": 10,
+            "max_attempts": self.max_attempts_spin.value(),
         }
 
     def set_blueprint_config(self, config):
         idx = self.method_combo.findData(config.get("method", ""))
         if idx >= 0:
             self.method_combo.setCurrentIndex(idx)
-        self.condition_input.setText(config.get("condition", ""))
+        conditions = config.get("condition", "")
+        if isinstance(conditions, str):
+            conditions = [conditions]
+        self.condition_input.setText(conditions[0] if conditions else "")
+        for condition in conditions[1:]:
+            self.add_condition_input(condition)
         logic = config.get("logic", "AND")
         idx_logic = self.logic_combo.findText(logic)
         if idx_logic >= 0:
@@ -213,6 +216,7 @@ class StepWidget(QWidget):
         self.failure_restart_cb.setChecked(config.get("failure_restart", False))
         self.failure_gostep_cb.setChecked(config.get("failure_gostep", False))
         self.failure_step_spin.setValue(config.get("failure_step", 1))
+        self.max_attempts_spin.setValue(config.get("max_attempts", 10))
 
 
 class ItemsPage(QWidget):
@@ -233,6 +237,9 @@ class ItemsPage(QWidget):
             "cartographer": ("Cartographer's Chisel", "images/cartographer.png"),
         }
         self.init_ui()
+        self.progress = progress.channel("items")
+        self.sampler = ProgressSampler(self.progress, self)
+        self.sampler.event.connect(self.handleProgressEvent)
 
     def init_ui(self):
         main_layout = QVBoxLayout()
@@ -251,6 +258,13 @@ class ItemsPage(QWidget):
         load_blueprint_btn.clicked.connect(self.load_blueprint)
         top_layout.addWidget(load_blueprint_btn)
 
+        self.hold_currency_check = QCheckBox("Hold Shift")
+        self.hold_currency_check.setToolTip(
+            "Keep currency on the cursor with shift held while a step repeats it "
+            "(experimental: not yet confirmed in game)"
+        )
+        top_layout.addWidget(self.hold_currency_check)
+
         main_layout.addLayout(top_layout)
 
         header = QLabel("Item Crafting")
@@ -273,8 +287,20 @@ class ItemsPage(QWidget):
         add_step_btn.clicked.connect(self.add_step)
         main_layout.addWidget(add_step_btn)
 
+        crafted_label = ShadowHeaderLabel("Crafted Items")
+        crafted_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        crafted_label.setFont(QFont("Arial", 16))
+        main_layout.addWidget(crafted_label)
+        self.history = HistoryView()
+        self.history.setMaximumHeight(160)
+        main_layout.addWidget(self.history)
+
         self.setLayout(main_layout)
 
+    def handleProgressEvent(self, kind, payload):
+        if kind == "crafted":
+            self.history.add(item_entry(payload, "images/crafting_recipe.png"))
+
     @Slot()
     def add_step(self):
         step_widget = StepWidget(self.currencies)
@@ -318,26 +344,43 @@ class ItemsPage(QWidget):
                 return i
         return -1
 
-    def start_crafting(self):
-        steps = []
-        total = self.steps_container.count()
-        for i in range(total):
+    def get_blueprint(self) -> list[dict]:
+        blueprint = []
+        for i in range(self.steps_container.count()):
             widget = self.steps_container.itemAt(i).widget()
             if isinstance(widget, StepWidget):
-                step = widget.build_crafting_step(i, total)
-                steps.append(step)
-        if not steps:
+                blueprint.append(widget.get_blueprint_config())
+        return blueprint
+
+    def compile_blueprint(self, blueprint: list[dict]):
+        try:
+            return compile_blueprint(blueprint, self.currencies)
+        except BlueprintError as e:
+            QMessageBox.warning(self, "Invalid Blueprint", str(e))
+            return None
+
+    def start_crafting(self):
+        from item_craft_module import craft_item_advanced
+        import craft_worker
+
+        blueprint = self.get_blueprint()
+        if not blueprint:
+            return
+        program = self.compile_blueprint(blueprint)
+        if not program:
             return
-        t = threading.Thread(target=lambda: craft_item_advanced(steps), daemon=True)
-        t.start()
+        hold_currency = self.hold_currency_check.isChecked()
+        channel = self.progress
+        job_executor.submit(
+            "Craft Item",
+            craft_worker.dispatch(craft_item_advanced),
+            program,
+            hold_currency=hold_currency,
+            success_callback=lambda item_info: channel.post("crafted", item_info),
+        )
 
     def save_blueprint(self):
-        blueprint = []
-        total = self.steps_container.count()
-        for i in range(total):
-            widget = self.steps_container.itemAt(i).widget()
-            if isinstance(widget, StepWidget):
-                blueprint.append(widget.get_blueprint_config())
+        blueprint = self.get_blueprint()
         filename, _ = QFileDialog.getSaveFileName(
             self, "Save Blueprint", "", "Blueprint Files (*.json)"
         )
@@ -366,6 +409,8 @@ class ItemsPage(QWidget):
                 step_widget.insertBelow.connect(self.insert_step_below)
                 step_widget.removeStep.connect(self.remove_step)
                 self.steps_container.addWidget(step_widget)
+            # Report problems right away; the steps stay loaded for editing.
+            self.compile_blueprint(blueprint)
 
     def update_theme(self, new_theme):
         # Update the style of the section container (or any other elements)
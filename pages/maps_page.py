@@ -10,18 +10,26 @@ from PySide6.QtWidgets import (
     QPushButton,
     QFileDialog,
     QMessageBox,
+    QCheckBox,
 )
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
 import threading, json
-import map_module, bot_controller
+from dataclasses import asdict
+import config, job_executor, progress
+from mytypes import Grid
 from theme import ShadowHeaderLabel
+from .history_model import HistoryView, item_entry
+from .progress_sampler import ProgressSampler
 
 
 class MapsPage(QWidget):
     def __init__(self):
         super().__init__()
         self.init_ui()
+        self.progress = progress.channel("maps")
+        self.sampler = ProgressSampler(self.progress, self)
+        self.sampler.event.connect(self.handleProgressEvent)
 
     def init_ui(self):
         layout = QVBoxLayout()
@@ -85,6 +93,12 @@ class MapsPage(QWidget):
         self.save_map_btn = QPushButton("Save Map Config")
         self.save_map_btn.clicked.connect(self.save_map_config)
         buttons_layout.addWidget(self.save_map_btn)
+        self.hold_currency_check = QCheckBox("Hold Shift")
+        self.hold_currency_check.setToolTip(
+            "Pick the chaos orb up once and apply it with shift held "
+            "(experimental: not yet confirmed in game)"
+        )
+        buttons_layout.addWidget(self.hold_currency_check)
         layout.addLayout(buttons_layout)
 
         self.regex_count_spin = QSpinBox()
@@ -92,7 +106,42 @@ class MapsPage(QWidget):
         self.regex_count_spin.setMaximum(100)
         layout.addWidget(self.regex_count_spin)
 
-        layout.addStretch()
+        grid = config.get_value_as_grid("map", "grid")
+        grid_layout = QHBoxLayout()
+        self.grid_label = QLabel(self.grid_text(grid))
+        grid_layout.addWidget(self.grid_label)
+        self.grid_rows_spin = QSpinBox()
+        self.grid_rows_spin.setPrefix("Rows: ")
+        self.grid_rows_spin.setRange(1, 50)
+        self.grid_rows_spin.setValue(grid.rows if grid else 5)
+        grid_layout.addWidget(self.grid_rows_spin)
+        self.grid_cols_spin = QSpinBox()
+        self.grid_cols_spin.setPrefix("Columns: ")
+        self.grid_cols_spin.setRange(1, 50)
+        self.grid_cols_spin.setValue(grid.cols if grid else 12)
+        grid_layout.addWidget(self.grid_cols_spin)
+        self.calibrate_grid_btn = QPushButton("Calibrate Grid")
+        self.calibrate_grid_btn.setToolTip(
+            "Click the first cell, then the cell in the opposite corner"
+        )
+        self.calibrate_grid_btn.clicked.connect(self.calibrate_grid)
+        grid_layout.addWidget(self.calibrate_grid_btn)
+        self.craft_grid_btn = QPushButton("Craft Grid")
+        self.craft_grid_btn.clicked.connect(self.craft_grid)
+        grid_layout.addWidget(self.craft_grid_btn)
+        layout.addLayout(grid_layout)
+        self.grid_stats_label = QLabel("")
+        self.grid_stats_label.setWordWrap(True)
+        self.grid_stats_label.hide()
+        layout.addWidget(self.grid_stats_label)
+
+        crafted_label = ShadowHeaderLabel("Crafted Maps")
+        crafted_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        crafted_label.setFont(QFont("Arial", 16))
+        layout.addWidget(crafted_label)
+        self.history = HistoryView()
+        layout.addWidget(self.history)
+
         self.setLayout(layout)
 
     def add_map_regex(self):
@@ -101,7 +150,7 @@ class MapsPage(QWidget):
             self.map_regex_list.addItem(text)
             self.map_regex_input.clear()
 
-    def craft_map(self):
+    def map_targets(self) -> tuple[list[str], int, dict]:
         regexes = [
             self.map_regex_list.item(i).text()
             for i in range(self.map_regex_list.count())
@@ -115,18 +164,111 @@ class MapsPage(QWidget):
             "More Scarabs": self.morescarabs_spin.value(),
             "More Currency": self.morecurrency_spin.value(),
         }
-        threading.Thread(
-            target=lambda: map_module.craft_map(
-                regexes, regex_count, expected_implicits
-            ),
-            daemon=True,
-        ).start()
+        return regexes, regex_count, expected_implicits
+
+    def craft_map(self):
+        import map_module, craft_worker
+
+        regexes, regex_count, expected_implicits = self.map_targets()
+        hold_currency = self.hold_currency_check.isChecked()
+        job_executor.submit(
+            "Craft Map",
+            craft_worker.dispatch(map_module.craft_map),
+            regexes,
+            regex_count,
+            expected_implicits,
+            hold_currency=hold_currency,
+            success_callback=self.publish_crafted,
+        )
+
+    def publish_crafted(self, item_info: str):
+        # Called on the job thread.
+        self.progress.post("crafted", item_info)
+
+    def grid_text(self, grid: Grid | None) -> str:
+        if not grid:
+            return "Grid: Not Yet Calibrated"
+        return (
+            f"Grid: ({grid.first.x}, {grid.first.y}) to "
+            f"({grid.last.x}, {grid.last.y})"
+        )
+
+    def calibrate_grid(self):
+        rows = self.grid_rows_spin.value()
+        cols = self.grid_cols_spin.value()
+        channel = self.progress
+
+        def task():
+            import bot_controller
+
+            first = bot_controller.Bot.wait_for_click()
+            last = first and bot_controller.Bot.wait_for_click()
+            if first and last:
+                grid = Grid(first, last, rows, cols)
+                config.set_value(asdict(grid), "map", "grid")
+                channel.post("grid", grid)
+
+        threading.Thread(target=task, daemon=True).start()
+
+    def handleProgressEvent(self, kind: str, payload):
+        if kind == "grid":
+            self.grid_label.setText(self.grid_text(payload))
+        elif kind == "crafted":
+            self.history.add(item_entry(payload, "images/t17_map.png"))
+        elif kind == "map-item":
+            self.map_pos_label.setText(f"Map Position: ({payload.x}, {payload.y})")
+        elif kind == "grid-stats":
+            self.grid_stats_label.setText(
+                f"Last Grid{' (Stopped)' if payload.stopped else ''}: "
+                f"{payload.crafted} crafted, {payload.qualified} already matching, "
+                f"{payload.empty} empty, {payload.failed} failed of {payload.cells} "
+                f"cells; {payload.attempts} chaos in {payload.elapsed:.0f}s, "
+                f"{payload.maps_per_hour:.0f} maps/hour"
+            )
+            self.grid_stats_label.show()
+
+    def craft_grid(self):
+        import map_module, craft_worker
+
+        grid = config.get_value_as_grid("map", "grid")
+        if not grid:
+            QMessageBox.warning(self, "Error", "Calibrate the map grid first")
+            return
+        grid = Grid(
+            grid.first,
+            grid.last,
+            self.grid_rows_spin.value(),
+            self.grid_cols_spin.value(),
+        )
+        regexes, regex_count, expected_implicits = self.map_targets()
+        hold_currency = self.hold_currency_check.isChecked()
+        craft = craft_worker.dispatch(map_module.craft_map_grid)
+        channel = self.progress
+
+        def task():
+            stats = craft(
+                regexes,
+                regex_count,
+                expected_implicits,
+                grid,
+                hold_currency=hold_currency,
+                success_callback=self.publish_crafted,
+            )
+            if stats:
+                channel.post("grid-stats", stats)
+            return stats
+
+        job_executor.submit("Craft Map Grid", task)
 
     def select_map(self):
+        channel = self.progress
+
         def task():
+            import bot_controller
+
             pos = bot_controller.Bot.select_pos("map-item")
             if pos:
-                self.map_pos_label.setText(f"Map Position: ({pos.x}, {pos.y})")
+                channel.post("map-item", pos)
 
         threading.Thread(target=task, daemon=True).start()
 
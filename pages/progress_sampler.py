@@ -0,0 +1,33 @@
+from PySide6.QtCore import QObject, QTimer, Signal
+from progress import ProgressChannel
+
+FRAME_RATE = 15  # GUI progress updates per second
+
+
+class ProgressSampler(QObject):
+    """
+    Polls a ProgressChannel on the GUI thread at FRAME_RATE. Emits updated
+    with the counter snapshot when something changed since the last frame,
+    then one event per queued channel event.
+    """
+
+    updated = Signal(dict)
+    event = Signal(str, object)
+
+    def __init__(self, channel: ProgressChannel, parent: QObject | None = None):
+        super().__init__(parent)
+        self.channel = channel
+        self._version = channel.version
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000 // FRAME_RATE)
+        self.timer.timeout.connect(self.sample)
+        self.timer.start()
+
+    def sample(self):
+        version = self.channel.version
+        if version == self._version:
+            return
+        self._version = version
+        self.updated.emit(self.channel.snapshot())
+        for kind, payload in self.channel.drain():
+            self.event.emit(kind, payload)
@@ -5,13 +5,15 @@ from PySide6.QtWidgets import (
     QComboBox,
     QHBoxLayout,
     QPushButton,
+    QCheckBox,
 )
 from PySide6.QtGui import QFont, Qt
 from PySide6.QtCore import Signal
 import threading
-import calibration_module
 import config
+import progress
 from theme import ShadowHeaderLabel
+from .progress_sampler import ProgressSampler
 
 
 class SettingsPage(QWidget):
@@ -20,6 +22,10 @@ class SettingsPage(QWidget):
     def __init__(self):
         super().__init__()
         self.init_ui()
+        self.load_positions()
+        self.progress = progress.channel("settings")
+        self.sampler = ProgressSampler(self.progress, self)
+        self.sampler.event.connect(self.handleProgressEvent)
 
     def init_ui(self):
         layout = QVBoxLayout()
@@ -37,6 +43,15 @@ class SettingsPage(QWidget):
         self.theme_combo.currentIndexChanged.connect(self.change_theme)
         layout.addWidget(self.theme_combo)
 
+        self.worker_check = QCheckBox("Run crafts in a separate process")
+        self.worker_check.setToolTip(
+            "Keeps the GUI from adding timing jitter to the craft loop; "
+            "takes effect from the next craft"
+        )
+        self.worker_check.setChecked(bool(config.get_value("worker", "process")))
+        self.worker_check.toggled.connect(self.set_worker_process)
+        layout.addWidget(self.worker_check)
+
         cluster_calib_label = QLabel("Cluster Craft Button Calibration:")
         cluster_calib_label.setFont(QFont("Arial", 16))
         layout.addWidget(cluster_calib_label)
@@ -52,21 +67,38 @@ class SettingsPage(QWidget):
         layout.addStretch()
         self.setLayout(layout)
 
+    def load_positions(self):
+        cluster_pos = config.get_value("cluster", "button-location")
+        if cluster_pos:
+            self.cluster_calib_status.setText(
+                f"({cluster_pos['x']}, {cluster_pos['y']})"
+            )
+
     def change_theme(self):
         theme_name = self.theme_combo.currentText()
         # Assuming main.py sets the stylesheet; here we just emit the signal.
         self.theme_changed.emit(theme_name)
 
+    def set_worker_process(self, enabled: bool):
+        config.set_value(enabled, "worker", "process")
+
     def calibrate_cluster_button(self):
+        channel = self.progress
+
         def task():
+            import calibration_module
+
             pos = calibration_module.calibrate_cluster_craft_button()
             if pos:
-                status = f"({pos['x']}, {pos['y']})"
                 config.set_value(pos, "cluster", "button-location")
-                self.cluster_calib_status.setText(status)
+                channel.post("cluster-button", pos)
 
         threading.Thread(target=task, daemon=True).start()
 
+    def handleProgressEvent(self, kind: str, payload):
+        if kind == "cluster-button":
+            self.cluster_calib_status.setText(f"({payload['x']}, {payload['y']})")
+
     def update_theme(self, new_theme):
         # Update the style of the section container (or any other elements)
         from theme import (
@@ -0,0 +1,280 @@
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QListWidget,
+    QLineEdit,
+    QPushButton,
+    QFileDialog,
+    QComboBox,
+    QTabWidget,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+)
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QFont
+import threading, time
+import config, progress
+from theme import ShadowHeaderLabel
+from .progress_sampler import ProgressSampler
+
+JOB_NAMES = ("map", "map grid", "cluster", "item")
+TOP_MODS = 100
+
+
+class NumberItem(QTableWidgetItem):
+    # Sorts by the value in UserRole rather than by the text.
+    def __lt__(self, other):
+        return self.data(Qt.ItemDataRole.UserRole) < other.data(
+            Qt.ItemDataRole.UserRole
+        )
+
+
+class StatsPage(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.paths = [config.get_value("session_log", "path") or "session_log.sqlite3"]
+        self.init_ui()
+        self.progress = progress.channel("stats")
+        self.sampler = ProgressSampler(self.progress, self)
+        self.sampler.updated.connect(self.handleProgress)
+        self.sampler.event.connect(self.handleProgressEvent)
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+        header = ShadowHeaderLabel("Session Stats")
+        header.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        header.setFont(QFont("Arial", 20))
+        layout.addWidget(header)
+
+        logs_layout = QHBoxLayout()
+        self.logs_label = QLabel(self.logs_text())
+        self.logs_label.setWordWrap(True)
+        logs_layout.addWidget(self.logs_label, 1)
+        self.open_logs_btn = QPushButton("Open Logs")
+        self.open_logs_btn.setToolTip("Summarize one or more session logs")
+        self.open_logs_btn.clicked.connect(self.open_logs)
+        logs_layout.addWidget(self.open_logs_btn)
+        self.job_combo = QComboBox()
+        self.job_combo.addItem("All Jobs")
+        self.job_combo.addItems(JOB_NAMES)
+        logs_layout.addWidget(self.job_combo)
+        self.analyze_btn = QPushButton("Analyze")
+        self.analyze_btn.clicked.connect(self.analyze)
+        logs_layout.addWidget(self.analyze_btn)
+        layout.addLayout(logs_layout)
+
+        self.target_list = QListWidget()
+        self.target_list.setMaximumHeight(80)
+        layout.addWidget(self.target_list)
+        target_layout = QHBoxLayout()
+        self.target_input = QLineEdit()
+        self.target_input.setPlaceholderText("Target Mod Regex")
+        target_layout.addWidget(self.target_input)
+        self.add_target_btn = QPushButton("Add")
+        self.add_target_btn.clicked.connect(self.add_target)
+        target_layout.addWidget(self.add_target_btn)
+        self.remove_target_btn = QPushButton("Remove Selected")
+        self.remove_target_btn.clicked.connect(self.remove_target)
+        target_layout.addWidget(self.remove_target_btn)
+        layout.addLayout(target_layout)
+
+        self.summary_label = QLabel("Not Yet Analyzed")
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+        self.tabs = QTabWidget()
+        self.targets_table = self.table(
+            ["Target", "Rolls Hit", "Chance/Roll", "Currency/Hit"]
+        )
+        self.tabs.addTab(self.targets_table, "Targets")
+        self.mods_table = self.table(["Mod", "Rolls", "Chance/Roll"])
+        self.tabs.addTab(self.mods_table, "Mod Frequency")
+        self.runs_table = self.table(["Currency/Success", "Successes", "Cumulative"])
+        self.tabs.addTab(self.runs_table, "Attempts per Success")
+        self.throughput_table = self.table(["Period", "Rolls", "Rolls/Hour"])
+        self.tabs.addTab(self.throughput_table, "Throughput")
+        layout.addWidget(self.tabs, 1)
+
+        self.setLayout(layout)
+
+    def table(self, headers: list[str]) -> QTableWidget:
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.verticalHeader().setVisible(False)
+        # Rows stay in the order filled until a header is clicked.
+        table.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        return table
+
+    def fill(self, table: QTableWidget, rows: list[tuple]) -> None:
+        """
+        Cells are text, or (value, text) for numbers that sort by value.
+        """
+        table.setSortingEnabled(False)
+        table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, cell in enumerate(row):
+                if isinstance(cell, str):
+                    table.setItem(r, c, QTableWidgetItem(cell))
+                    continue
+                value, text = cell
+                item = NumberItem(text)
+                item.setData(Qt.ItemDataRole.UserRole, value)
+                item.setTextAlignment(
+                    Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+                )
+                table.setItem(r, c, item)
+        table.setSortingEnabled(True)
+
+    def logs_text(self) -> str:
+        return f"Logs: {', '.join(self.paths)}"
+
+    def open_logs(self):
+        filenames, _ = QFileDialog.getOpenFileNames(
+            self,
+            "Open Session Logs",
+            "",
+            "Session Logs (*.sqlite3);;All Files (*)",
+        )
+        if filenames:
+            self.paths = filenames
+            self.logs_label.setText(self.logs_text())
+
+    def add_target(self):
+        target = self.target_input.text().strip()
+        if target:
+            self.target_list.addItem(target)
+            self.target_input.clear()
+
+    def remove_target(self):
+        for item in self.target_list.selectedItems():
+            self.target_list.takeItem(self.target_list.row(item))
+
+    def analyze(self):
+        targets = [
+            self.target_list.item(i).text() for i in range(self.target_list.count())
+        ]
+        job = self.job_combo.currentText()
+        jobs = None if job == "All Jobs" else [job]
+        paths = list(self.paths)
+        self.analyze_btn.setEnabled(False)
+        self.summary_label.setText("Reading...")
+        channel = self.progress
+        channel.set("rows", 0)
+        channel.set("logs", 0)
+
+        def task():
+            import session_log, session_stats
+
+            # Attempts still queued in this process belong in the summary.
+            session_log.current().flush(timeout=5)
+            try:
+                channel.post(
+                    "stats",
+                    session_stats.summarize(paths, targets, jobs, channel=channel),
+                )
+            except Exception as e:
+                channel.post("failed", str(e))
+
+        threading.Thread(target=task, daemon=True).start()
+
+    def handleProgress(self, counters: dict):
+        if self.analyze_btn.isEnabled():
+            return
+        if counters.get("logs"):
+            self.summary_label.setText(
+                f"Reading... {counters['logs']}/{len(self.paths)} logs"
+            )
+        elif counters.get("rows"):
+            self.summary_label.setText(f"Reading... {counters['rows']:,} attempts")
+
+    def handleProgressEvent(self, kind: str, payload):
+        if kind == "stats":
+            self.analyze_btn.setEnabled(True)
+            self.show_stats(payload)
+        elif kind == "failed":
+            self.analyze_btn.setEnabled(True)
+            self.summary_label.setText(f"Analysis Failed: {payload}")
+
+    def show_stats(self, stats):
+        lines = [
+            f"{stats.attempts:,} attempts in {stats.jobs} jobs: {stats.rolls:,} "
+            f"rolls, {stats.successes:,} successes ({stats.qualified} already "
+            f"matching), {stats.rolls_per_hour():,.0f} rolls/hour while crafting"
+        ]
+        if stats.attempts_per_success:
+            lines.append(
+                f"Currency per success: mean {stats.mean_attempts_per_success:.1f}, "
+                f"median {stats.percentile(0.5)}, p90 {stats.percentile(0.9)}, "
+                f"p99 {stats.percentile(0.99)}"
+            )
+        spent = stats.currency_per_success()
+        if spent:
+            lines.append(
+                "Spent per success: "
+                + ", ".join(f"{amount:.1f} {c}" for c, amount in spent.items())
+            )
+        self.summary_label.setText("\n".join(lines))
+
+        rolls = stats.rolls or 1
+        self.fill(
+            self.targets_table,
+            [
+                (
+                    target,
+                    (hits, f"{hits:,}"),
+                    (rate, f"{rate:.2%}"),
+                    (
+                        1 / rate if rate else float("inf"),
+                        f"{1 / rate:.1f}" if rate else "-",
+                    ),
+                )
+                for target, hits, rate in stats.target_rates()
+            ],
+        )
+        self.fill(
+            self.mods_table,
+            [
+                (
+                    template,
+                    (count, f"{count:,}"),
+                    (count / rolls, f"{count / rolls:.2%}"),
+                )
+                for template, count in stats.mods.most_common(TOP_MODS)
+            ],
+        )
+        runs = []
+        seen = 0
+        total = stats.attempts_per_success.total() or 1
+        for attempts, count in sorted(stats.attempts_per_success.items()):
+            seen += count
+            runs.append(
+                (
+                    (attempts, str(attempts)),
+                    (count, f"{count:,}"),
+                    (seen / total, f"{seen / total:.1%}"),
+                )
+            )
+        self.fill(self.runs_table, runs)
+        self.fill(
+            self.throughput_table,
+            [
+                (
+                    time.strftime("%Y-%m-%d %H:%M", time.localtime(start)),
+                    (count, f"{count:,}"),
+                    (
+                        count * 3600 / stats.bucket,
+                        f"{count * 3600 / stats.bucket:,.0f}",
+                    ),
+                )
+                for start, count in sorted(stats.throughput.items())
+            ],
+        )
+        if stats.targets:
+            self.tabs.setCurrentWidget(self.targets_table)
+        else:
+            self.tabs.setCurrentWidget(self.mods_table)
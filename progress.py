@@ -0,0 +1,59 @@
+import threading
+from collections import deque
+from typing import Any
+
+
+class ProgressChannel:
+    """
+    Progress of background work for the GUI to sample (see
+    pages/progress_sampler.py), so workers never touch widgets.
+
+    Counters are plain values written by the worker without locking and read
+    as a snapshot; a GUI that samples at a fixed rate only sees the latest
+    values however fast they change. Events (a crafted item, a calibrated
+    position) are queued and each is delivered once.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.version = 0  # Bumped on every change, so idle samples are free
+        self._counters: dict[str, Any] = {}
+        self._events: deque[tuple[str, Any]] = deque()
+
+    def add(self, key: str, amount: int = 1) -> None:
+        self._counters[key] = self._counters.get(key, 0) + amount
+        self.version += 1
+
+    def set(self, key: str, value: Any) -> None:
+        self._counters[key] = value
+        self.version += 1
+
+    def post(self, kind: str, payload: Any = None) -> None:
+        self._events.append((kind, payload))
+        self.version += 1
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._counters.get(key, default)
+
+    def snapshot(self) -> dict[str, Any]:
+        return self._counters.copy()
+
+    def drain(self) -> list[tuple[str, Any]]:
+        events = []
+        while self._events:
+            events.append(self._events.popleft())
+        return events
+
+
+_channels: dict[str, ProgressChannel] = {}
+_channels_lock = threading.Lock()
+
+
+def channel(name: str) -> ProgressChannel:
+    """
+    The shared channel with the given name, e.g. "cluster" or "calibration".
+    """
+    with _channels_lock:
+        if name not in _channels:
+            _channels[name] = ProgressChannel(name)
+        return _channels[name]
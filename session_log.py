@@ -0,0 +1,393 @@
+import atexit
+import hashlib
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Iterator
+from loguru import logger
+import config
+
+DEFAULT_PATH = "session_log.sqlite3"
+BATCH = 1000  # Attempts per transaction at most
+FLUSH_INTERVAL = 1.0  # Seconds the writer waits to fill a batch
+KNOWN_TEXTS = 100_000  # Text hashes -> ids remembered to skip the lookup
+KNOWN_MODS = 100_000  # Mod lines -> ids remembered to skip the lookup
+SCHEMA_VERSION = 2
+
+# Outcomes of a read besides the craft modules' own (map_module.MATCHED, ...)
+HIT = "hit"  # The current step's condition matched
+MISS = "miss"  # Not yet, currency is applied again
+FINISHED = "finished"  # The read that completed the craft
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    started REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS mods (
+    id INTEGER PRIMARY KEY,
+    line TEXT NOT NULL UNIQUE  -- a parsed mod line
+);
+CREATE TABLE IF NOT EXISTS texts (
+    id INTEGER PRIMARY KEY,
+    hash BLOB NOT NULL UNIQUE,  -- text_hash() of the item text
+    mods TEXT NOT NULL,  -- ids of its mod lines, comma separated
+    text BLOB  -- zlib compressed item text, NULL unless texts are kept
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    job INTEGER NOT NULL,
+    time REAL NOT NULL,
+    step INTEGER,  -- blueprint step index, NULL for map and cluster jobs
+    currency TEXT,
+    text INTEGER NOT NULL,
+    outcome TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attempts_job ON attempts (job);
+"""
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+@dataclass(slots=True)
+class Attempt:
+    job: int
+    time: float
+    step: int | None  # Blueprint step index of item crafts
+    currency: str | None  # Currency applied before the item was read
+    outcome: str
+    text: str | None  # None unless the log keeps raw texts
+    mods: list[str]
+
+
+class SessionLog:
+    """
+    Append-only log of every item a craft loop read: when, which job and
+    step, the currency applied before, its parsed mods and what the loop
+    decided.
+
+    record() only puts a tuple on a queue. A writer thread hashes the texts
+    and stores each distinct text once as its hash and the ids of its mod
+    lines, each distinct line stored once; the text itself only with
+    keep_texts (compressed). Attempts are inserted in batches of up to BATCH
+    per transaction, in an SQLite database in WAL mode, so the loop never
+    waits on the disk.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, keep_texts: bool = False):
+        self.path = path
+        self.keep_texts = keep_texts
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._known: dict[bytes, int] = {}
+        self._mod_ids: dict[str, int] = {}
+        self._last_job = 0
+        self._job_lock = threading.Lock()
+        self.written = 0
+        self._thread = threading.Thread(
+            target=self._write_loop, name="session-log", daemon=True
+        )
+        self._thread.start()
+
+    def start_job(self, name: str) -> int:
+        """
+        Register a craft job and return its id for record(). Ids are
+        time-based so processes logging to the same file don't collide.
+        """
+        with self._job_lock:
+            job = max(time.time_ns() // 1000, self._last_job + 1)
+            self._last_job = job
+        self._queue.put(("job", job, name, time.time()))
+        return job
+
+    def record(
+        self,
+        job: int,
+        text: str,
+        mods: list[str],
+        outcome: str,
+        currency: str | None = None,
+        step: int | None = None,
+    ) -> None:
+        self._queue.put(
+            ("attempt", job, time.time(), step, currency, text, mods, outcome)
+        )
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Wait until everything recorded so far is written.
+        """
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        self._queue.put(("close",))
+        self._thread.join(timeout)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=5.0)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # WAL stays consistent with NORMAL; only the last commits can be lost
+        # on power failure.
+        connection.execute("PRAGMA synchronous=NORMAL")
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        existing = connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'attempts'"
+        ).fetchone()
+        if existing and version != SCHEMA_VERSION:
+            # A log in an older layout has to be moved aside or replaced.
+            connection.close()
+            raise sqlite3.DatabaseError(
+                f"schema version {version}, expected {SCHEMA_VERSION}"
+            )
+        connection.executescript(SCHEMA)
+        connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return connection
+
+    def _write_loop(self) -> None:
+        try:
+            connection = self._connect()
+        except sqlite3.Error as e:
+            logger.error(f"Session log disabled, cannot open {self.path}: {e}")
+            # Keep draining so flush() and close() still return.
+            while (message := self._queue.get())[0] != "close":
+                if message[0] == "flush":
+                    message[1].set()
+            return
+        closing = False
+        while not closing:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while len(batch) < BATCH and batch[-1][0] == "attempt":
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._write(connection, batch)
+            except sqlite3.Error as e:
+                logger.error(
+                    f"Session log write failed, {len(batch)} entries lost: {e}"
+                )
+            for message in batch:
+                if message[0] == "flush":
+                    message[1].set()
+                elif message[0] == "close":
+                    closing = True
+        connection.close()
+
+    def _write(self, connection: sqlite3.Connection, batch: list[tuple]) -> None:
+        jobs = [message[1:] for message in batch if message[0] == "job"]
+        attempts = [message[1:] for message in batch if message[0] == "attempt"]
+        if not (jobs or attempts):
+            return
+        rows = []
+        # Ids inserted by this transaction are only known to be valid once it
+        # commits; a rollback would leave them dangling.
+        new_texts: dict[bytes, int] = {}
+        new_mods: dict[str, int] = {}
+        with connection:
+            connection.executemany("INSERT OR IGNORE INTO jobs VALUES (?, ?, ?)", jobs)
+            for job, stamp, step, currency, text, mods, outcome in attempts:
+                digest = text_hash(text)
+                text_id = self._known.get(digest) or new_texts.get(digest)
+                if text_id is None:
+                    mod_ids = ",".join(
+                        str(self._mod_id(connection, line, new_mods)) for line in mods
+                    )
+                    text_id = self._text_id(connection, digest, mod_ids, text)
+                    new_texts[digest] = text_id
+                rows.append((job, stamp, step, currency, text_id, outcome))
+            connection.executemany(
+                "INSERT INTO attempts VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+        for known, new, limit in (
+            (self._known, new_texts, KNOWN_TEXTS),
+            (self._mod_ids, new_mods, KNOWN_MODS),
+        ):
+            if len(known) + len(new) > limit:
+                known.clear()
+            known.update(new)
+        self.written += len(rows)
+
+    def _mod_id(
+        self, connection: sqlite3.Connection, line: str, new_mods: dict[str, int]
+    ) -> int:
+        mod_id = self._mod_ids.get(line) or new_mods.get(line)
+        if mod_id is None:
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO mods (line) VALUES (?)", (line,)
+            )
+            if cursor.rowcount:
+                mod_id = cursor.lastrowid
+            else:
+                mod_id = connection.execute(
+                    "SELECT id FROM mods WHERE line = ?", (line,)
+                ).fetchone()[0]
+            new_mods[line] = mod_id
+        return mod_id
+
+    def _text_id(
+        self, connection: sqlite3.Connection, digest: bytes, mod_ids: str, text: str
+    ) -> int:
+        compressed = None
+        if self.keep_texts:
+            compressed = zlib.compress(text.encode("utf-8"), 9)
+        cursor = connection.execute(
+            "INSERT OR IGNORE INTO texts (hash, mods, text) VALUES (?, ?, ?)",
+            (digest, mod_ids, compressed),
+        )
+        if cursor.rowcount:
+            return cursor.lastrowid
+        # Logged before, by an earlier session or another process.
+        return connection.execute(
+            "SELECT id FROM texts WHERE hash = ?", (digest,)
+        ).fetchone()[0]
+
+
+def read_attempts(
+    path: str = DEFAULT_PATH, job: int | None = None
+) -> Iterator[Attempt]:
+    """
+    Logged attempts in order, optionally of a single job.
+    """
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        # One row per distinct mod line: small next to the attempts.
+        lines = dict(connection.execute("SELECT id, line FROM mods"))
+        query = (
+            "SELECT a.job, a.time, a.step, a.currency, a.outcome, t.text, t.mods "
+            "FROM attempts a JOIN texts t ON t.id = a.text"
+        )
+        params = ()
+        if job is not None:
+            query += " WHERE a.job = ?"
+            params = (job,)
+        for row in connection.execute(query + " ORDER BY a.rowid", params):
+            job_id, stamp, step, currency, outcome, text, mods = row
+            yield Attempt(
+                job_id,
+                stamp,
+                step,
+                currency,
+                outcome,
+                zlib.decompress(text).decode("utf-8") if text is not None else None,
+                [lines[int(mod_id)] for mod_id in mods.split(",")] if mods else [],
+            )
+    finally:
+        connection.close()
+
+
+class JobLog:
+    """
+    record() bound to one job, handed to the craft loops.
+    """
+
+    __slots__ = ("log", "job")
+
+    def __init__(self, log: "SessionLog | _NullLog", name: str):
+        self.log = log
+        self.job = log.start_job(name)
+
+    def record(
+        self,
+        text: str,
+        mods: list[str],
+        outcome: str,
+        currency: str | None = None,
+        step: int | None = None,
+    ) -> None:
+        self.log.record(self.job, text, mods, outcome, currency, step)
+
+
+class _NullLog:
+    """
+    Stand-in when logging is disabled.
+    """
+
+    def start_job(self, name: str) -> int:
+        return 0
+
+    def record(self, *args, **kwargs) -> None:
+        pass
+
+    def flush(self, timeout: float | None = None) -> bool:
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        pass
+
+
+_log: SessionLog | _NullLog | None = None
+_log_lock = threading.Lock()
+
+
+def current() -> SessionLog | _NullLog:
+    """
+    The process-wide session log at config "session_log"/"path" (default
+    session_log.sqlite3), keeping raw item texts if "session_log"/"texts" is
+    true, or a no-op log if "session_log"/"enabled" is false or disable() was
+    called.
+    """
+    global _log
+    with _log_lock:
+        if _log is None:
+            if config.get_value("session_log", "enabled") is False:
+                _log = _NullLog()
+            else:
+                path = config.get_value("session_log", "path") or DEFAULT_PATH
+                keep_texts = bool(config.get_value("session_log", "texts"))
+                _log = SessionLog(path, keep_texts)
+        return _log
+
+
+def job(name: str) -> JobLog:
+    """
+    Start logging a craft job to the current() log.
+    """
+    return JobLog(current(), name)
+
+
+def set_current(log: SessionLog | None) -> None:
+    """
+    Replace the process-wide log, e.g. with one at another path. None goes
+    back to the configured log on the next current().
+    """
+    global _log
+    with _log_lock:
+        if _log is not None and _log is not log:
+            _log.close()
+        _log = log
+
+
+def disable() -> None:
+    """
+    Stop logging in this process, e.g. for benchmarks against the simulator.
+    """
+    global _log
+    with _log_lock:
+        if _log is not None:
+            _log.close()
+        _log = _NullLog()
+
+
+def _close() -> None:
+    with _log_lock:
+        if _log is not None:
+            _log.close()
+
+
+atexit.register(_close)
+
+logger.add(
+    sys.stderr, format="{time} {level} {message}", filter="session_log", level="INFO"
+)
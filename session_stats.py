@@ -0,0 +1,356 @@
+"""
+Statistics over session logs (session_log.py), streamed row by row so logs of
+tens of millions of attempts are summarized in bounded memory.
+
+    python session_stats.py [LOG ...] [--target REGEX ...] [--job NAME ...]
+                            [--processes N] [--bucket SECONDS] [--top N]
+
+Several logs are summarized in parallel by a process pool and merged.
+"""
+
+import argparse
+import re
+import sqlite3
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+import multiprocessing
+from loguru import logger
+import session_log
+
+# Outcomes that end a run of currency with a crafted item: map_module.MATCHED
+# and FINISHED. A step's HIT only moves an item craft on to its next step.
+SUCCESSES = frozenset(("matched", session_log.FINISHED))
+MAX_MODS = 20_000  # Mod templates counted before the rarest are dropped
+MAX_LINES = 50_000  # Mod line ids whose template and targets are cached
+PROGRESS_ROWS = 100_000  # Rows between progress updates
+
+NUMBER_RGX = re.compile(r"\d+(?:\.\d+)?")
+
+
+def mod_template(line: str) -> str:
+    """
+    The mod line with its values replaced by #, so rolls of the same mod
+    count together.
+    """
+    return NUMBER_RGX.sub("#", line)
+
+
+@dataclass
+class SessionStats:
+    """
+    Counters over the attempts of one or more session logs. A run is the
+    currency applied to an item since it was first read or last succeeded.
+    """
+
+    targets: tuple[str, ...] = ()
+    bucket: int = 3600  # Seconds per throughput bucket
+    logs: int = 0
+    jobs: int = 0
+    attempts: int = 0  # Item reads
+    rolls: int = 0  # Reads right after a currency was applied
+    successes: int = 0
+    qualified: int = 0  # Successes without any currency applied
+    first: float = 0.0
+    last: float = 0.0
+    active: float = 0.0  # Seconds from the first to the last attempt of each job
+    spent: Counter = field(default_factory=Counter)  # Currency -> times applied
+    # Currency applied in a run -> runs that ended in a success
+    attempts_per_success: Counter = field(default_factory=Counter)
+    mods: Counter = field(default_factory=Counter)  # Template -> rolls with it
+    mods_dropped: int = 0  # Counts of templates dropped to stay under MAX_MODS
+    target_hits: list[int] = field(default_factory=list)  # Rolls matching each
+    all_targets_hits: int = 0  # Rolls matching every target
+    throughput: Counter = field(default_factory=Counter)  # Bucket start -> rolls
+
+    def __post_init__(self):
+        if not self.target_hits:
+            self.target_hits = [0] * len(self.targets)
+
+    def merge(self, other: "SessionStats") -> None:
+        if other.targets != self.targets or other.bucket != self.bucket:
+            raise ValueError("Stats with different targets or buckets")
+        if other.attempts:
+            self.first = min(self.first, other.first) if self.attempts else other.first
+            self.last = max(self.last, other.last)
+        for name in (
+            "logs",
+            "jobs",
+            "attempts",
+            "rolls",
+            "successes",
+            "qualified",
+            "active",
+        ):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.spent.update(other.spent)
+        self.attempts_per_success.update(other.attempts_per_success)
+        self.mods.update(other.mods)
+        self.mods_dropped += other.mods_dropped
+        self._trim_mods()
+        self.target_hits = [a + b for a, b in zip(self.target_hits, other.target_hits)]
+        self.all_targets_hits += other.all_targets_hits
+        self.throughput.update(other.throughput)
+
+    def _trim_mods(self) -> None:
+        if len(self.mods) > MAX_MODS:
+            # In place: summarize_log holds on to the counter.
+            kept = self.mods.most_common(MAX_MODS // 2)
+            self.mods_dropped += self.mods.total() - sum(n for _, n in kept)
+            self.mods.clear()
+            self.mods.update(dict(kept))
+
+    def percentile(self, p: float) -> int:
+        """
+        Currency applied per success at percentile p (0-1) of the runs.
+        """
+        goal = p * self.attempts_per_success.total()
+        seen = 0
+        for attempts, runs in sorted(self.attempts_per_success.items()):
+            seen += runs
+            if seen >= goal:
+                return attempts
+        return 0
+
+    @property
+    def mean_attempts_per_success(self) -> float:
+        runs = self.attempts_per_success
+        return sum(a * n for a, n in runs.items()) / runs.total() if runs else 0.0
+
+    def currency_per_success(self) -> dict[str, float]:
+        """
+        Every currency applied, including runs that never succeeded, divided
+        by the successes.
+        """
+        if not self.successes:
+            return {}
+        return {
+            currency: spent / self.successes
+            for currency, spent in self.spent.most_common()
+        }
+
+    def target_rates(self) -> list[tuple[str, int, float]]:
+        """
+        (target, rolls matching it, chance per roll), plus "all" for rolls
+        matching every target.
+        """
+        if not self.targets:
+            return []
+        rows = list(zip(self.targets, self.target_hits))
+        if len(self.targets) > 1:
+            rows.append(("all", self.all_targets_hits))
+        return [
+            (target, hits, hits / self.rolls if self.rolls else 0.0)
+            for target, hits in rows
+        ]
+
+    def rolls_per_hour(self) -> float:
+        """
+        Rolls per hour while jobs were running, not counting the time
+        between jobs.
+        """
+        return self.rolls / self.active * 3600 if self.active > 0 else 0.0
+
+
+def stream(path: str, jobs: Iterable[str] | None = None) -> Iterator[tuple]:
+    """
+    (job, time, currency, outcome, mod ids) of every attempt in the log, in
+    order within each job, read with a cursor rather than loaded. The mod
+    ids are comma separated keys of the log's mods table.
+    """
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        query = (
+            "SELECT a.job, a.time, a.currency, a.outcome, t.mods FROM attempts a "
+            "JOIN texts t ON t.id = a.text"
+        )
+        params: tuple = ()
+        if jobs:
+            params = tuple(jobs)
+            query += (
+                " WHERE a.job IN (SELECT id FROM jobs WHERE name IN "
+                f"({', '.join('?' * len(params))}))"
+            )
+        yield from connection.execute(query + " ORDER BY a.job, a.rowid", params)
+    finally:
+        connection.close()
+
+
+def summarize_log(
+    path: str,
+    targets: Iterable[str] = (),
+    jobs: Iterable[str] | None = None,
+    bucket: int = 3600,
+    channel=None,
+) -> SessionStats:
+    """
+    Stats of one log. channel (a progress.ProgressChannel) gets the rows read
+    so far as "rows".
+    """
+    stats = SessionStats(tuple(targets), bucket)
+    stats.logs = 1
+    matchers = [re.compile(target, re.IGNORECASE) for target in stats.targets]
+    every = (1 << len(matchers)) - 1
+    # Mod lines are looked up once per id, on a second connection while
+    # stream() holds its cursor.
+    lookup = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    lines: dict[str, tuple[str, int]] = {}
+    spent = stats.spent
+    mods_counter = stats.mods
+    hits = stats.target_hits
+    current_job = None
+    job_started = 0.0
+    run = 0
+    for job, stamp, currency, outcome, mods in stream(path, jobs):
+        if job != current_job:
+            if current_job is not None:
+                stats.active += stats.last - job_started
+            current_job = job
+            job_started = stamp
+            stats.jobs += 1
+            run = 0
+        if not stats.attempts:
+            stats.first = stamp
+        stats.attempts += 1
+        stats.last = stamp
+        if currency is None:
+            # A fresh item; what was spent on the last one is lost.
+            run = 0
+        else:
+            run += 1
+            stats.rolls += 1
+            spent[currency] += 1
+            stats.throughput[int(stamp // bucket) * bucket] += 1
+            matched = 0
+            for mod_id in mods.split(",") if mods else ():
+                cached = lines.get(mod_id)
+                if cached is None:
+                    (line,) = lookup.execute(
+                        "SELECT line FROM mods WHERE id = ?", (int(mod_id),)
+                    ).fetchone()
+                    mask = 0
+                    for i, matcher in enumerate(matchers):
+                        if matcher.search(line):
+                            mask |= 1 << i
+                    if len(lines) >= MAX_LINES:
+                        lines.clear()
+                    cached = lines[mod_id] = (mod_template(line), mask)
+                mods_counter[cached[0]] += 1
+                matched |= cached[1]
+            if matched:
+                for i in range(len(matchers)):
+                    if matched >> i & 1:
+                        hits[i] += 1
+                if matched == every:
+                    stats.all_targets_hits += 1
+        if outcome in SUCCESSES:
+            if run:
+                stats.successes += 1
+                stats.attempts_per_success[run] += 1
+            else:
+                stats.qualified += 1
+            run = 0
+        if stats.attempts % PROGRESS_ROWS == 0:
+            stats._trim_mods()
+            if channel is not None:
+                channel.set("rows", stats.attempts)
+    lookup.close()
+    if current_job is not None:
+        stats.active += stats.last - job_started
+    stats._trim_mods()
+    if channel is not None:
+        channel.set("rows", stats.attempts)
+    return stats
+
+
+def summarize(
+    paths: list[str],
+    targets: Iterable[str] = (),
+    jobs: Iterable[str] | None = None,
+    bucket: int = 3600,
+    processes: int | None = None,
+    channel=None,
+) -> SessionStats:
+    """
+    Stats of several logs merged. With more than one log and processes other
+    than 1, each log is summarized in a process pool of up to `processes`
+    workers (default: one per CPU); channel then gets the logs done as
+    "logs" instead of rows.
+    """
+    targets = tuple(targets)
+    jobs = tuple(jobs) if jobs else None
+    stats = SessionStats(targets, bucket)
+    started = time.perf_counter()
+    if len(paths) > 1 and processes != 1:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            min(processes or multiprocessing.cpu_count(), len(paths)),
+            mp_context=context,
+        ) as pool:
+            futures = [
+                pool.submit(summarize_log, path, targets, jobs, bucket)
+                for path in paths
+            ]
+            for done, future in enumerate(as_completed(futures), 1):
+                stats.merge(future.result())
+                if channel is not None:
+                    channel.set("logs", done)
+    else:
+        for path in paths:
+            stats.merge(summarize_log(path, targets, jobs, bucket, channel))
+    logger.info(
+        f"Summarized {stats.attempts} attempts from {len(paths)} logs in "
+        f"{time.perf_counter() - started:.1f}s"
+    )
+    return stats
+
+
+def summary_lines(stats: SessionStats, top: int = 15) -> list[str]:
+    lines = [
+        f"{stats.attempts} attempts in {stats.jobs} jobs from {stats.logs} logs: "
+        f"{stats.rolls} rolls, {stats.successes} successes "
+        f"({stats.qualified} already matching), "
+        f"{stats.rolls_per_hour():.0f} rolls/hour",
+    ]
+    if stats.attempts_per_success:
+        lines.append(
+            f"currency per success: mean {stats.mean_attempts_per_success:.1f}, "
+            f"p50 {stats.percentile(0.5)}, p90 {stats.percentile(0.9)}, "
+            f"p99 {stats.percentile(0.99)}, max {max(stats.attempts_per_success)}"
+        )
+    for currency, amount in stats.currency_per_success().items():
+        lines.append(f"  {currency}: {amount:.1f} per success")
+    if stats.targets:
+        lines.append("targets (chance per roll, currency per hit):")
+        for target, hits, rate in stats.target_rates():
+            cost = f"{1 / rate:.1f}" if rate else "-"
+            lines.append(f"  {rate:7.2%} {cost:>8}  {target}")
+    lines.append(f"top mods of {stats.rolls} rolls:")
+    for template, count in stats.mods.most_common(top):
+        lines.append(f"  {count / stats.rolls:7.2%}  {template}")
+    return lines
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("logs", nargs="*", default=[session_log.DEFAULT_PATH])
+    parser.add_argument("--target", action="append", default=[], help="Mod regex")
+    parser.add_argument("--job", action="append", help="Only jobs with this name")
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--bucket", type=int, default=3600)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+    stats = summarize(args.logs, args.target, args.job, args.bucket, args.processes)
+    print("\n".join(summary_lines(stats, args.top)))
+    return 0
+
+
+logger.add(
+    sys.stderr, format="{time} {level} {message}", filter="session_stats", level="INFO"
+)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,665 @@
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from bot_backend import BotBackend
+from craft_session import CraftSession
+from mytypes import Position
+
+CELL_RADIUS = 25  # Pixels around an item or stash cell that still hit it
+MODIFIERS = frozenset(
+    ("shift", "shiftleft", "shiftright", "ctrl", "ctrlleft", "ctrlright")
+    + ("alt", "altleft", "altright")
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SimMod:
+    affix: str  # "prefix" or "suffix"
+    group: str  # Only one mod per group can be on an item
+    name: str
+    tier: int
+    text: str  # Lines separated by "\n", "{}" is replaced by a rolled value
+    ranges: tuple[tuple[int, int], ...] = ()
+    stats: tuple[tuple[str, int], ...] = ()  # Map property contributions
+
+
+@dataclass(slots=True)
+class RolledMod:
+    mod: SimMod
+    lines: list[str]
+
+
+@dataclass(slots=True)
+class SimItem:
+    item_class: str
+    base: str
+    ilvl: int
+    pool: str
+    rarity: str = "Normal"
+    name: str = ""
+    mods: list[RolledMod] = field(default_factory=list)
+    properties: tuple[str, ...] = ()
+    requirements: tuple[str, ...] = ()
+    enchants: tuple[str, ...] = ()
+    implicits: tuple[str, ...] = ()
+    extra_sections: tuple[str, ...] = ()  # e.g. "Monster Level: 83"
+    footer: tuple[str, ...] = ()
+
+
+def _mods(affix: str, rows: list[tuple]) -> list[SimMod]:
+    mods = []
+    for row in rows:
+        group, name, tier, text, *rest = row
+        ranges = rest[0] if rest else ()
+        stats = rest[1] if len(rest) > 1 else ()
+        mods.append(SimMod(affix, group, name, tier, text, ranges, stats))
+    return mods
+
+
+def _map_stats(quant: int, rarity: int, pack: int = 0, extra: tuple = ()):
+    stats = [("Item Quantity", quant), ("Item Rarity", rarity)]
+    if pack:
+        stats.append(("Monster Pack Size", pack))
+    return tuple(stats) + extra
+
+
+MOD_POOLS: dict[str, list[SimMod]] = {
+    "map": _mods(
+        "prefix",
+        [
+            (
+                "fire",
+                "Savage",
+                1,
+                "Monsters deal {}% extra Physical Damage as Fire",
+                ((90, 110),),
+                _map_stats(8, 5, 3),
+            ),
+            (
+                "life",
+                "Fecund",
+                1,
+                "{}% more Monster Life",
+                ((35, 40),),
+                _map_stats(8, 5, 3),
+            ),
+            (
+                "chain",
+                "Chaining",
+                -1,
+                "Monsters' skills Chain 2 additional times",
+                (),
+                _map_stats(7, 4),
+            ),
+            (
+                "boss_life",
+                "Titan's",
+                -1,
+                "Unique Boss has {}% increased Life\nUnique Boss has {}% increased Area of Effect",
+                ((25, 35), (45, 70)),
+                _map_stats(6, 4),
+            ),
+            (
+                "boss_damage",
+                "Overlord's",
+                -1,
+                "Unique Boss deals {}% increased Damage\nUnique Boss has {}% increased Attack and Cast Speed",
+                ((25, 25), (25, 25)),
+                _map_stats(6, 4),
+            ),
+            (
+                "armour",
+                "Armoured",
+                1,
+                "+{}% Monster Physical Damage Reduction",
+                ((40, 40),),
+                _map_stats(7, 4, 2),
+            ),
+            (
+                "hexwarded",
+                "Hexwarded",
+                -1,
+                "{}% less effect of Curses on Monsters",
+                ((60, 60),),
+                _map_stats(7, 4, 2),
+            ),
+            (
+                "chaos",
+                "Profane",
+                1,
+                "Monsters gain {}% of their Physical Damage as Extra Chaos Damage\nMonsters Inflict Withered for 2 seconds on Hit",
+                ((31, 45),),
+                _map_stats(9, 5, 4),
+            ),
+            (
+                "ignite",
+                "Conflagrating",
+                -1,
+                "All Monster Damage from Hits always Ignites",
+                (),
+                _map_stats(7, 4, 2),
+            ),
+        ],
+    )
+    + _mods(
+        "suffix",
+        [
+            (
+                "max_res",
+                "of Exposure",
+                1,
+                "Players have -{}% to all maximum Resistances",
+                ((9, 12),),
+                _map_stats(9, 5, 3),
+            ),
+            (
+                "recovery",
+                "of Smothering",
+                -1,
+                "Players have {}% less Recovery Rate of Life and Energy Shield",
+                ((40, 60),),
+                _map_stats(8, 5, 2),
+            ),
+            (
+                "regen",
+                "of Congealment",
+                -1,
+                "Players cannot Regenerate Life, Mana or Energy Shield",
+                (),
+                _map_stats(8, 5, 2),
+            ),
+            (
+                "flask",
+                "of Drought",
+                -1,
+                "Players gain {}% reduced Flask Charges",
+                ((50, 60),),
+                _map_stats(7, 4, 1),
+            ),
+            (
+                "ele_weakness",
+                "of Elemental Weakness",
+                -1,
+                "Players are Cursed with Elemental Weakness",
+                (),
+                _map_stats(7, 4, 2),
+            ),
+            (
+                "frenzy",
+                "of Frenzy",
+                -1,
+                "Monsters gain a Frenzy Charge on Hit",
+                (),
+                _map_stats(7, 4, 3),
+            ),
+            (
+                "aoe",
+                "of Impotence",
+                -1,
+                "Players have {}% less Area of Effect",
+                ((25, 30),),
+                _map_stats(7, 4, 1),
+            ),
+            (
+                "reflect",
+                "of Stasis",
+                -1,
+                "Monsters reflect {}% of Elemental Damage",
+                ((15, 18),),
+                _map_stats(8, 5, 2),
+            ),
+            (
+                "crit",
+                "of Deadliness",
+                1,
+                "Monsters have {}% increased Critical Strike Chance\n+{}% to Monster Critical Strike Multiplier",
+                ((360, 400), (41, 45)),
+                _map_stats(8, 5, 3),
+            ),
+        ],
+    ),
+    "cluster": _mods(
+        "prefix",
+        [
+            ("burning_bright", "Notable", 1, "1 Added Passive Skill is Burning Bright"),
+            ("cooked_alive", "Notable", 1, "1 Added Passive Skill is Cooked Alive"),
+            (
+                "smoking_remains",
+                "Notable",
+                1,
+                "1 Added Passive Skill is Smoking Remains",
+            ),
+            ("master_of_fire", "Notable", 1, "1 Added Passive Skill is Master of Fire"),
+            (
+                "life",
+                "Hale",
+                2,
+                "Added Small Passive Skills also grant: +{} to Maximum Life",
+                ((4, 5),),
+            ),
+        ],
+    )
+    + _mods(
+        "suffix",
+        [
+            (
+                "prismatic_heart",
+                "of Potency",
+                1,
+                "1 Added Passive Skill is Prismatic Heart",
+            ),
+            (
+                "widespread",
+                "of Potency",
+                1,
+                "1 Added Passive Skill is Widespread Destruction",
+            ),
+            (
+                "disorienting",
+                "of Potency",
+                1,
+                "1 Added Passive Skill is Disorienting Display",
+            ),
+            (
+                "strength",
+                "of the Brute",
+                3,
+                "Added Small Passive Skills also grant: +{} to Strength",
+                ((6, 8),),
+            ),
+            (
+                "fire_res",
+                "of the Volcano",
+                3,
+                "Added Small Passive Skills also grant: +{}% to Fire Resistance",
+                ((3, 5),),
+            ),
+        ],
+    ),
+    "ring": _mods(
+        "prefix",
+        [
+            ("life", "Rotund", 3, "+{} to maximum Life", ((60, 69),)),
+            ("mana", "Opalescent", 2, "+{} to maximum Mana", ((65, 68),)),
+            (
+                "phys",
+                "Glinting",
+                6,
+                "Adds {} to {} Physical Damage to Attacks",
+                ((2, 3), (6, 8)),
+            ),
+            ("es", "Shining", 4, "+{} to maximum Energy Shield", ((17, 22),)),
+            (
+                "item_rarity",
+                "Magpie's",
+                2,
+                "{}% increased Rarity of Items found",
+                ((11, 14),),
+            ),
+        ],
+    )
+    + _mods(
+        "suffix",
+        [
+            ("fire_res", "of the Volcano", 3, "+{}% to Fire Resistance", ((36, 41),)),
+            ("cold_res", "of the Tundra", 3, "+{}% to Cold Resistance", ((36, 41),)),
+            (
+                "lightning_res",
+                "of the Lightning",
+                2,
+                "+{}% to Lightning Resistance",
+                ((42, 45),),
+            ),
+            ("strength", "of the Lion", 4, "+{} to Strength", ((33, 37),)),
+            ("attack_speed", "of Grace", 2, "{}% increased Attack Speed", ((5, 7),)),
+        ],
+    ),
+}
+
+RARE_NAME_PREFIXES = ("Gloom", "Dread", "Havoc", "Dusk", "Chimeric", "Storm")
+RARE_NAME_SUFFIXES = ("Core", "Chambers", "Shell", "Loop", "Spark", "Bane")
+
+ITEM_TEMPLATES = {
+    "map": lambda: SimItem(
+        "Maps",
+        "Cemetery Map",
+        83,
+        "map",
+        properties=("Map Tier: 16",),
+        extra_sections=("Monster Level: 83",),
+        footer=(
+            "Travel to this Map by using it in a personal Map Device. Maps can only be used once.",
+        ),
+    ),
+    "cluster": lambda: SimItem(
+        "Jewels",
+        "Large Cluster Jewel",
+        84,
+        "cluster",
+        requirements=("Level: 54",),
+        enchants=(
+            "Adds 8 Passive Skills",
+            "2 Added Passive Skills are Jewel Sockets",
+            "Added Small Passive Skills grant: 12% increased Fire Damage",
+        ),
+        footer=(
+            "Place into an allocated Large Jewel Socket on the Passive Skill Tree. "
+            "Added passives do not interact with jewel radiuses. "
+            "Right click to remove from the Socket.",
+        ),
+    ),
+    "ring": lambda: SimItem(
+        "Rings",
+        "Two-Stone Ring",
+        84,
+        "ring",
+        requirements=("Level: 66",),
+        implicits=("+14% to Fire and Cold Resistances",),
+    ),
+}
+
+AFFIX_LIMITS = {"Normal": 0, "Magic": 1, "Rare": 3}
+
+
+class SimulatorBackend(BotBackend):
+    """
+    Deterministic stand-in for the game client. Models a currency stash, the
+    items placed with place_item(), the cursor, the held currency and the
+    clipboard, and renders items as advanced copy text. Time is virtual: every
+    action advances `clock` by `action_cost` and sleep() advances it without
+    blocking, so craft loops run at full speed.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        currencies: tuple[str, ...] = (
+            "chaos",
+            "exalted",
+            "transmutation",
+            "augment",
+            "alteration",
+            "alchemy",
+            "regal",
+            "scouring",
+        ),
+        stack_size: int = 1_000_000,
+        action_cost: float = 0.0,
+        response_latency: float = 0.0,
+    ):
+        self.rng = random.Random(seed)
+        self.stash = {
+            Position(100 + 60 * i, 200): currency
+            for i, currency in enumerate(currencies)
+        }
+        self.stacks = Counter({currency: stack_size for currency in currencies})
+        self.items: dict[Position, SimItem] = {}
+        self.cluster_button: Position | None = None
+        self.cursor = Position(0, 0)
+        self.held: str | None = None
+        self.keys_down: set[str] = set()
+        self.clipboard = ""
+        self.clipboard_writes = 0
+        self.clock = 0.0
+        self.action_cost = action_cost
+        self.response_latency = response_latency
+        self.counts: Counter = Counter()  # Actions performed and currency used
+        self.clicks: list[Position] = []  # Scripted answers for wait_for_click
+        self._stale: dict[Position, tuple[float, str]] = {}
+
+    # Setup helpers
+
+    def place_item(self, pos: Position, template: str, rarity: str = "Normal"):
+        item = ITEM_TEMPLATES[template]()
+        self.items[pos] = item
+        if rarity != "Normal":
+            self._reroll(item, rarity, 4 if rarity == "Rare" else 1)
+        return item
+
+    def add_cluster_bench(self, button: Position) -> SimItem:
+        """
+        Place a cluster jewel 80px above a reroll button, like the layout
+        cluster_module.craft_cluster expects.
+        """
+        self.cluster_button = button
+        return self.place_item(Position(button.x, button.y - 80), "cluster", "Magic")
+
+    def session(self, **slots: Position) -> CraftSession:
+        """
+        CraftSession with every stash currency plus the given extra slots.
+        """
+        positions = {currency: pos for pos, currency in self.stash.items()}
+        positions.update(slots)
+        return CraftSession(MappingProxyType(positions))
+
+    def render(self, item: SimItem) -> str:
+        header = [f"Item Class: {item.item_class}", f"Rarity: {item.rarity}"]
+        if item.rarity == "Rare":
+            header += [item.name, item.base]
+        elif item.rarity == "Magic":
+            prefix = next(
+                (m.mod.name for m in item.mods if m.mod.affix == "prefix"), ""
+            )
+            suffix = next(
+                (m.mod.name for m in item.mods if m.mod.affix == "suffix"), ""
+            )
+            header.append(" ".join(filter(None, (prefix, item.base, suffix))))
+        else:
+            header.append(item.base)
+        sections = ["\n".join(header)]
+        properties = list(item.properties)
+        if item.pool == "map":
+            totals = Counter()
+            for rolled in item.mods:
+                totals.update(dict(rolled.mod.stats))
+            properties += [
+                f"{stat}: +{value}% (augmented)" for stat, value in totals.items()
+            ]
+        if properties:
+            sections.append("\n".join(properties))
+        if item.requirements:
+            sections.append("\n".join(("Requirements:",) + item.requirements))
+        sections.append(f"Item Level: {item.ilvl}")
+        sections += item.extra_sections
+        if item.enchants:
+            sections.append("\n".join(f"{line} (enchant)" for line in item.enchants))
+        if item.implicits:
+            sections.append(
+                "\n".join(
+                    f"{{ Implicit Modifier }}\n{line} (implicit)"
+                    for line in item.implicits
+                )
+            )
+        if item.mods:
+            mods = []
+            for rolled in item.mods:
+                mod = rolled.mod
+                tier = f" (Tier: {mod.tier})" if mod.tier != -1 else ""
+                mods.append(
+                    f'{{ {mod.affix.capitalize()} Modifier "{mod.name}"{tier} }}'
+                )
+                mods += rolled.lines
+            sections.append("\n".join(mods))
+        sections += item.footer
+        return "\n--------\n".join(sections) + "\n"
+
+    # Crafting model
+
+    def _roll(self, mod: SimMod) -> RolledMod:
+        values = [self.rng.randint(low, high) for low, high in mod.ranges]
+        return RolledMod(mod, mod.text.format(*values).split("\n"))
+
+    def _add_mod(self, item: SimItem) -> bool:
+        limit = AFFIX_LIMITS[item.rarity]
+        groups = {rolled.mod.group for rolled in item.mods}
+        affixes = Counter(rolled.mod.affix for rolled in item.mods)
+        candidates = [
+            mod
+            for mod in MOD_POOLS[item.pool]
+            if mod.group not in groups and affixes[mod.affix] < limit
+        ]
+        if not candidates:
+            return False
+        item.mods.append(self._roll(self.rng.choice(candidates)))
+        return True
+
+    def _reroll(self, item: SimItem, rarity: str, count: int) -> None:
+        item.rarity = rarity
+        item.mods = []
+        if rarity == "Rare":
+            item.name = (
+                f"{self.rng.choice(RARE_NAME_PREFIXES)} "
+                f"{self.rng.choice(RARE_NAME_SUFFIXES)}"
+            )
+        for _ in range(count):
+            self._add_mod(item)
+
+    def apply_currency(self, currency: str, item: SimItem) -> bool:
+        """
+        Apply a currency following the game's rules. Returns False if the
+        currency cannot be used on the item, which leaves it unchanged.
+        """
+        rng = self.rng
+        if currency == "transmutation" and item.rarity == "Normal":
+            self._reroll(item, "Magic", rng.randint(1, 2))
+        elif currency == "alteration" and item.rarity == "Magic":
+            self._reroll(item, "Magic", rng.randint(1, 2))
+        elif currency == "augment" and item.rarity == "Magic" and len(item.mods) < 2:
+            self._add_mod(item)
+        elif currency == "regal" and item.rarity == "Magic":
+            item.rarity = "Rare"
+            item.name = (
+                f"{rng.choice(RARE_NAME_PREFIXES)} {rng.choice(RARE_NAME_SUFFIXES)}"
+            )
+            self._add_mod(item)
+        elif currency == "alchemy" and item.rarity == "Normal":
+            self._reroll(item, "Rare", rng.randint(4, 6))
+        elif currency == "chaos" and item.rarity == "Rare":
+            self._reroll(item, "Rare", rng.randint(4, 6))
+        elif currency == "exalted" and item.rarity == "Rare" and len(item.mods) < 6:
+            self._add_mod(item)
+        elif currency == "scouring" and item.rarity != "Normal":
+            self._reroll(item, "Normal", 0)
+        else:
+            return False
+        return True
+
+    def _at(self, positions, pos: Position):
+        for candidate in positions:
+            if (
+                abs(candidate.x - pos.x) <= CELL_RADIUS
+                and abs(candidate.y - pos.y) <= CELL_RADIUS
+            ):
+                return candidate
+        return None
+
+    def _change_item(self, pos: Position, change) -> bool:
+        item = self.items[pos]
+        before = self.render(item)
+        if not change(item):
+            return False
+        if self.response_latency and pos not in self._stale:
+            self._stale[pos] = (self.clock + self.response_latency, before)
+        return True
+
+    def _tick(self) -> None:
+        self.clock += self.action_cost
+
+    # BotBackend
+
+    def move_to(self, x: int, y: int) -> None:
+        self._tick()
+        self.counts["move"] += 1
+        self.cursor = Position(x, y)
+
+    def right_click(self) -> None:
+        self._tick()
+        self.counts["right_click"] += 1
+        if cell := self._at(self.stash, self.cursor):
+            currency = self.stash[cell]
+            self.held = currency if self.stacks[currency] > 0 else None
+        else:
+            self.held = None  # Right click anywhere else drops the currency
+
+    def left_click(self) -> None:
+        self._tick()
+        self.counts["left_click"] += 1
+        if self.cluster_button and self._at((self.cluster_button,), self.cursor):
+            target = Position(self.cluster_button.x, self.cluster_button.y - 80)
+            if target in self.items:
+                self.counts["cluster_reroll"] += 1
+                self._change_item(
+                    target,
+                    lambda item: self._reroll(item, "Magic", self.rng.randint(1, 2))
+                    or True,
+                )
+            return
+        pos = self._at(self.items, self.cursor)
+        if pos and self.held:
+            currency = self.held
+            if self._change_item(pos, lambda item: self.apply_currency(currency, item)):
+                self.stacks[currency] -= 1
+                self.counts[currency] += 1
+            # With shift held the currency stays on the cursor.
+            if "shift" not in self.keys_down or not self.stacks[currency]:
+                self.held = None
+
+    def press(self, key: str) -> None:
+        self._tick()
+        self.counts[f"press:{key}"] += 1
+
+    def key_down(self, key: str) -> None:
+        self._tick()
+        self.keys_down.add(key)
+
+    def key_up(self, key: str) -> None:
+        self._tick()
+        self.keys_down.discard(key)
+
+    def hotkey(self, *keys: str) -> None:
+        self._tick()
+        self.counts["+".join(keys)] += 1
+        if self.keys_down & MODIFIERS - set(keys):
+            # e.g. ctrl+alt+c with shift still held is not an advanced copy
+            self.counts["blocked:" + "+".join(keys)] += 1
+            return
+        if keys == ("ctrl", "alt", "c") and (pos := self._at(self.items, self.cursor)):
+            stale = self._stale.get(pos)
+            if stale and self.clock < stale[0]:
+                self.clipboard = stale[1]
+            else:
+                self._stale.pop(pos, None)
+                self.clipboard = self.render(self.items[pos])
+            self.clipboard_writes += 1
+
+    def read_clipboard(self) -> str:
+        return self.clipboard
+
+    def write_clipboard(self, text: str) -> None:
+        self.clipboard = text
+        self.clipboard_writes += 1
+
+    def clipboard_sequence(self) -> int:
+        return self.clipboard_writes
+
+    def activate_window(self, title: str) -> bool:
+        self.counts["activate_window"] += 1
+        return True
+
+    def wait_for_click(self) -> Position | None:
+        return self.clicks.pop(0) if self.clicks else None
+
+    def run_actions(self, actions, interruptible: bool = True) -> None:
+        # A batch pays its actions' delays but not the per-call PAUSE.
+        cost, self.action_cost = self.action_cost, 0.0
+        try:
+            super().run_actions(actions, interruptible)
+        finally:
+            self.action_cost = cost
+
+    def sleep(self, seconds: float) -> None:
+        self.clock += seconds
+
+    def now(self) -> float:
+        return self.clock
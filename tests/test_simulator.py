@@ -0,0 +1,189 @@
+"""
+The craft loops end to end against simulator.SimulatorBackend. Seeds are
+fixed, so every outcome and the currency it took are exact.
+"""
+
+import pytest
+
+from bot_controller import Bot
+from cluster_module import craft_cluster
+from craft_engine import FINISHED, STOPPED
+from item_craft_module import CraftingStep, craft_item_advanced
+from job_executor import CancellationToken
+from map_module import MATCHED, craft_map
+from mytypes import Position
+from pacing import AdaptivePacer
+from simulator import SimulatorBackend
+import map_module
+import session_log
+
+SEED = 2
+STACK = 1_000_000
+ITEM_POS = Position(600, 400)
+CLUSTER_BUTTON = Position(800, 500)
+
+MAP_REGEXES = ["extra Physical Damage as Fire", "maximum Resistances"]
+CLUSTER_REGEXES = ["Burning Bright", "Prismatic Heart"]
+ITEM_STEPS = [
+    CraftingStep("", "transmutation", on_success=1, auto_success=True),
+    CraftingStep(
+        "maximum Life", "alteration", on_failure=1, on_success=2, max_attempts=10_000
+    ),
+    CraftingStep("", "regal", on_success=3, auto_success=True),
+]
+
+
+@pytest.fixture
+def sim(tmp_path):
+    sim = SimulatorBackend(SEED, stack_size=STACK)
+    Bot.set_backend(sim)
+    Bot.set_pacer(AdaptivePacer())
+    log = session_log.SessionLog(str(tmp_path / "session_log.sqlite3"))
+    session_log.set_current(log)
+    yield sim
+    Bot.set_cancellation(None)
+    Bot.set_killswitch(False)
+    Bot.set_pacer(None)
+    Bot.set_backend(None)
+    session_log.set_current(None)
+
+
+def stop_after(orbs: int, stop) -> callable:
+    """
+    attempt_callback that calls stop() once `orbs` currency has been applied.
+    """
+    applied = 0
+
+    def attempt():
+        nonlocal applied
+        applied += 1
+        if applied == orbs:
+            stop()
+
+    return attempt
+
+
+def map_session(sim: SimulatorBackend):
+    sim.place_item(ITEM_POS, "map", "Rare")
+    return sim.session(**{"map-item": ITEM_POS})
+
+
+def item_session(sim: SimulatorBackend, rarity: str = "Normal"):
+    sim.place_item(ITEM_POS, "ring", rarity)
+    return sim.session(**{"craft-item": ITEM_POS})
+
+
+@pytest.mark.parametrize("hold", [False, True])
+def test_map_matches(sim, hold):
+    crafted = []
+    outcome = craft_map(
+        MAP_REGEXES,
+        len(MAP_REGEXES),
+        {},
+        map_session(sim),
+        hold_currency=hold,
+        success_callback=crafted.append,
+    )
+    assert outcome == MATCHED
+    assert sim.counts["chaos"] == 11
+    assert sim.stacks["chaos"] == STACK - 11
+    assert len(crafted) == 1
+    assert all(regex in crafted[0] for regex in MAP_REGEXES)
+    # Held: one pick-up and the right click that drops the orb.
+    assert sim.counts["right_click"] == (2 if hold else 11)
+    assert not any(kind.startswith("blocked:") for kind in sim.counts)
+    assert not sim.keys_down
+    assert sim.held is None
+
+
+@pytest.mark.parametrize("hold", [False, True])
+def test_map_killswitch(sim, hold):
+    outcome = craft_map(
+        [],
+        0,
+        {"Item Quantity": 1000},
+        map_session(sim),
+        hold_currency=hold,
+        attempt_callback=stop_after(5, Bot.toggle_killswitch),
+    )
+    assert outcome == map_module.STOPPED
+    assert sim.counts["chaos"] == 5
+    # Stopping mid-job still lets go of shift and the orb.
+    assert not sim.keys_down
+    assert sim.held is None
+
+
+def test_cluster_matches(sim):
+    sim.add_cluster_bench(CLUSTER_BUTTON)
+    crafted = []
+    craft_cluster(
+        CLUSTER_REGEXES,
+        success_callback=crafted.append,
+        session=sim.session(**{"button-location": CLUSTER_BUTTON}),
+    )
+    assert sim.counts["cluster_reroll"] == 6
+    assert len(crafted) == 1
+    assert all(
+        any(regex in mod for mod in crafted[0].mods) for regex in CLUSTER_REGEXES
+    )
+
+
+def test_cluster_killswitch(sim):
+    sim.add_cluster_bench(CLUSTER_BUTTON)
+    crafted = []
+    craft_cluster(
+        ["no such passive"],
+        attempt_callback=stop_after(4, Bot.toggle_killswitch),
+        success_callback=crafted.append,
+        session=sim.session(**{"button-location": CLUSTER_BUTTON}),
+    )
+    assert sim.counts["cluster_reroll"] == 4
+    assert not crafted
+
+
+@pytest.mark.parametrize("hold", [False, True])
+def test_item_finishes(sim, hold):
+    crafted = []
+    stats = craft_item_advanced(
+        ITEM_STEPS,
+        item_session(sim),
+        hold_currency=hold,
+        success_callback=crafted.append,
+    )
+    assert stats.outcome == FINISHED
+    assert stats.attempts == 7
+    spent = {c: sim.counts[c] for c in ("transmutation", "alteration", "regal")}
+    assert spent == {"transmutation": 1, "alteration": 5, "regal": 1}
+    assert sim.stacks["alteration"] == STACK - 5
+    assert "maximum Life" in crafted[0]
+    # Held: the alteration is picked up once and clicked four more times.
+    assert stats.held_clicks == (4 if hold else 0)
+    assert not sim.keys_down
+    assert sim.held is None
+
+    session_log.current().flush()
+    outcomes = [
+        attempt.outcome
+        for attempt in session_log.read_attempts(session_log.current().path)
+    ]
+    assert len(outcomes) == 8  # The first read and one per currency
+    assert outcomes[-1] == session_log.FINISHED
+    assert outcomes.count(session_log.FINISHED) == 1
+
+
+@pytest.mark.parametrize("hold", [False, True])
+def test_item_cancelled(sim, hold):
+    # A cancelled job token stops the craft like the killswitch does.
+    token = CancellationToken()
+    Bot.set_cancellation(token)
+    stats = craft_item_advanced(
+        [CraftingStep("no such mod", "alteration", max_attempts=10_000)],
+        item_session(sim, "Magic"),
+        hold_currency=hold,
+        attempt_callback=stop_after(3, token.cancel),
+    )
+    assert stats.outcome == STOPPED
+    assert stats.attempts == 3
+    assert sim.counts["alteration"] == 3
+    assert not sim.keys_down
+    assert sim.held is None
@@ -0,0 +1,61 @@
+from typing import Any, Callable
+from loguru import logger
+
+
+class WindowManager:
+    """
+    Finds a window by title once and keeps its handle. Every later activate()
+    only checks that the cached window still has a matching title and
+    whether it is in the foreground; the full top-level window enumeration
+    runs again only when the cached window has gone stale (closed or
+    restarted game).
+    """
+
+    def __init__(
+        self,
+        find_windows: Callable[[str], list[Any]],
+        press_key: Callable[[str], None],
+    ):
+        self.find_windows = find_windows  # e.g. pygetwindow.getWindowsWithTitle
+        self.press_key = press_key
+        self.windows: dict[str, Any] = {}
+        self.enumerations = 0
+        self.focus_changes = 0
+
+    def _valid(self, window: Any, title: str) -> bool:
+        try:
+            return title in window.title
+        except Exception:
+            return False
+
+    def find(self, title: str) -> Any | None:
+        window = self.windows.get(title)
+        if window is not None and self._valid(window, title):
+            return window
+        self.enumerations += 1
+        windows = self.find_windows(title)
+        if not windows:
+            self.windows.pop(title, None)
+            return None
+        if window is not None:
+            logger.info(f"Window '{title}' changed, handle refreshed")
+        self.windows[title] = windows[0]
+        return windows[0]
+
+    def activate(self, title: str) -> bool:
+        for _ in range(2):
+            window = self.find(title)
+            if window is None:
+                return False
+            try:
+                if not window.isActive:
+                    # Windows only lets a process take focus right after input.
+                    self.press_key("altleft")
+                    window.activate()
+                    self.focus_changes += 1
+                return True
+            except Exception as e:
+                # The handle died between the check and the call.
+                logger.warning(f"Could not activate '{title}': {e}")
+                self.windows.pop(title, None)
+        return False